@@ -5,6 +5,7 @@ import os
 import boto3
 import botocore.exceptions
 import contextlib
+import concurrent.futures
 
 import cloudlanguagetools.service
 import cloudlanguagetools.constants
@@ -14,6 +15,7 @@ import cloudlanguagetools.ttsvoice
 import cloudlanguagetools.translationlanguage
 import cloudlanguagetools.transliterationlanguage
 import cloudlanguagetools.errors
+import cloudlanguagetools.translationbatch
 
 DEFAULT_VOICE_PITCH = 0
 DEFAULT_VOICE_RATE = 100
@@ -90,7 +92,9 @@ class AmazonTranslationLanguage(cloudlanguagetools.translationlanguage.Translati
 
 class AmazonService(cloudlanguagetools.service.Service):
     def __init__(self):
-        pass
+        # amazon translate has no multi-text endpoint, batches are translated concurrently
+        self.translation_executor = concurrent.futures.ThreadPoolExecutor(max_workers=cloudlanguagetools.constants.TranslationBatchWorkers,
+            thread_name_prefix='cloudlanguagetools_amazon')
 
     def configure(self, config):
         aws_access_key_id = config['AWS_ACCESS_KEY_ID']
@@ -113,6 +117,9 @@ class AmazonService(cloudlanguagetools.service.Service):
                     SourceLanguageCode=from_language_key, TargetLanguageCode=to_language_key)
         return result.get('TranslatedText')
 
+    def get_translation_batch(self, texts, from_language_key, to_language_key):
+        return list(self.translation_executor.map(lambda text: cloudlanguagetools.translationbatch.translate_item(self, text, from_language_key, to_language_key), texts))
+
     def get_tts_audio(self, text, voice_key, options):
         audio_format_str = options.get(cloudlanguagetools.options.AUDIO_FORMAT_PARAMETER, cloudlanguagetools.options.AudioFormat.mp3.name)
         audio_format = cloudlanguagetools.options.AudioFormat[audio_format_str]
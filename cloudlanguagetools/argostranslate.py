@@ -1,4 +1,5 @@
 import cloudlanguagetools.service
+import cloudlanguagetools.constants
 import cloudlanguagetools.translationlanguage
 
 import logging
@@ -35,6 +36,8 @@ class ArgosTranslationLanguage(cloudlanguagetools.translationlanguage.Translatio
 
 # NOTE: this service is disabled
 class ArgosTranslateService(cloudlanguagetools.service.Service):
+    CATALOG_TTL = cloudlanguagetools.constants.CatalogStaticTTL
+
     def __init__(self):
         pass
 
@@ -0,0 +1,38 @@
+"""shared aiohttp session for the async service methods (aget_translation, aget_tts_audio, etc), one per event loop"""
+
+import asyncio
+import logging
+import tempfile
+import weakref
+
+import aiohttp
+
+import cloudlanguagetools.constants
+
+logger = logging.getLogger(__name__)
+
+# event loop -> aiohttp.ClientSession
+sessions = weakref.WeakKeyDictionary()
+
+def get_session() -> aiohttp.ClientSession:
+    loop = asyncio.get_running_loop()
+    session = sessions.get(loop, None)
+    if session == None or session.closed:
+        session = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=cloudlanguagetools.constants.RequestTimeout),
+            connector=aiohttp.TCPConnector(limit=cloudlanguagetools.constants.AsyncMaxConnections))
+        sessions[loop] = session
+    return session
+
+async def close_session():
+    """close the session of the running event loop, call before the loop shuts down"""
+    session = sessions.pop(asyncio.get_running_loop(), None)
+    if session != None:
+        await session.close()
+
+def write_temp_file(content, prefix=None, suffix=None):
+    """store audio content the same way the blocking get_tts_audio methods return it"""
+    output_temp_file = tempfile.NamedTemporaryFile(prefix=prefix, suffix=suffix)
+    with open(output_temp_file.name, 'wb') as f:
+        f.write(content)
+    return output_temp_file
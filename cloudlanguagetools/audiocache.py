@@ -0,0 +1,147 @@
+"""content-addressed store for generated tts audio, so that the same text / voice / options is only synthesized once.
+least recently used files are evicted once the store grows over its byte budget"""
+
+import os
+import json
+import shutil
+import hashlib
+import logging
+import tempfile
+import threading
+import collections
+import unicodedata
+
+import cloudlanguagetools.constants
+import cloudlanguagetools.options
+
+logger = logging.getLogger(__name__)
+
+def get_audio_suffix(options):
+    """file suffix for the audio format in the tts options, named like the services name their output files"""
+    audio_format = options.get(cloudlanguagetools.options.AUDIO_FORMAT_PARAMETER, cloudlanguagetools.options.AudioFormat.mp3.name)
+    return f'.{audio_format}'
+
+class AudioCache():
+    def __init__(self, directory, max_bytes=cloudlanguagetools.constants.AudioCacheMaxBytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        # key -> size in bytes, least recently used first
+        self.entries = collections.OrderedDict()
+        self.total_bytes = 0
+        self.hit_count = 0
+        self.miss_count = 0
+        self.eviction_count = 0
+        os.makedirs(self.directory, exist_ok=True)
+        self.load_entries()
+
+    def load_entries(self):
+        # files written by a previous process, oldest modification time first
+        files = []
+        for dirpath, dirnames, filenames in os.walk(self.directory):
+            for filename in filenames:
+                if not filename.endswith('.audio'):
+                    continue
+                stat = os.stat(os.path.join(dirpath, filename))
+                files.append((stat.st_mtime, filename[:-len('.audio')], stat.st_size))
+        files.sort()
+        with self.lock:
+            for mtime, key, size in files:
+                self.entries[key] = size
+                self.total_bytes += size
+        logger.info(f'audio cache {self.directory}: {len(self.entries)} files, {self.total_bytes} bytes')
+
+    def get_key(self, service_name, voice_key, options, text):
+        text = unicodedata.normalize('NFC', text)
+        key_str = json.dumps([service_name, voice_key, options, text], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(key_str.encode('utf-8')).hexdigest()
+
+    def get_path(self, key):
+        return os.path.join(self.directory, key[0:2], key[2:4], f'{key}.audio')
+
+    def get(self, key, suffix=''):
+        """return a NamedTemporaryFile with a copy of the cached audio, or None.
+        callers get their own copy, so that eviction can't remove a file while it's being read.
+        suffix: the audio format suffix (see get_audio_suffix), for callers which look at the file type"""
+        path = self.get_path(key)
+        output_temp_file = tempfile.NamedTemporaryFile(prefix='cloudlanguagetools_audiocache', suffix=suffix)
+        try:
+            shutil.copyfile(path, output_temp_file.name)
+        except FileNotFoundError:
+            output_temp_file.close()
+            with self.lock:
+                self.miss_count += 1
+                # evicted by another process
+                size = self.entries.pop(key, None)
+                if size != None:
+                    self.total_bytes -= size
+            return None
+        # mark as recently used, also for other processes sharing the directory
+        os.utime(path)
+        with self.lock:
+            self.hit_count += 1
+            if key in self.entries:
+                self.entries.move_to_end(key)
+            else:
+                # written by another process
+                size = os.path.getsize(path)
+                self.entries[key] = size
+                self.total_bytes += size
+        return output_temp_file
+
+    def put(self, key, source_filename):
+        path = self.get_path(key)
+        dirname = os.path.dirname(path)
+        os.makedirs(dirname, exist_ok=True)
+        # write to a temp file in the same directory, then rename, readers never see a partial file
+        fd, temp_path = tempfile.mkstemp(dir=dirname, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                with open(source_filename, 'rb') as source:
+                    shutil.copyfileobj(source, f)
+            os.replace(temp_path, path)
+        except Exception:
+            os.remove(temp_path)
+            raise
+        size = os.path.getsize(path)
+        with self.lock:
+            previous_size = self.entries.pop(key, None)
+            if previous_size != None:
+                self.total_bytes -= previous_size
+            self.entries[key] = size
+            self.total_bytes += size
+            evict_keys = []
+            while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+                evict_key, evict_size = self.entries.popitem(last=False)
+                self.total_bytes -= evict_size
+                evict_keys.append(evict_key)
+            self.eviction_count += len(evict_keys)
+        for evict_key in evict_keys:
+            try:
+                os.remove(self.get_path(evict_key))
+            except FileNotFoundError:
+                pass
+
+    def get_or_generate(self, key, generate_fn, suffix=''):
+        """generate_fn returns a NamedTemporaryFile (the Service.get_tts_audio return value)"""
+        audio_file = self.get(key, suffix)
+        if audio_file != None:
+            return audio_file
+        audio_file = generate_fn()
+        try:
+            self.put(key, audio_file.name)
+        except Exception:
+            # the cache must never break a request
+            logger.exception(f'could not store audio in {self.directory}')
+        return audio_file
+
+    def get_metrics(self):
+        with self.lock:
+            return {
+                'hit_count': self.hit_count,
+                'miss_count': self.miss_count,
+                'eviction_count': self.eviction_count,
+                'file_count': len(self.entries),
+                'total_bytes': self.total_bytes,
+                'max_bytes': self.max_bytes
+            }
@@ -1,11 +1,14 @@
 import json
-import requests
+import asyncio
 import tempfile
 import uuid
 import operator
 import pydub
 import logging
 import pprint
+import time
+import queue
+import threading
 
 import cloudlanguagetools.service
 import cloudlanguagetools.constants
@@ -16,6 +19,9 @@ import cloudlanguagetools.translationlanguage
 import cloudlanguagetools.transliterationlanguage
 import cloudlanguagetools.dictionarylookup
 import cloudlanguagetools.errors
+import cloudlanguagetools.translationbatch
+import cloudlanguagetools.asynchttp
+import cloudlanguagetools.tokenmanager
 
 
 import azure.cognitiveservices.speech
@@ -23,6 +29,21 @@ import azure.cognitiveservices.speech.audio
 
 logger = logging.getLogger(__name__)
 
+# https://learn.microsoft.com/en-us/azure/ai-services/translator/service-limits
+TRANSLATION_BATCH_MAX_ITEMS = 1000
+TRANSLATION_BATCH_MAX_CHARS = 50000
+
+AUDIO_FORMAT_MAP = {
+    cloudlanguagetools.options.AudioFormat.mp3: 'Audio24Khz96KBitRateMonoMp3',
+    cloudlanguagetools.options.AudioFormat.ogg_opus: 'Ogg48Khz16BitMonoOpus'
+}
+
+# X-Microsoft-OutputFormat values of the REST API, same formats as AUDIO_FORMAT_MAP
+AUDIO_FORMAT_REST_MAP = {
+    cloudlanguagetools.options.AudioFormat.mp3: 'audio-24khz-96kbitrate-mono-mp3',
+    cloudlanguagetools.options.AudioFormat.ogg_opus: 'ogg-48khz-16bit-mono-opus'
+}
+
 AUDIO_LOCALE_OVERRIDE_MAP = {
     'sr-Latn-RS': 'sr_RS'
 }
@@ -177,22 +198,157 @@ class AzureDictionaryLookup(cloudlanguagetools.dictionarylookup.DictionaryLookup
     def get_lookup_shortname(self):
         return f'{self.service.name}, {self.language.lang_name}, {self.lookup_type.name}'
 
+class PooledSynthesizer():
+    def __init__(self, speech_config):
+        self.synthesizer = azure.cognitiveservices.speech.SpeechSynthesizer(speech_config=speech_config, audio_config=None)
+        self.connection = azure.cognitiveservices.speech.Connection.from_speech_synthesizer(self.synthesizer)
+        self.disconnected = False
+        self.connection.disconnected.connect(self.on_disconnected)
+        # pre-open the websocket connection, so that the first request doesn't pay for it
+        self.connection.open(False)
+        self.last_used = time.time()
+
+    def on_disconnected(self, event):
+        self.disconnected = True
+
+    def healthy(self):
+        # the service closes idle connections, a synthesizer which was idle for too long would have to reconnect anyway
+        return time.time() - self.last_used < cloudlanguagetools.constants.AzureSynthesizerMaxIdle
+
+    def reconnect_if_needed(self):
+        if self.disconnected:
+            self.disconnected = False
+            self.connection.open(False)
+
+    def close(self):
+        try:
+            self.connection.close()
+        except Exception:
+            logger.exception('could not close azure speech connection')
+
+class SpeechSynthesizerPool():
+    """idle SpeechSynthesizers with open connections, per output format. each synthesizer is used by one request
+    at a time. when all are busy a new one is created, at most max_idle per format are kept afterwards"""
+    def __init__(self, key, region, max_idle=cloudlanguagetools.constants.AzureSynthesizerPoolSize):
+        self.key = key
+        self.region = region
+        self.max_idle = max_idle
+        self.lock = threading.Lock()
+        # output format name -> LifoQueue of PooledSynthesizer, most recently used first
+        self.idle = {}
+        self.created_count = 0
+        self.reused_count = 0
+        self.discarded_count = 0
+        # set by close(), synthesizers checked in afterwards are discarded
+        self.closed = False
+
+    def get_queue(self, output_format):
+        with self.lock:
+            return self.idle.setdefault(output_format, queue.LifoQueue())
+
+    def create(self, output_format):
+        speech_config = azure.cognitiveservices.speech.SpeechConfig(subscription=self.key, region=self.region)
+        speech_config.set_speech_synthesis_output_format(azure.cognitiveservices.speech.SpeechSynthesisOutputFormat[output_format])
+        with self.lock:
+            self.created_count += 1
+        return PooledSynthesizer(speech_config)
+
+    def discard(self, pooled_synthesizer):
+        with self.lock:
+            self.discarded_count += 1
+        pooled_synthesizer.close()
+
+    def checkout(self, output_format) -> PooledSynthesizer:
+        idle_queue = self.get_queue(output_format)
+        while True:
+            try:
+                pooled_synthesizer = idle_queue.get_nowait()
+            except queue.Empty:
+                return self.create(output_format)
+            if pooled_synthesizer.healthy():
+                pooled_synthesizer.reconnect_if_needed()
+                with self.lock:
+                    self.reused_count += 1
+                return pooled_synthesizer
+            self.discard(pooled_synthesizer)
+
+    def checkin(self, output_format, pooled_synthesizer, healthy=True):
+        """return a synthesizer to the pool, healthy=False when the request failed"""
+        idle_queue = self.get_queue(output_format)
+        pooled_synthesizer.last_used = time.time()
+        if not healthy or self.closed or idle_queue.qsize() >= self.max_idle:
+            self.discard(pooled_synthesizer)
+            return
+        idle_queue.put(pooled_synthesizer)
+
+    def warm_up(self, output_format, count):
+        idle_queue = self.get_queue(output_format)
+        while idle_queue.qsize() < min(count, self.max_idle):
+            idle_queue.put(self.create(output_format))
+
+    def close(self):
+        """close the idle synthesizers, the ones in use get closed when they're checked in"""
+        with self.lock:
+            self.closed = True
+            idle_queues = list(self.idle.values())
+        for idle_queue in idle_queues:
+            while True:
+                try:
+                    pooled_synthesizer = idle_queue.get_nowait()
+                except queue.Empty:
+                    break
+                self.discard(pooled_synthesizer)
+
+    def get_stats(self):
+        with self.lock:
+            return {
+                'idle': {output_format: idle_queue.qsize() for output_format, idle_queue in self.idle.items()},
+                'created_count': self.created_count,
+                'reused_count': self.reused_count,
+                'discarded_count': self.discarded_count
+            }
+
 class AzureService(cloudlanguagetools.service.Service):
     def __init__(self):
         self.url_translator_base = 'https://api.cognitive.microsofttranslator.com'
+        # /languages document shared by the translation, transliteration and dictionary lookup catalogs
+        self.supported_languages_lock = threading.Lock()
+        self.supported_languages = None
+        self.supported_languages_etag = None
+        self.supported_languages_timestamp = 0
+        # SpeechSynthesizerPool, created by configure()
+        self.synthesizer_pool = None
 
     def configure(self, config):
         self.key = config['key']
         self.region = config['region']
+        if self.synthesizer_pool != None:
+            # the synthesizers use the previous key
+            self.synthesizer_pool.close()
+        self.synthesizer_pool = SpeechSynthesizerPool(self.key, self.region)
+        # speech REST API, used by aget_tts_audio
+        self.url_tts_base = f'https://{self.region}.tts.speech.microsoft.com'
+        self.token_manager = cloudlanguagetools.tokenmanager.TokenManager(self.fetch_token)
+
+    def load_data(self):
+        if self.synthesizer_pool == None:
+            # not configured
+            return
+        # pre-open connections for the default audio format
+        self.synthesizer_pool.warm_up(AUDIO_FORMAT_MAP[cloudlanguagetools.options.AudioFormat.mp3], cloudlanguagetools.constants.AzureSynthesizerPrewarm)
 
     def get_token(self):
+        return self.token_manager.get_token()
+
+    def fetch_token(self):
         fetch_token_url = f"https://{self.region}.api.cognitive.microsoft.com/sts/v1.0/issueToken"
         headers = {
             'Ocp-Apim-Subscription-Key': self.key
         }
-        response = requests.post(fetch_token_url, headers=headers, timeout=cloudlanguagetools.constants.RequestTimeout)
+        response = self.get_session().post(fetch_token_url, headers=headers)
+        response.raise_for_status()
         access_token = str(response.text)
-        return access_token
+        return access_token, cloudlanguagetools.constants.AzureSpeechTokenLifetime
 
     def get_translator_headers(self):
         headers = {
@@ -203,22 +359,7 @@ class AzureService(cloudlanguagetools.service.Service):
         }
         return headers        
 
-    def get_tts_audio(self, text, voice_key, options):
-
-        audio_format_str = options.get(cloudlanguagetools.options.AUDIO_FORMAT_PARAMETER, cloudlanguagetools.options.AudioFormat.mp3.name)
-        audio_format = cloudlanguagetools.options.AudioFormat[audio_format_str]
-
-        audio_format_map = {
-            cloudlanguagetools.options.AudioFormat.mp3: 'Audio24Khz96KBitRateMonoMp3',
-            cloudlanguagetools.options.AudioFormat.ogg_opus: 'Ogg48Khz16BitMonoOpus'
-        }
-
-        output_temp_file = tempfile.NamedTemporaryFile(prefix=f'cloudlanguage_tools_{self.__class__.__name__}_audio', suffix=f'.{audio_format.name}')
-        output_temp_filename = output_temp_file.name
-        speech_config = azure.cognitiveservices.speech.SpeechConfig(subscription=self.key, region=self.region)
-        speech_config.set_speech_synthesis_output_format(azure.cognitiveservices.speech.SpeechSynthesisOutputFormat[audio_format_map[audio_format]])
-        synthesizer = azure.cognitiveservices.speech.SpeechSynthesizer(speech_config=speech_config, audio_config=None)
-
+    def get_ssml(self, text, voice_key, options):
         default_pitch = 0
         default_rate = 1.0
 
@@ -245,31 +386,84 @@ class AzureService(cloudlanguagetools.service.Service):
 {prosody_end_str}
 </voice>
 </speak>""".replace('\n', '')
+        return ssml_str
+
+    def get_tts_audio(self, text, voice_key, options):
+
+        audio_format_str = options.get(cloudlanguagetools.options.AUDIO_FORMAT_PARAMETER, cloudlanguagetools.options.AudioFormat.mp3.name)
+        audio_format = cloudlanguagetools.options.AudioFormat[audio_format_str]
+
+        output_format = AUDIO_FORMAT_MAP[audio_format]
+
+        output_temp_file = tempfile.NamedTemporaryFile(prefix=f'cloudlanguage_tools_{self.__class__.__name__}_audio', suffix=f'.{audio_format.name}')
+        output_temp_filename = output_temp_file.name
+
+        ssml_str = self.get_ssml(text, voice_key, options)
 
         # print(f'[{ssml_str}] len: {len(ssml_str)}')
 
-        result = synthesizer.speak_ssml(ssml_str)
+        # checked in to the pool it came from, configure() may replace the pool in the meantime
+        synthesizer_pool = self.synthesizer_pool
+        pooled_synthesizer = synthesizer_pool.checkout(output_format)
+        try:
+            result = pooled_synthesizer.synthesizer.speak_ssml(ssml_str)
+        except Exception:
+            synthesizer_pool.checkin(output_format, pooled_synthesizer, healthy=False)
+            raise
         if result.reason != azure.cognitiveservices.speech.ResultReason.SynthesizingAudioCompleted:
+            # don't reuse a synthesizer whose request failed, its connection may be broken
+            synthesizer_pool.checkin(output_format, pooled_synthesizer, healthy=False)
             error_message = f'Could not generate audio: {result.cancellation_details.reason} {result.cancellation_details.error_details}'
             raise cloudlanguagetools.errors.RequestError(error_message)
+        synthesizer_pool.checkin(output_format, pooled_synthesizer)
 
         stream = azure.cognitiveservices.speech.AudioDataStream(result)
         stream.save_to_wav_file(output_temp_filename)
 
         return output_temp_file
 
+    async def aget_tts_audio(self, text, voice_key, options):
+        """speech REST API with a bearer token, rather than the speech SDK which blocks a thread per request"""
+        audio_format_str = options.get(cloudlanguagetools.options.AUDIO_FORMAT_PARAMETER, cloudlanguagetools.options.AudioFormat.mp3.name)
+        audio_format = cloudlanguagetools.options.AudioFormat[audio_format_str]
+        url = f'{self.url_tts_base}/cognitiveservices/v1'
+        ssml_str = self.get_ssml(text, voice_key, options)
+        for attempt in range(2):
+            # only blocks when the token needs to be fetched
+            token = await asyncio.to_thread(self.get_token)
+            headers = {
+                'Authorization': f'Bearer {token}',
+                'Content-Type': 'application/ssml+xml',
+                'X-Microsoft-OutputFormat': AUDIO_FORMAT_REST_MAP[audio_format],
+                'User-Agent': 'cloudlanguagetools'
+            }
+            async with cloudlanguagetools.asynchttp.get_session().post(url, headers=headers, data=ssml_str.encode('utf-8')) as response:
+                if response.status == 401 and attempt == 0:
+                    # the token was rejected, get a new one
+                    self.token_manager.invalidate()
+                    continue
+                if response.status != 200:
+                    error_message = f'Could not generate audio: {response.status} {await response.text()}'
+                    raise cloudlanguagetools.errors.RequestError(error_message)
+                return cloudlanguagetools.asynchttp.write_temp_file(await response.read(),
+                    prefix=f'cloudlanguage_tools_{self.__class__.__name__}_audio', suffix=f'.{audio_format.name}')
+
     def get_tts_voice_list(self):
         # returns list of TtSVoice
 
-        token = self.get_token()
-
         base_url = f'https://{self.region}.tts.speech.microsoft.com/'
         path = 'cognitiveservices/voices/list'
         constructed_url = base_url + path
-        headers = {
-            'Authorization': 'Bearer ' + token,
-        }        
-        response = requests.get(constructed_url, headers=headers)
+        for attempt in range(2):
+            headers = {
+                'Authorization': 'Bearer ' + self.get_token(),
+            }
+            response = self.get_session().get(constructed_url, headers=headers)
+            if response.status_code == 401 and attempt == 0:
+                # the token was rejected, get a new one
+                self.token_manager.invalidate()
+                continue
+            break
         if response.status_code == 200:
             voice_list = json.loads(response.content)
             result = []
@@ -290,7 +484,7 @@ class AzureService(cloudlanguagetools.service.Service):
         body = [{
             'text': text
         }]
-        request = requests.post(url, headers=self.get_translator_headers(), json=body, timeout=cloudlanguagetools.constants.RequestTimeout)
+        request = self.get_session().post(url, headers=self.get_translator_headers(), json=body)
         response = request.json()
 
         if 'error' in response:
@@ -299,9 +493,49 @@ class AzureService(cloudlanguagetools.service.Service):
 
         return response[0]['translations'][0]['text']
 
+    async def aget_translation(self, text, from_language_key, to_language_key):
+        url = f'{self.url_translator_base}/translate?api-version=3.0&to={to_language_key}&from={from_language_key}'
+        body = [{
+            'text': text
+        }]
+        async with cloudlanguagetools.asynchttp.get_session().post(url, headers=self.get_translator_headers(), json=body) as response:
+            response_data = await response.json()
+
+        if 'error' in response_data:
+            error_message = f'Azure: could not translate text [{text}] from {from_language_key} to {to_language_key} ({response_data})'
+            raise cloudlanguagetools.errors.RequestError(error_message)
+
+        return response_data[0]['translations'][0]['text']
+
+    def get_translation_batch(self, texts, from_language_key, to_language_key):
+        url = f'{self.url_translator_base}/translate?api-version=3.0&to={to_language_key}&from={from_language_key}'
+
+        def translate_chunk(chunk_texts):
+            body = [{'text': text} for text in chunk_texts]
+            request = self.get_session().post(url, headers=self.get_translator_headers(), json=body)
+            response = request.json()
+            if 'error' in response:
+                error_message = f'Azure: could not translate {len(chunk_texts)} texts from {from_language_key} to {to_language_key} ({response})'
+                raise cloudlanguagetools.errors.RequestError(error_message)
+            return [item['translations'][0]['text'] for item in response]
+
+        return cloudlanguagetools.translationbatch.translate_chunked(texts, TRANSLATION_BATCH_MAX_ITEMS, TRANSLATION_BATCH_MAX_CHARS, translate_chunk)
+
     def get_transliteration(self, text, transliteration_key):
         return self.transliteration(text, transliteration_key['language_id'], transliteration_key['from_script'], transliteration_key['to_script'])
 
+    async def aget_transliteration(self, text, transliteration_key):
+        url = f'{self.url_translator_base}/transliterate?api-version=3.0'
+        url += f"&language={transliteration_key['language_id']}&fromScript={transliteration_key['from_script']}&toScript={transliteration_key['to_script']}"
+        body = [{
+            'text': text
+        }]
+        async with cloudlanguagetools.asynchttp.get_session().post(url, headers=self.get_translator_headers(), json=body) as response:
+            response_data = await response.json()
+
+        assert(len(response_data) == 1)
+        return response_data[0]['text']
+
     def get_translation_language_list(self):
         azure_data = self.get_supported_languages()
         result = []
@@ -332,21 +566,37 @@ class AzureService(cloudlanguagetools.service.Service):
 
 
     def get_supported_languages(self):
-        url = 'https://api.cognitive.microsofttranslator.com/languages?api-version=3.0'
-
-        # If you encounter any issues with the base_url or path, make sure
-        # that you are using the latest endpoint: https://docs.microsoft.com/azure/cognitive-services/translator/reference/v3-0-languages
-        path = '/languages?api-version=3.0'
-
-        headers = {
-            'Content-type': 'application/json',
-            'X-ClientTraceId': str(uuid.uuid4())
-        }
-
-        request = requests.get(url, headers=headers)
-        response = request.json()
+        """the /languages document, fetched once for all three catalogs. after AzureSupportedLanguagesTTL
+        it is revalidated with If-None-Match, the service answers 304 when it hasn't changed"""
+        # the lock also makes catalog builders running concurrently wait for a single download
+        with self.supported_languages_lock:
+            if self.supported_languages != None and time.time() - self.supported_languages_timestamp < cloudlanguagetools.constants.AzureSupportedLanguagesTTL:
+                return self.supported_languages
+
+            # If you encounter any issues with the base_url or path, make sure
+            # that you are using the latest endpoint: https://docs.microsoft.com/azure/cognitive-services/translator/reference/v3-0-languages
+            url = f'{self.url_translator_base}/languages?api-version=3.0'
+            headers = {
+                'Content-type': 'application/json',
+                'X-ClientTraceId': str(uuid.uuid4())
+            }
+            if self.supported_languages != None and self.supported_languages_etag != None:
+                headers['If-None-Match'] = self.supported_languages_etag
 
-        return response
+            try:
+                response = self.get_session().get(url, headers=headers)
+                if response.status_code == 304:
+                    logger.debug('azure supported languages not modified')
+                else:
+                    response.raise_for_status()
+                    self.supported_languages = response.json()
+                    self.supported_languages_etag = response.headers.get('ETag', None)
+            except Exception:
+                if self.supported_languages == None:
+                    raise
+                logger.exception('could not revalidate azure supported languages, using the previous version')
+            self.supported_languages_timestamp = time.time()
+            return self.supported_languages
 
         # print(json.dumps(response, sort_keys=True, indent=4, ensure_ascii=False, separators=(',', ': ')))        
 
@@ -355,7 +605,7 @@ class AzureService(cloudlanguagetools.service.Service):
         url = f'{self.url_translator_base}/detect?api-version=3.0'
         body = [{'text': text} for text in text_list]
 
-        request = requests.post(url, headers=self.get_translator_headers(), json=body, timeout=cloudlanguagetools.constants.RequestTimeout)
+        request = self.get_session().post(url, headers=self.get_translator_headers(), json=body)
         response = request.json()
 
         language_score = {}
@@ -377,7 +627,7 @@ class AzureService(cloudlanguagetools.service.Service):
         body = [{
             'text': text
         }]
-        request = requests.post(constructed_url, headers=self.get_translator_headers(), json=body, timeout=cloudlanguagetools.constants.RequestTimeout)
+        request = self.get_session().post(constructed_url, headers=self.get_translator_headers(), json=body)
         response = request.json()
 
         assert(len(response) == 1)
@@ -459,7 +709,7 @@ class AzureService(cloudlanguagetools.service.Service):
         body = [{
             'text': text
         }]
-        request = requests.post(url, headers=self.get_translator_headers(), json=body, timeout=cloudlanguagetools.constants.RequestTimeout)
+        request = self.get_session().post(url, headers=self.get_translator_headers(), json=body)
         response = request.json()
         if len(response) > 1:
             raise Exception(f'more than one response entries, {url}, {text}')
@@ -505,18 +755,36 @@ class AzureService(cloudlanguagetools.service.Service):
 
         return result
 
-    def get_dictionary_lookup(self, text, lookup_key):
+    def get_collect_result_fn(self, lookup_key):
         lookup_type = cloudlanguagetools.constants.DictionaryLookupType[lookup_key['lookup_type']]
         lookup_type_fn_map = {
             cloudlanguagetools.constants.DictionaryLookupType.Definitions: self.collect_definitions,
             cloudlanguagetools.constants.DictionaryLookupType.PartOfSpeech: self.collect_partofspeech,
             cloudlanguagetools.constants.DictionaryLookupType.PartOfSpeechDefinitions: self.collect_partofspeech_definitions,
         }
-        lookup_fn = lookup_type_fn_map[lookup_type]
+        return lookup_type_fn_map[lookup_type]
+
+    def get_dictionary_lookup(self, text, lookup_key):
+        lookup_fn = self.get_collect_result_fn(lookup_key)
         generator = self.iterate_dictionary_results(text, lookup_key)
 
         return self.collect_result_check_empty(generator, lookup_fn, text)
 
+    async def aget_dictionary_lookup(self, text, lookup_key):
+        lookup_fn = self.get_collect_result_fn(lookup_key)
+        from_language_code = lookup_key['source_language_code']
+        to_language_code = lookup_key['target_language_code']
+        url = f'{self.url_translator_base}/dictionary/lookup?api-version=3.0&to={to_language_code}&from={from_language_code}'
+        body = [{
+            'text': text
+        }]
+        async with cloudlanguagetools.asynchttp.get_session().post(url, headers=self.get_translator_headers(), json=body) as response:
+            response_data = await response.json()
+        if len(response_data) > 1:
+            raise Exception(f'more than one response entries, {url}, {text}')
+
+        return self.collect_result_check_empty(response_data[0]['translations'], lookup_fn, text)
+
 
     def custom_dictionary_lookup(self, input_text, from_language_key, to_language_key):
         base_url = f'{self.url_translator_base}/dictionary/lookup?api-version=3.0'
@@ -529,7 +797,7 @@ class AzureService(cloudlanguagetools.service.Service):
         body = [{
             'text': input_text
         }]
-        request = requests.post(url, headers=self.get_translator_headers(), json=body, timeout=cloudlanguagetools.constants.RequestTimeout)
+        request = self.get_session().post(url, headers=self.get_translator_headers(), json=body)
         response = request.json()
 
         pprint.pprint(response)
@@ -556,7 +824,7 @@ class AzureService(cloudlanguagetools.service.Service):
             'text': input_text,
             'translation': translation
         }]
-        request = requests.post(url, headers=self.get_translator_headers(), json=body, timeout=cloudlanguagetools.constants.RequestTimeout)
+        request = self.get_session().post(url, headers=self.get_translator_headers(), json=body)
         response = request.json()
 
         print(json.dumps(response, sort_keys=True, indent=4, ensure_ascii=False, separators=(',', ': ')))
@@ -0,0 +1,225 @@
+"""options offered by every service (voices, translation languages, etc), each (service, catalog type) slice
+is fetched and cached independently, so that a slow or failing service doesn't hold up the others"""
+
+import enum
+import time
+import timeit
+import logging
+import threading
+import concurrent.futures
+
+import cloudlanguagetools.constants
+import cloudlanguagetools.catalogindex
+import cloudlanguagetools.catalogstore
+
+logger = logging.getLogger(__name__)
+
+class CatalogType(enum.Enum):
+    def __init__(self, method_name):
+        # name of the method on cloudlanguagetools.service.Service which retrieves this catalog
+        self.method_name = method_name
+    tts_voice_list = ('get_tts_voice_list')
+    translation_language_list = ('get_translation_language_list')
+    transliteration_language_list = ('get_transliteration_language_list')
+    tokenization_options = ('get_tokenization_options')
+    dictionary_lookup_list = ('get_dictionary_lookup_list')
+
+class CatalogSlice():
+    def __init__(self, entries, ttl, timestamp=None):
+        self.entries = entries
+        self.ttl = ttl
+        self.timestamp = timestamp
+        if self.timestamp == None:
+            self.timestamp = time.time()
+
+    def expired(self):
+        return time.time() - self.timestamp > self.ttl
+
+class SliceMetrics():
+    def __init__(self):
+        self.refresh_count = 0
+        self.failure_count = 0
+        self.last_refresh_duration = None
+        self.last_error = None
+
+    def json_obj(self):
+        return {
+            'refresh_count': self.refresh_count,
+            'failure_count': self.failure_count,
+            'last_refresh_duration': self.last_refresh_duration,
+            'last_error': self.last_error
+        }
+
+class Catalog():
+    """thread-safe, stale-while-revalidate cache of the catalog slices.
+    a slice which has never been retrieved blocks the caller, an expired slice keeps being served while a single
+    background task per slice retrieves the new version"""
+    def __init__(self, services):
+        # reference to the ServiceManager's services dict
+        self.services = services
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=cloudlanguagetools.constants.CatalogMaxWorkers,
+            thread_name_prefix='cloudlanguagetools_catalog')
+        # protects everything below
+        self.lock = threading.Lock()
+        # (service enum, CatalogType) -> CatalogSlice
+        self.slices = {}
+        # (service enum, CatalogType) -> Future, for slices currently being retrieved (single-flight)
+        self.inflight = {}
+        # CatalogType -> (version, combined list of entries)
+        self.combined = {}
+        # incremented every time a slice gets replaced
+        self.version = 0
+        # only one thread rebuilds the index at a time
+        self.index_lock = threading.Lock()
+        self.index = None
+        # (service enum, CatalogType) -> SliceMetrics
+        self.metrics = {}
+        self.stale_served_count = 0
+        # CatalogStore, when the catalog is persisted to disk
+        self.store = None
+
+    def get_ttl(self, service_enum):
+        return self.services.get_service_class(service_enum).CATALOG_TTL
+
+    def fetch_slice_entries(self, service_enum, catalog_type: CatalogType):
+        logger.info(f'retrieving {catalog_type.name} from {service_enum.name}')
+        service = self.services[service_enum]
+        return list(getattr(service, catalog_type.method_name)())
+
+    def refresh_slice(self, service_enum, catalog_type: CatalogType):
+        """retrieve one slice, runs on the catalog thread pool.
+        if the service fails, its last good slice is kept and retried after CatalogRetryInterval"""
+        key = (service_enum, catalog_type)
+        starttime = timeit.default_timer()
+        entries = None
+        error = None
+        try:
+            entries = self.fetch_slice_entries(service_enum, catalog_type)
+        except Exception as e:
+            logger.exception(f'could not retrieve {catalog_type.name} from {service_enum.name}')
+            error = str(e)
+        time_diff = timeit.default_timer() - starttime
+
+        with self.lock:
+            metrics = self.metrics.setdefault(key, SliceMetrics())
+            metrics.refresh_count += 1
+            metrics.last_refresh_duration = time_diff
+            if error == None:
+                logger.info(f'retrieved {len(entries)} {catalog_type.name} entries from {service_enum.name} in {time_diff:.1f}s')
+                catalog_slice = CatalogSlice(entries, self.get_ttl(service_enum))
+                self.slices[key] = catalog_slice
+                self.version += 1
+            else:
+                metrics.failure_count += 1
+                metrics.last_error = error
+                previous_slice = self.slices.get(key, None)
+                if previous_slice != None:
+                    logger.warning(f'keeping last good {catalog_type.name} for {service_enum.name}, {len(previous_slice.entries)} entries')
+                    entries = previous_slice.entries
+                else:
+                    entries = []
+                    self.version += 1
+                self.slices[key] = CatalogSlice(entries, cloudlanguagetools.constants.CatalogRetryInterval)
+            del self.inflight[key]
+
+        if error == None and self.store != None:
+            try:
+                self.store.save(service_enum.name, catalog_type.name, catalog_slice.timestamp, entries)
+            except Exception:
+                logger.exception(f'could not save {catalog_type.name} for {service_enum.name} to {self.store.path}')
+
+    def load_store(self, path):
+        """load the slices saved in that file, and save slices there when they get refreshed.
+        loaded slices keep their original timestamp, expired ones are served while being refreshed in the background"""
+        self.store = cloudlanguagetools.catalogstore.CatalogStore(path)
+        try:
+            saved_slices = self.store.load()
+        except Exception:
+            logger.exception(f'could not load catalog from {path}')
+            return
+        with self.lock:
+            for service_name, catalog_type_name, timestamp, entries in saved_slices:
+                service_enum = cloudlanguagetools.constants.Service.__members__.get(service_name, None)
+                catalog_type = CatalogType.__members__.get(catalog_type_name, None)
+                if service_enum not in self.services or catalog_type == None:
+                    continue
+                key = (service_enum, catalog_type)
+                if key in self.slices:
+                    continue
+                self.slices[key] = CatalogSlice(entries, self.get_ttl(service_enum), timestamp=timestamp)
+                self.version += 1
+
+    def refresh(self, catalog_types, force=False):
+        """start retrieving all missing or expired slices of the given catalog types concurrently.
+        waits for slices which have never been retrieved, or for all slices if force is set.
+        expired slices are refreshed in the background"""
+        wait_futures = []
+        with self.lock:
+            for service_enum in list(self.services.keys()):
+                for catalog_type in catalog_types:
+                    key = (service_enum, catalog_type)
+                    catalog_slice = self.slices.get(key, None)
+                    if not force and catalog_slice != None and not catalog_slice.expired():
+                        continue
+                    future = self.inflight.get(key, None)
+                    if future == None:
+                        future = self.executor.submit(self.refresh_slice, service_enum, catalog_type)
+                        self.inflight[key] = future
+                    if force or catalog_slice == None:
+                        wait_futures.append(future)
+                    else:
+                        self.stale_served_count += 1
+        concurrent.futures.wait(wait_futures)
+
+    def get_entries(self, catalog_type: CatalogType):
+        """return the entries for that catalog type across all services"""
+        self.refresh([catalog_type])
+
+        with self.lock:
+            combined_version, combined_entries = self.combined.get(catalog_type, (None, None))
+            if combined_version == self.version:
+                return combined_entries
+
+            result = []
+            for service_enum in self.services.keys():
+                catalog_slice = self.slices.get((service_enum, catalog_type), None)
+                if catalog_slice != None:
+                    result.extend(catalog_slice.entries)
+            self.combined[catalog_type] = (self.version, result)
+            return result
+
+    def get_index(self):
+        """return a CatalogIndex over all catalog types, rebuilt only when the catalog has changed"""
+        self.refresh(list(CatalogType))
+        index = self.index
+        if index != None and index.version == self.version:
+            return index
+
+        with self.index_lock:
+            # another thread may have rebuilt it in the meantime
+            index = self.index
+            version = self.version
+            if index != None and index.version == version:
+                return index
+            index = cloudlanguagetools.catalogindex.CatalogIndex(version,
+                self.get_entries(CatalogType.tts_voice_list),
+                self.get_entries(CatalogType.translation_language_list),
+                self.get_entries(CatalogType.transliteration_language_list),
+                self.get_entries(CatalogType.tokenization_options),
+                self.get_entries(CatalogType.dictionary_lookup_list))
+            logger.info(f'built catalog index for version {version}')
+            self.index = index
+            return index
+
+    def get_metrics(self):
+        """refresh counts, durations and failures, for monitoring"""
+        with self.lock:
+            return {
+                'version': self.version,
+                'refresh_count': sum([x.refresh_count for x in self.metrics.values()]),
+                'failure_count': sum([x.failure_count for x in self.metrics.values()]),
+                'refresh_in_progress': len(self.inflight),
+                'stale_served_count': self.stale_served_count,
+                'slices': {f'{service_enum.name}.{catalog_type.name}': metrics.json_obj()
+                    for (service_enum, catalog_type), metrics in self.metrics.items()}
+            }
@@ -0,0 +1,76 @@
+"""immutable lookup tables over the catalog, rebuilt whenever the catalog changes. lookups return tuples, in catalog order"""
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+EMPTY = ()
+
+def build_index(entries, key_fns):
+    """key_fns: list of functions returning the key for an entry, one index entry per function"""
+    index = {}
+    for entry in entries:
+        for key_fn in key_fns:
+            index.setdefault(key_fn(entry), []).append(entry)
+    return {key: tuple(value) for key, value in index.items()}
+
+class CatalogIndex():
+    def __init__(self, version, tts_voice_list, translation_language_list, transliteration_language_list,
+                 tokenization_options, dictionary_lookup_list):
+        # catalog version this index was built from
+        self.version = version
+
+        self.voices = build_index(tts_voice_list, [
+            lambda x: (x.audio_language, None, None),
+            lambda x: (x.audio_language, x.service, None),
+            lambda x: (x.audio_language, x.service, x.gender),
+        ])
+        self.translation = build_index(translation_language_list, [
+            lambda x: (x.language, None),
+            lambda x: (x.language, x.service),
+        ])
+        self.transliteration = build_index(transliteration_language_list, [
+            lambda x: (x.language, None),
+            lambda x: (x.language, x.service),
+        ])
+        self.tokenization = build_index(tokenization_options, [
+            lambda x: (x.language, None),
+            lambda x: (x.language, x.service),
+        ])
+        self.dictionary_lookup = build_index(dictionary_lookup_list, [
+            lambda x: (x.language, x.target_language, None),
+            lambda x: (x.language, x.target_language, x.service),
+        ])
+
+        # services available for each language
+        self.translation_services = {language: frozenset([x.service for x in entries])
+            for (language, service), entries in self.translation.items() if service == None}
+        self.voice_services = {audio_language: frozenset([x.service for x in entries])
+            for (audio_language, service, gender), entries in self.voices.items() if service == None}
+        # genders available for each audio language / service
+        self.voice_genders = {(audio_language, service): frozenset([x.gender for x in entries])
+            for (audio_language, service, gender), entries in self.voices.items() if service != None and gender == None}
+
+    def get_voices(self, audio_language, service=None, gender=None):
+        return self.voices.get((audio_language, service, gender), EMPTY)
+
+    def get_voice_services(self, audio_language):
+        return self.voice_services.get(audio_language, frozenset())
+
+    def get_voice_genders(self, audio_language, service):
+        return self.voice_genders.get((audio_language, service), frozenset())
+
+    def get_translation_options(self, language, service=None):
+        return self.translation.get((language, service), EMPTY)
+
+    def get_translation_services(self, language):
+        return self.translation_services.get(language, frozenset())
+
+    def get_transliteration_options(self, language, service=None):
+        return self.transliteration.get((language, service), EMPTY)
+
+    def get_tokenization_options(self, language, service=None):
+        return self.tokenization.get((language, service), EMPTY)
+
+    def get_dictionary_lookup_options(self, language, target_language, service=None):
+        return self.dictionary_lookup.get((language, target_language, service), EMPTY)
@@ -0,0 +1,193 @@
+"""on-disk copy (sqlite) of the last good catalog slices, so that a new process can serve language data right away.
+entries are stored as their json_obj() dicts and loaded back as the Stored* classes"""
+
+import os
+import json
+import sqlite3
+import logging
+import timeit
+
+import cloudlanguagetools.constants
+import cloudlanguagetools.languages
+import cloudlanguagetools.ttsvoice
+import cloudlanguagetools.translationlanguage
+import cloudlanguagetools.transliterationlanguage
+import cloudlanguagetools.tokenization
+import cloudlanguagetools.dictionarylookup
+
+logger = logging.getLogger(__name__)
+
+class StoredTtsVoice(cloudlanguagetools.ttsvoice.TtsVoice):
+    def __init__(self, data):
+        self.data = data
+        self.service = cloudlanguagetools.constants.Service[data['service']]
+        self.service_fee = cloudlanguagetools.constants.ServiceFee[data['service_fee']]
+        self.gender = cloudlanguagetools.constants.Gender[data['gender']]
+        self.audio_language = cloudlanguagetools.languages.AudioLanguage[data['audio_language_code']]
+
+    def get_voice_key(self):
+        return self.data['voice_key']
+
+    def get_voice_shortname(self):
+        return self.data['voice_name']
+
+    def get_voice_description(self):
+        return self.data['voice_description']
+
+    def get_options(self):
+        return self.data['options']
+
+    def json_obj(self):
+        return self.data
+
+class StoredTranslationLanguage(cloudlanguagetools.translationlanguage.TranslationLanguage):
+    def __init__(self, data):
+        self.data = data
+        self.service = cloudlanguagetools.constants.Service[data['service']]
+        self.service_fee = cloudlanguagetools.constants.ServiceFee[data['service_fee']]
+        self.language = cloudlanguagetools.languages.Language[data['language_code']]
+
+    def get_language_id(self):
+        return self.data['language_id']
+
+    def json_obj(self):
+        return self.data
+
+class StoredTransliterationLanguage(cloudlanguagetools.transliterationlanguage.TransliterationLanguage):
+    def __init__(self, data):
+        self.data = data
+        self.service = cloudlanguagetools.constants.Service[data['service']]
+        self.service_fee = cloudlanguagetools.constants.ServiceFee[data['service_fee']]
+        self.language = cloudlanguagetools.languages.Language[data['language_code']]
+
+    def get_transliteration_name(self):
+        return self.data['transliteration_name']
+
+    def get_transliteration_shortname(self):
+        return self.data['transliteration_shortname']
+
+    def get_transliteration_key(self):
+        return self.data['transliteration_key']
+
+    def json_obj(self):
+        return self.data
+
+class StoredTokenization(cloudlanguagetools.tokenization.Tokenization):
+    def __init__(self, data, service_fee):
+        self.data = data
+        self.service = cloudlanguagetools.constants.Service[data['service']]
+        self.service_fee = cloudlanguagetools.constants.ServiceFee[service_fee]
+        self.language = cloudlanguagetools.languages.Language[data['language_code']]
+
+    def get_tokenization_name(self):
+        return self.data['tokenization_name']
+
+    def get_tokenization_key(self):
+        return self.data['tokenization_key']
+
+    def json_obj(self):
+        return self.data
+
+class StoredDictionaryLookup(cloudlanguagetools.dictionarylookup.DictionaryLookup):
+    def __init__(self, data, target_language_code):
+        self.data = data
+        self.service = cloudlanguagetools.constants.Service[data['service']]
+        self.service_fee = cloudlanguagetools.constants.ServiceFee[data['service_fee']]
+        self.language = cloudlanguagetools.languages.Language[data['language_code']]
+        self.target_language = cloudlanguagetools.languages.Language[target_language_code]
+
+    def get_lookup_name(self):
+        return self.data['lookup_name']
+
+    def get_lookup_shortname(self):
+        return self.data['lookup_shortname']
+
+    def get_lookup_key(self):
+        return self.data['lookup_key']
+
+    def json_obj(self):
+        return self.data
+
+def encode_entry(catalog_type_name, entry):
+    """json_obj(), plus the attributes used for routing which aren't part of it"""
+    result = {'json_obj': entry.json_obj()}
+    if catalog_type_name == 'tokenization_options':
+        result['service_fee'] = entry.service_fee.name
+    if catalog_type_name == 'dictionary_lookup_list':
+        result['target_language_code'] = entry.target_language.name
+    return result
+
+def decode_entry(catalog_type_name, encoded_entry):
+    data = encoded_entry['json_obj']
+    if catalog_type_name == 'tts_voice_list':
+        return StoredTtsVoice(data)
+    if catalog_type_name == 'translation_language_list':
+        return StoredTranslationLanguage(data)
+    if catalog_type_name == 'transliteration_language_list':
+        return StoredTransliterationLanguage(data)
+    if catalog_type_name == 'tokenization_options':
+        return StoredTokenization(data, encoded_entry['service_fee'])
+    if catalog_type_name == 'dictionary_lookup_list':
+        return StoredDictionaryLookup(data, encoded_entry['target_language_code'])
+    raise ValueError(f'unknown catalog type {catalog_type_name}')
+
+class CatalogStore():
+    def __init__(self, path):
+        self.path = path
+
+    def get_connection(self):
+        connection = sqlite3.connect(self.path, timeout=10)
+        connection.execute('CREATE TABLE IF NOT EXISTS metadata (key text PRIMARY KEY, value text)')
+        connection.execute('''CREATE TABLE IF NOT EXISTS slices (service text, catalog_type text, timestamp real, entries text,
+            PRIMARY KEY (service, catalog_type))''')
+        return connection
+
+    def check_rev(self, connection):
+        """returns true if the file was written with the current revision. an empty file gets the current revision"""
+        row = connection.execute("SELECT value FROM metadata WHERE key='rev'").fetchone()
+        if row == None:
+            with connection:
+                connection.execute("INSERT OR REPLACE INTO metadata VALUES ('rev', ?)", (cloudlanguagetools.constants.CatalogStoreRev,))
+            return True
+        return row[0] == cloudlanguagetools.constants.CatalogStoreRev
+
+    def load(self):
+        """return a list of (service name, catalog type name, timestamp, entries)"""
+        if not os.path.exists(self.path):
+            logger.info(f'no catalog file at {self.path}')
+            return []
+        starttime = timeit.default_timer()
+        result = []
+        connection = self.get_connection()
+        try:
+            if not self.check_rev(connection):
+                logger.warning(f'catalog file {self.path} has a different revision, ignoring')
+                return []
+            for service_name, catalog_type_name, timestamp, entries_json in connection.execute('SELECT * FROM slices'):
+                try:
+                    entries = [decode_entry(catalog_type_name, encoded_entry) for encoded_entry in json.loads(entries_json)]
+                except Exception:
+                    # for example a language or service which doesn't exist anymore, the slice gets retrieved again
+                    logger.exception(f'could not load {catalog_type_name} for {service_name} from {self.path}')
+                    continue
+                result.append((service_name, catalog_type_name, timestamp, entries))
+        finally:
+            connection.close()
+        time_diff = timeit.default_timer() - starttime
+        logger.info(f'loaded {len(result)} catalog slices from {self.path} in {time_diff:.3f}s')
+        return result
+
+    def save(self, service_name, catalog_type_name, timestamp, entries):
+        entries_json = json.dumps([encode_entry(catalog_type_name, entry) for entry in entries], ensure_ascii=False)
+        connection = self.get_connection()
+        try:
+            if not self.check_rev(connection):
+                # file from another revision, start over
+                with connection:
+                    connection.execute('DELETE FROM slices')
+                    connection.execute("INSERT OR REPLACE INTO metadata VALUES ('rev', ?)", (cloudlanguagetools.constants.CatalogStoreRev,))
+            with connection:
+                connection.execute('INSERT OR REPLACE INTO slices VALUES (?, ?, ?, ?)',
+                    (service_name, catalog_type_name, timestamp, entries_json))
+        finally:
+            connection.close()
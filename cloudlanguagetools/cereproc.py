@@ -1,5 +1,5 @@
 import json
-import requests
+import asyncio
 import tempfile
 import logging
 import os
@@ -12,6 +12,8 @@ import cloudlanguagetools.ttsvoice
 import cloudlanguagetools.translationlanguage
 import cloudlanguagetools.transliterationlanguage
 import cloudlanguagetools.errors
+import cloudlanguagetools.tokenmanager
+import cloudlanguagetools.asynchttp
 
 
 def get_audio_language_enum(language_iso, country_iso):
@@ -50,38 +52,49 @@ class CereProcVoice(cloudlanguagetools.ttsvoice.TtsVoice):
 
 class CereProcService(cloudlanguagetools.service.Service):
     def __init__(self):
-        pass
+        self.url_base = 'https://api.cerevoice.com'
 
     def configure(self, config):
         self.username = config['username']
         self.password = config['password']
+        self.token_manager = cloudlanguagetools.tokenmanager.TokenManager(self.fetch_access_token)
     
 
     def get_access_token(self):
+        return self.token_manager.get_token()
+
+    def fetch_access_token(self):
         combined = f'{self.username}:{self.password}'
         auth_string = base64.b64encode(combined.encode('utf-8')).decode('utf-8')
         headers = {'authorization': f'Basic {auth_string}'}
 
-        auth_url = 'https://api.cerevoice.com/v2/auth'
-        response = requests.get(auth_url, headers=headers, 
-            timeout=cloudlanguagetools.constants.RequestTimeout)
+        auth_url = f'{self.url_base}/v2/auth'
+        response = self.get_session().get(auth_url, headers=headers)
         response.raise_for_status()
 
-        access_token = response.json()['access_token']        
-        return access_token
+        data = response.json()
+        return data['access_token'], data.get('expires_in', cloudlanguagetools.constants.CereProcTokenLifetime)
     
     def get_auth_headers(self):
         headers={'Authorization': f'Bearer {self.get_access_token()}'}
         return headers
 
+    def authenticated_request(self, method, url, **kwargs):
+        """request with the bearer token, if the token is rejected, get a new one and retry once"""
+        response = self.get_session().request(method, url, headers=self.get_auth_headers(), **kwargs)
+        if response.status_code == 401:
+            self.token_manager.invalidate()
+            response = self.get_session().request(method, url, headers=self.get_auth_headers(), **kwargs)
+        return response
+
     def get_translation_language_list(self):
         return []
 
     def list_voices(self):
-        list_voices_url = 'https://api.cerevoice.com/v2/voices'
+        list_voices_url = f'{self.url_base}/v2/voices'
         
-        response = requests.get(list_voices_url, headers=self.get_auth_headers(), 
-            timeout=(cloudlanguagetools.constants.ReadTimeout, cloudlanguagetools.constants.RequestTimeout))
+        response = self.authenticated_request('GET', list_voices_url)
+        response.raise_for_status()
         data = response.json()
         return data['voices']
 
@@ -97,19 +110,19 @@ class CereProcService(cloudlanguagetools.service.Service):
 
         return result
 
+    def get_ssml(self, text):
+        return f"""<?xml version="1.0" encoding="UTF-8"?>
+<speak xmlns="http://www.w3.org/2001/10/synthesis">{text}</speak>""".encode(encoding='utf-8')
+
     def get_tts_audio(self, text, voice_key, options):
         output_temp_file = tempfile.NamedTemporaryFile()
         output_temp_filename = output_temp_file.name
 
         voice_name = voice_key['name']
-        url = f'https://api.cerevoice.com/v2/speak?voice={voice_name}&audio_format=mp3'
-
-
-        ssml_text = f"""<?xml version="1.0" encoding="UTF-8"?>
-<speak xmlns="http://www.w3.org/2001/10/synthesis">{text}</speak>""".encode(encoding='utf-8')
+        url = f'{self.url_base}/v2/speak?voice={voice_name}&audio_format=mp3'
 
         # logging.debug(f'querying url: {url}')
-        response = requests.post(url, data=ssml_text, headers=self.get_auth_headers(), timeout=cloudlanguagetools.constants.RequestTimeout)
+        response = self.authenticated_request('POST', url, data=self.get_ssml(text))
 
         if response.status_code == 200:
             with open(output_temp_filename, 'wb') as audio:
@@ -120,6 +133,22 @@ class CereProcService(cloudlanguagetools.service.Service):
         error_message = f"Status code: {response.status_code} reason: {response.reason} voice: [{voice_name}]]"
         raise cloudlanguagetools.errors.RequestError(error_message)
 
+    async def aget_tts_audio(self, text, voice_key, options):
+        voice_name = voice_key['name']
+        url = f'{self.url_base}/v2/speak?voice={voice_name}&audio_format=mp3'
+        for attempt in range(2):
+            # only blocks when the token needs to be fetched
+            headers = await asyncio.to_thread(self.get_auth_headers)
+            async with cloudlanguagetools.asynchttp.get_session().post(url, data=self.get_ssml(text), headers=headers) as response:
+                if response.status == 401 and attempt == 0:
+                    # the token was rejected, get a new one
+                    self.token_manager.invalidate()
+                    continue
+                if response.status == 200:
+                    return cloudlanguagetools.asynchttp.write_temp_file(await response.read())
+                error_message = f"Status code: {response.status} reason: {response.reason} voice: [{voice_name}]]"
+                raise cloudlanguagetools.errors.RequestError(error_message)
+
 
     def get_transliteration_language_list(self):
         return []
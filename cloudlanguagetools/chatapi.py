@@ -8,6 +8,8 @@ from typing import Optional
 import cloudlanguagetools.servicemanager
 import cloudlanguagetools.options
 import cloudlanguagetools.languages
+import cloudlanguagetools.constants
+import cloudlanguagetools.errors
 
 logger = logging.getLogger(__name__)
 
@@ -45,6 +47,7 @@ class BreakdownQuery(pydantic.BaseModel):
     translation_language: cloudlanguagetools.languages.CommonLanguage = Field(default=cloudlanguagetools.languages.CommonLanguage.en, description="language to translate into")
     translation_service: Optional[cloudlanguagetools.constants.Service] = Field(default=None, description='service to use for translation')
     transliteration_service: Optional[cloudlanguagetools.constants.Service] = Field(default=None, description='service to use for transliteration')
+    tokenization_service: Optional[cloudlanguagetools.constants.Service] = Field(default=None, description='service to use for breaking down the text into words')
 
 
 class ChatAPI():
@@ -70,13 +73,10 @@ class ChatAPI():
             cloudlanguagetools.constants.Service.Watson            
         ], preferred_service)
 
-        # get list of translation options
-        translation_language_list = self.manager.get_translation_language_list()
-        source_translation_language_list = [x for x in translation_language_list if x.language == source_language]
-        target_translation_language_list = [x for x in translation_language_list if x.language == target_language]
-        # get the list of services in common between source_translation_language_list and target_translation_language_list
-        source_service_list = set([x.service for x in source_translation_language_list])
-        target_service_list = set([x.service for x in target_translation_language_list])
+        # get the list of services in common between source and target language
+        catalog_index = self.manager.get_catalog_index()
+        source_service_list = catalog_index.get_translation_services(source_language)
+        target_service_list = catalog_index.get_translation_services(target_language)
         common_service_list = source_service_list.intersection(target_service_list)
 
         while service_preference[0] not in common_service_list:
@@ -85,8 +85,8 @@ class ChatAPI():
                 raise NoDataFoundException(f'No service found for translation from {source_language} to {target_language}')
 
         service = service_preference[0]
-        source_language_id = [x for x in source_translation_language_list if x.service == service][0].get_language_id()
-        target_language_id = [x for x in target_translation_language_list if x.service == service][0].get_language_id()
+        source_language_id = catalog_index.get_translation_options(source_language, service)[0].get_language_id()
+        target_language_id = catalog_index.get_translation_options(target_language, service)[0].get_language_id()
 
         translation_option = {
             'service': service,
@@ -97,8 +97,8 @@ class ChatAPI():
 
     def select_transliteration_option(self, preferred_service: cloudlanguagetools.constants.Service,
             language: cloudlanguagetools.languages.Language):
-        transliteration_option_list = self.manager.get_transliteration_language_list()
-        candidates = [x for x in transliteration_option_list if x.language == language]
+        catalog_index = self.manager.get_catalog_index()
+        candidates = catalog_index.get_transliteration_options(language)
         if len(candidates) == 0:
             raise NoDataFoundException(f'No transliteration service found for language {language.lang_name}')
 
@@ -117,12 +117,12 @@ class ChatAPI():
                 raise NoDataFoundException(f'No service found for transliteration of {language.lang_name}')
             
         service = service_preference[0]
-        final_candidates = [x for x in candidates if x.service == service]
+        final_candidates = catalog_index.get_transliteration_options(language, service)
 
         if service == cloudlanguagetools.constants.Service.MandarinCantonese:
-            final_candidates = [x for x in candidates if 
-                                x.service == service and x.get_transliteration_key()['tone_numbers'] == False and
-                                x.service == service and x.get_transliteration_key()['spaces'] == False]
+            final_candidates = [x for x in final_candidates if 
+                                x.get_transliteration_key()['tone_numbers'] == False and
+                                x.get_transliteration_key()['spaces'] == False]
         transliteration_option = final_candidates[0]
 
         return transliteration_option
@@ -170,8 +170,8 @@ class ChatAPI():
         logger.info(f'dictionary lookup {query}')
         source_language = cloudlanguagetools.languages.Language[query.source_language.name]
         target_language = cloudlanguagetools.languages.Language[query.target_language.name]
-        dictionary_option_list = self.manager.get_dictionary_lookup_options()
-        candidates = [x for x in dictionary_option_list if x.language == source_language and x.target_language == target_language]
+        catalog_index = self.manager.get_catalog_index()
+        candidates = catalog_index.get_dictionary_lookup_options(source_language, target_language)
         if len(candidates) == 0:
             raise NoDataFoundException(f'No dictionary service found for source language {query.source_language.lang_name} / target language: {query.target_language.lang_name}')
 
@@ -186,11 +186,18 @@ class ChatAPI():
             cloudlanguagetools.languages.Language.zh_lit
         ]:
             preferred_service = cloudlanguagetools.constants.Service.Wenlin
+            default_services = [
+                cloudlanguagetools.constants.Service.Wenlin,
+                cloudlanguagetools.constants.Service.Azure,
+            ]
+        else:
+            # wenlin's reverse lookup (english to chinese) is only used when requested
+            default_services = [
+                cloudlanguagetools.constants.Service.Azure,
+                cloudlanguagetools.constants.Service.Wenlin,
+            ]
 
-        service_preference = self.get_service_preference([
-            cloudlanguagetools.constants.Service.Wenlin,
-            cloudlanguagetools.constants.Service.Azure,
-        ], preferred_service)
+        service_preference = self.get_service_preference(default_services, preferred_service)
 
         while service_preference[0] not in service_list:
             service_preference.pop(0)
@@ -198,7 +205,7 @@ class ChatAPI():
                 raise NoDataFoundException(f'No service found for dictionary lookup of {query.source_language.lang_name}')
             
         service = service_preference[0]
-        final_candidates = [x for x in candidates if x.service == service]
+        final_candidates = catalog_index.get_dictionary_lookup_options(source_language, target_language, service)
 
         dictionary_option = final_candidates[0]
         logger.debug(f'Using dictionary option {pprint.pformat(dictionary_option.json_obj())}')
@@ -215,16 +222,15 @@ class ChatAPI():
     def audio(self, query: AudioQuery, format: cloudlanguagetools.options.AudioFormat) -> tempfile.NamedTemporaryFile:
         logger.info(f'processing audio query: {query}')
         language = cloudlanguagetools.languages.Language[query.language.name]
-        # get full voice list, filter down to correct language
-        # ====================================================
-        voice_list = self.manager.get_tts_voice_list()
+        # voices are looked up by the default audio language for this language
+        # =====================================================================
+        catalog_index = self.manager.get_catalog_index()
         default_audio_language = cloudlanguagetools.languages.AudioLanguageDefaults[language]
-        candidates = [x for x in voice_list if x.audio_language == default_audio_language]
 
         # select service
         # ==============
 
-        service_list = set([x.service for x in candidates])
+        service_list = catalog_index.get_voice_services(default_audio_language)
         service_preference = self.get_service_preference([
             cloudlanguagetools.constants.Service.Azure,
             cloudlanguagetools.constants.Service.Amazon,
@@ -243,11 +249,10 @@ class ChatAPI():
 
         # restrict to candidates for that service
         service = service_preference[0]
-        candidates = [x for x in candidates if x.service == service]
 
         # select gender
         # =============
-        gender_list = set([x.gender for x in candidates])
+        gender_list = catalog_index.get_voice_genders(default_audio_language, service)
         gender_preference = [
             cloudlanguagetools.constants.Gender.Female,
             cloudlanguagetools.constants.Gender.Male,
@@ -261,7 +266,7 @@ class ChatAPI():
         gender = gender_preference[0]
         logger.debug(f'selected gender: {gender}')
 
-        candidates = [x for x in candidates if x.gender == gender]
+        candidates = catalog_index.get_voices(default_audio_language, service, gender)
 
         # pick the first candidate and generate audio
         # ===========================================
@@ -317,10 +322,15 @@ class ChatAPI():
 
         # locate tokenization option
         # ==========================
-        tokenization_options = self.manager.get_tokenization_options()
-        tokenization_candidates = [x for x in tokenization_options if x.language == language]
+        catalog_index = self.manager.get_catalog_index()
+        tokenization_candidates = catalog_index.get_tokenization_options(language)
         if len(tokenization_candidates) == 0:
             raise NoDataFoundException(f'No tokenization options found for language {language.lang_name}')
+        if query.tokenization_service != None:
+            # for chinese, ChineseSegmentation segments in-process, without calling the spacy API
+            service_candidates = catalog_index.get_tokenization_options(language, query.tokenization_service)
+            if len(service_candidates) > 0:
+                tokenization_candidates = service_candidates
         tokenization_option = tokenization_candidates[0]
 
         # locate translation option
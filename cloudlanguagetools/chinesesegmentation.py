@@ -0,0 +1,176 @@
+"""in-process chinese word segmentation, using jieba's dictionary merged with the wenlin headwords.
+segments like jieba without HMM: the route through the DAG of dictionary words with the highest frequency product"""
+
+import os
+import re
+import enum
+import math
+import timeit
+import sqlite3
+import logging
+import threading
+import urllib.parse
+
+import jieba
+import clt_wenlin
+
+import cloudlanguagetools.service
+import cloudlanguagetools.constants
+import cloudlanguagetools.languages
+import cloudlanguagetools.tokenization
+
+logger = logging.getLogger(__name__)
+
+# runs of chinese characters get segmented, runs of latin letters / digits are kept as one token,
+# anything else which isn't whitespace (punctuation) is a token on its own
+HAN_PATTERN = '\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\U00020000-\U0002fa1f'
+TOKEN_RE = re.compile(f'([{HAN_PATTERN}]+)|([A-Za-z0-9０-９Ａ-Ｚａ-ｚ]+)|(\\s+)|(.)')
+
+class ChineseSegmentationMode(enum.Enum):
+    Words = enum.auto()
+    Characters = enum.auto()
+
+class ChineseSegmentationTokenization(cloudlanguagetools.tokenization.Tokenization):
+    def __init__(self, language, mode):
+        self.language = language
+        self.service = cloudlanguagetools.constants.Service.ChineseSegmentation
+        self.service_fee = cloudlanguagetools.constants.ServiceFee.free
+        self.mode = mode
+
+    def get_tokenization_name(self):
+        return f'{self.language.lang_name} ({self.mode.name}), {self.service.name}'
+
+    def get_tokenization_key(self):
+        return {
+            'mode': self.mode.name
+        }
+
+class SegmentationDictionary():
+    """word -> frequency, and every prefix of a word -> 0, so that the DAG can stop scanning at the first
+    fragment which isn't the prefix of any word"""
+    def __init__(self, wenlin_db_path):
+        starttime = timeit.default_timer()
+        self.frequencies = {}
+        self.total = 0
+        with jieba.get_dict_file() as f:
+            for line in f:
+                word, frequency = line.decode('utf-8').split(' ')[0:2]
+                self.add_word(word, int(frequency))
+        self.add_wenlin_headwords(wenlin_db_path)
+        self.log_total = math.log(self.total)
+        logger.info(f'loaded chinese segmentation dictionary: {self.total} total frequency, {len(self.frequencies)} prefixes, '
+            f'{timeit.default_timer() - starttime:.1f}s')
+
+    def add_word(self, word, frequency):
+        if self.frequencies.get(word, 0) > 0:
+            return
+        self.frequencies[word] = frequency
+        self.total += frequency
+        for i in range(1, len(word)):
+            self.frequencies.setdefault(word[:i], 0)
+
+    def add_wenlin_headwords(self, wenlin_db_path):
+        """words not in jieba's dictionary get a low frequency, they're only preferred over single characters"""
+        if not os.path.isfile(wenlin_db_path):
+            logger.warning(f'{wenlin_db_path} not found, segmenting with the jieba dictionary only')
+            return
+        connection = sqlite3.connect(f'file:{urllib.parse.quote(wenlin_db_path)}?mode=ro&immutable=1', uri=True)
+        try:
+            for simplified, traditional in connection.execute('SELECT simplified, traditional FROM words'):
+                for word in set([simplified, traditional]):
+                    if word != None:
+                        self.add_word(word, cloudlanguagetools.constants.ChineseSegmentationHeadwordFrequency)
+        finally:
+            connection.close()
+
+    def get_dag(self, sentence):
+        """index -> list of end indices of the words starting at that index"""
+        dag = []
+        length = len(sentence)
+        for start in range(length):
+            ends = []
+            end = start
+            fragment = sentence[start]
+            while fragment in self.frequencies:
+                if self.frequencies[fragment] > 0:
+                    ends.append(end)
+                end += 1
+                if end >= length:
+                    break
+                fragment = sentence[start:end + 1]
+            if len(ends) == 0:
+                ends.append(start)
+            dag.append(ends)
+        return dag
+
+    def segment(self, sentence):
+        dag = self.get_dag(sentence)
+        length = len(sentence)
+        # route[i]: (best log probability of sentence[i:], end index of the first word)
+        route = [None] * length + [(0, 0)]
+        for start in range(length - 1, -1, -1):
+            route[start] = max((math.log(self.frequencies.get(sentence[start:end + 1]) or 1) - self.log_total + route[end + 1][0], end)
+                for end in dag[start])
+        words = []
+        start = 0
+        while start < length:
+            end = route[start][1] + 1
+            words.append(sentence[start:end])
+            start = end
+        return words
+
+class ChineseSegmentationService(cloudlanguagetools.service.Service):
+    CATALOG_TTL = cloudlanguagetools.constants.CatalogStaticTTL
+
+    def __init__(self):
+        # None: the path where clt_wenlin downloads the database
+        self.wenlin_db_path = None
+        self.dictionary = None
+        self.dictionary_lock = threading.Lock()
+
+    def configure(self, config):
+        pass
+
+    def load_data(self):
+        self.get_dictionary()
+
+    def get_dictionary(self):
+        if self.dictionary == None:
+            with self.dictionary_lock:
+                if self.dictionary == None:
+                    wenlin_db_path = self.wenlin_db_path
+                    if wenlin_db_path == None:
+                        wenlin_db_path = clt_wenlin.get_wenlin_db_path()
+                    self.dictionary = SegmentationDictionary(wenlin_db_path)
+        return self.dictionary
+
+    def get_tokenization_options(self):
+        result = []
+        for language in [
+            cloudlanguagetools.languages.Language.zh_cn,
+            cloudlanguagetools.languages.Language.zh_tw,
+            cloudlanguagetools.languages.Language.yue
+        ]:
+            result.extend([
+                ChineseSegmentationTokenization(language, ChineseSegmentationMode.Words),
+                ChineseSegmentationTokenization(language, ChineseSegmentationMode.Characters),
+            ])
+        return result
+
+    def get_tokenization(self, text, tokenization_key):
+        mode = ChineseSegmentationMode[tokenization_key['mode']]
+
+        result = []
+        for match in TOKEN_RE.finditer(text):
+            han, latin, whitespace, other = match.groups()
+            if han != None:
+                if mode == ChineseSegmentationMode.Words:
+                    words = self.get_dictionary().segment(han)
+                else:
+                    words = list(han)
+                result.extend([{'token': word, 'lemma': word, 'can_translate': True, 'can_transliterate': True} for word in words])
+            elif latin != None:
+                result.append({'token': latin, 'lemma': latin, 'can_translate': True, 'can_transliterate': False})
+            elif other != None:
+                result.append({'token': other, 'lemma': other, 'can_translate': False, 'can_transliterate': False})
+        return result
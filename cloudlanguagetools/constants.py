@@ -51,8 +51,41 @@ class RequestMode(enum.Enum):
 
 RequestTimeout = 10 # 10 seconds max
 ReadTimeout = 3 # 3 seconds read timeout
+ConnectTimeout = 3 # seconds to establish a connection
+HttpPoolHosts = 10 # number of hosts each service keeps a connection pool for
+HttpPoolMaxSize = 32 # keep-alive connections per host, per service
+HttpRetries = 2 # retries on connection errors and 429/5xx responses to idempotent requests
+HttpRetryBackoff = 0.3 # seconds, exponential backoff factor, and max random jitter added to each retry delay
+HttpRetryAfterMax = 2 # seconds, a 429 / 503 asking to retry later than that is returned to the caller instead of retried
+GrpcKeepaliveTime = 30000 # milliseconds between http2 pings on grpc channels (google)
+GrpcKeepaliveTimeout = 10000 # milliseconds to wait for a ping ack before the channel is considered broken
 
-TTLCacheTimeout = 86400 # 24 hours
+TTLCacheTimeout = 86400 # 24 hours, catalog TTL of services whose voice list / languages come from their api
+CatalogStaticTTL = 604800 # 7 days, catalog TTL of services with a hardcoded or locally installed voice list / languages
+CatalogVolatileTTL = 3600 # 1 hour, catalog TTL of services whose voice list changes often (elevenlabs)
+
+MaxWorkers = 16 # size of the thread pool used to query services concurrently
+AllTranslationsDeadline = 8 # seconds, get_all_translations returns whatever finished by then
+CatalogMaxWorkers = 16 # size of the thread pool used to retrieve voice lists, translation languages, etc.
+CatalogRetryInterval = 300 # 5 minutes, when a service fails to return its catalog, retry after that
+TranslationBatchWorkers = 8 # concurrent requests when translating a batch with a service which doesn't have a multi-text endpoint
+ResultCacheMaxSize = 100000 # entries, in-memory translation / transliteration result cache
+ResultCacheTimeout = 604800 # 7 days
+AudioCacheMaxBytes = 2 * 1024 * 1024 * 1024 # 2GB, least recently used audio files are evicted past that
+AsyncMaxConnections = 1000 # simultaneous connections for the async API, per event loop
+AzureSynthesizerPoolSize = 8 # idle azure speech synthesizers kept per audio format
+AzureSynthesizerPrewarm = 2 # synthesizers opened ahead of the first request, see AzureService.load_data
+AzureSynthesizerMaxIdle = 240 # seconds, synthesizers idle for longer are discarded, their connection would have been closed
+AzureSupportedLanguagesTTL = 600 # seconds, the azure /languages document is revalidated after that
+TokenRefreshMargin = 30 # seconds, bearer tokens are considered expired that long before they actually expire
+TokenRefreshAhead = 60 # seconds, bearer tokens get refreshed in the background that long before they're considered expired
+AzureSpeechTokenLifetime = 600 # seconds, azure speech STS tokens are valid for 10 minutes
+CereProcTokenLifetime = 3600 # seconds, used when the cereproc auth response doesn't say
+WenlinMmapSize = 512 * 1024 * 1024 # bytes of the wenlin database memory-mapped, shared by all connections
+WenlinCacheSizeKb = 16 * 1024 # 16MB sqlite page cache, per wenlin connection
+WenlinReverseLookupLimit = 20 # english to chinese wenlin lookups return at most that many headwords, best matches first
+ChineseSegmentationHeadwordFrequency = 3 # frequency of wenlin headwords missing from the jieba dictionary
+CatalogStoreRev = 'revB' # bump when the on-disk catalog json format changes, older files are ignored. revB: json instead of pickle
 
 class Service(StrEnum):
     Azure = 'Azure'
@@ -72,6 +105,7 @@ class Service(StrEnum):
     FptAi = 'FptAi'
     PyThaiNLP = 'PyThaiNLP'
     Spacy = 'Spacy'
+    ChineseSegmentation = 'ChineseSegmentation'
     Wenlin =    'Wenlin'
     LibreTranslate = 'LibreTranslate'
     ElevenLabs = 'ElevenLabs'
@@ -1,5 +1,4 @@
 import json
-import requests
 import tempfile
 import logging
 import os
@@ -11,7 +10,18 @@ import cloudlanguagetools.ttsvoice
 import cloudlanguagetools.translationlanguage
 import cloudlanguagetools.transliterationlanguage
 import cloudlanguagetools.errors
+import cloudlanguagetools.translationbatch
+import cloudlanguagetools.asynchttp
 
+# https://www.deepl.com/docs-api/translate-text, up to 50 texts per request, 128KiB request size
+TRANSLATION_BATCH_MAX_ITEMS = 50
+TRANSLATION_BATCH_MAX_CHARS = 30000
+
+# source languages are specified without the variant
+SOURCE_LANGUAGE_OVERRIDE_MAP = {
+    'PT-PT': 'PT',
+    'PT-BR': 'PT'
+}
 
 class DeepLTranslationLanguage(cloudlanguagetools.translationlanguage.TranslationLanguage):
     def __init__(self, language, language_id):
@@ -25,6 +35,8 @@ class DeepLTranslationLanguage(cloudlanguagetools.translationlanguage.Translatio
 
 
 class DeepLService(cloudlanguagetools.service.Service):
+    CATALOG_TTL = cloudlanguagetools.constants.CatalogStaticTTL
+
     def __init__(self):
         self.base_url = 'https://api.deepl.com/v2/translate'
 
@@ -79,12 +91,7 @@ class DeepLService(cloudlanguagetools.service.Service):
         return []
 
     def get_translation(self, text, from_language_key, to_language_key):
-
-        override_source_language_map = {
-            'PT-PT': 'PT',
-            'PT-BR': 'PT'
-        }
-        from_language_key = override_source_language_map.get(from_language_key, from_language_key)
+        from_language_key = SOURCE_LANGUAGE_OVERRIDE_MAP.get(from_language_key, from_language_key)
 
 
         params = {
@@ -93,7 +100,7 @@ class DeepLService(cloudlanguagetools.service.Service):
             'source_lang': from_language_key,
             'target_lang': to_language_key
         }
-        response = requests.get(self.base_url, params=params, timeout=cloudlanguagetools.constants.RequestTimeout)
+        response = self.get_session().get(self.base_url, params=params)
 
         if response.status_code == 200:
             # {'translations': [{'translation': 'Le coût est très bas.'}], 'word_count': 2, 'character_count': 4}
@@ -101,4 +108,40 @@ class DeepLService(cloudlanguagetools.service.Service):
             return data['translations'][0]['text']
 
         error_message = error_message = f'DeepL: could not translate text [{text}] from {from_language_key} to {to_language_key} (status_code: {response.status_code} {response.content})'
-        raise cloudlanguagetools.errors.RequestError(error_message)
\ No newline at end of file
+        raise cloudlanguagetools.errors.RequestError(error_message)
+
+    async def aget_translation(self, text, from_language_key, to_language_key):
+        from_language_key = SOURCE_LANGUAGE_OVERRIDE_MAP.get(from_language_key, from_language_key)
+        params = {
+            'auth_key': self.api_key,
+            'text': text,
+            'source_lang': from_language_key,
+            'target_lang': to_language_key
+        }
+        async with cloudlanguagetools.asynchttp.get_session().get(self.base_url, params=params) as response:
+            if response.status == 200:
+                data = await response.json()
+                return data['translations'][0]['text']
+            content = await response.read()
+
+        error_message = f'DeepL: could not translate text [{text}] from {from_language_key} to {to_language_key} (status_code: {response.status} {content})'
+        raise cloudlanguagetools.errors.RequestError(error_message)
+
+    def get_translation_batch(self, texts, from_language_key, to_language_key):
+        from_language_key = SOURCE_LANGUAGE_OVERRIDE_MAP.get(from_language_key, from_language_key)
+
+        def translate_chunk(chunk_texts):
+            # the text parameter is repeated for each text
+            data = {
+                'auth_key': self.api_key,
+                'text': chunk_texts,
+                'source_lang': from_language_key,
+                'target_lang': to_language_key
+            }
+            response = self.get_session().post(self.base_url, data=data)
+            if response.status_code == 200:
+                return [translation['text'] for translation in response.json()['translations']]
+            error_message = f'DeepL: could not translate {len(chunk_texts)} texts from {from_language_key} to {to_language_key} (status_code: {response.status_code} {response.content})'
+            raise cloudlanguagetools.errors.RequestError(error_message)
+
+        return cloudlanguagetools.translationbatch.translate_chunked(texts, TRANSLATION_BATCH_MAX_ITEMS, TRANSLATION_BATCH_MAX_CHARS, translate_chunk)
@@ -1,11 +1,12 @@
 import os
-import requests
 import urllib.parse
 
 import cloudlanguagetools.service
 import cloudlanguagetools.constants
 import cloudlanguagetools.languages
 import cloudlanguagetools.transliterationlanguage
+import cloudlanguagetools.errors
+import cloudlanguagetools.asynchttp
 
 VARIANT_JAPANESE_ROMAJI = 'Romaji'
 VARIANT_JAPANESE_KANA = 'Kana'
@@ -43,6 +44,8 @@ class EasyPronunciationTransliterationLanguage(cloudlanguagetools.transliteratio
         return key
 
 class EasyPronunciationService(cloudlanguagetools.service.Service):
+    CATALOG_TTL = cloudlanguagetools.constants.CatalogStaticTTL
+
     def __init__(self):
         self.url_base = 'https://easypronunciation.com'
 
@@ -198,7 +201,7 @@ class EasyPronunciationService(cloudlanguagetools.service.Service):
         ]
         return result
 
-    def get_transliteration(self, text, transliteration_key):
+    def get_transliteration_url(self, text, transliteration_key):
         api_url = self.url_base + transliteration_key['url_path']
         parameters = {
             'access_token': self.api_key,
@@ -206,15 +209,9 @@ class EasyPronunciationService(cloudlanguagetools.service.Service):
         }
         parameters.update(transliteration_key['api_params'])
         encoded_parameters = urllib.parse.urlencode(parameters)
-        full_url = f'{api_url}?{encoded_parameters}'
-
-        # print(full_url)
-        request = requests.get(full_url)
-        result = request.json()
-
-        # print(request)
-        # print(result)
+        return f'{api_url}?{encoded_parameters}'
 
+    def process_transliteration_result(self, result, transliteration_key):
         if 'phonetic_transcription' in result:
             phonetic_transcription = result['phonetic_transcription']
             result_components = []
@@ -233,3 +230,14 @@ class EasyPronunciationService(cloudlanguagetools.service.Service):
         # an error occured
         error_message = f'EasyPronunciation: could not perform conversion: {str(result)}'
         raise cloudlanguagetools.errors.RequestError(error_message)
+
+    def get_transliteration(self, text, transliteration_key):
+        full_url = self.get_transliteration_url(text, transliteration_key)
+        request = self.get_session().get(full_url)
+        return self.process_transliteration_result(request.json(), transliteration_key)
+
+    async def aget_transliteration(self, text, transliteration_key):
+        full_url = self.get_transliteration_url(text, transliteration_key)
+        async with cloudlanguagetools.asynchttp.get_session().get(full_url) as response:
+            result = await response.json(content_type=None)
+        return self.process_transliteration_result(result, transliteration_key)
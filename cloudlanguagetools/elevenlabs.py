@@ -1,6 +1,5 @@
 import json
 import pprint
-import requests
 import tempfile
 import os
 import contextlib
@@ -15,6 +14,7 @@ import cloudlanguagetools.ttsvoice
 import cloudlanguagetools.translationlanguage
 import cloudlanguagetools.transliterationlanguage
 import cloudlanguagetools.errors
+import cloudlanguagetools.asynchttp
 
 logger = logging.getLogger(__name__)
 
@@ -66,6 +66,9 @@ class ElevenLabsVoice(cloudlanguagetools.ttsvoice.TtsVoice):
         }
 
 class ElevenLabsService(cloudlanguagetools.service.Service):
+    # voices get added all the time
+    CATALOG_TTL = cloudlanguagetools.constants.CatalogVolatileTTL
+
     def __init__(self):
         pass
 
@@ -79,8 +82,6 @@ class ElevenLabsService(cloudlanguagetools.service.Service):
         }
 
     def get_tts_audio(self, text, voice_key, options):
-        import requests
-
         CHUNK_SIZE = 1024
         voice_id = voice_key['voice_id']
         url = f'https://api.elevenlabs.io/v1/text-to-speech/{voice_id}'
@@ -98,7 +99,7 @@ class ElevenLabsService(cloudlanguagetools.service.Service):
             }
         }
 
-        response = requests.post(url, json=data, headers=headers, timeout=cloudlanguagetools.constants.RequestTimeout)
+        response = self.get_session().post(url, json=data, headers=headers)
         if response.status_code != 200:
             error_message = f'ElevenLabs: error processing TTS request: {response.status_code} {response.text}'
             logger.error(error_message)
@@ -117,6 +118,25 @@ class ElevenLabsService(cloudlanguagetools.service.Service):
 
         return output_temp_file
 
+    async def aget_tts_audio(self, text, voice_key, options):
+        url = f"https://api.elevenlabs.io/v1/text-to-speech/{voice_key['voice_id']}"
+        headers = self.get_headers()
+        headers['Accept'] = "audio/mpeg"
+        data = {
+            "text": text,
+            "model_id": voice_key['model_id'],
+            "voice_settings": {
+                "stability": options.get('stability', DEFAULT_STABILITY),
+                "similarity_boost": options.get('similarity_boost', DEFAULT_SIMILARITY_BOOST)
+            }
+        }
+        async with cloudlanguagetools.asynchttp.get_session().post(url, json=data, headers=headers) as response:
+            if response.status != 200:
+                error_message = f'ElevenLabs: error processing TTS request: {response.status} {await response.text()}'
+                logger.error(error_message)
+                raise cloudlanguagetools.errors.RequestError(error_message)
+            return cloudlanguagetools.asynchttp.write_temp_file(await response.read())
+
 
 
     def get_audio_language(self, language_id) -> cloudlanguagetools.languages.AudioLanguage:
@@ -147,7 +167,7 @@ class ElevenLabsService(cloudlanguagetools.service.Service):
 
         # first, get all models to get list of languages
         url = "https://api.elevenlabs.io/v1/models"
-        response = requests.get(url, headers=self.get_headers(), timeout=cloudlanguagetools.constants.RequestTimeout)
+        response = self.get_session().get(url, headers=self.get_headers())
         response.raise_for_status()
         model_data = response.json()
 
@@ -188,7 +208,7 @@ class ElevenLabsService(cloudlanguagetools.service.Service):
         # call elevenlabs API to list TTS voices
         url = "https://api.elevenlabs.io/v1/voices"
 
-        response = requests.get(url, headers=self.get_headers(), timeout=cloudlanguagetools.constants.RequestTimeout)
+        response = self.get_session().get(url, headers=self.get_headers())
         response.raise_for_status()
 
         data = response.json()
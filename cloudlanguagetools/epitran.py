@@ -29,6 +29,8 @@ class EpitranTransliterationLanguage(cloudlanguagetools.transliterationlanguage.
         return key
 
 class EpitranService(cloudlanguagetools.service.Service):
+    CATALOG_TTL = cloudlanguagetools.constants.CatalogStaticTTL
+
     def __init__(self):
         pass
 
@@ -1,4 +1,5 @@
 import json
+import asyncio
 import requests
 import urllib
 import tempfile
@@ -13,6 +14,7 @@ import cloudlanguagetools.ttsvoice
 import cloudlanguagetools.translationlanguage
 import cloudlanguagetools.transliterationlanguage
 import cloudlanguagetools.errors
+import cloudlanguagetools.asynchttp
 
 GENDER_MAP = {
     cloudlanguagetools.constants.Gender.Male: 'm',
@@ -65,8 +67,7 @@ class ForvoService(cloudlanguagetools.service.Service):
         # forvo uses cloudflare or something equivalent
         return {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:85.0) Gecko/20100101 Firefox/85.0'}
 
-    def get_tts_audio(self, text, voice_key, options):
-
+    def get_pronunciation_url(self, text, voice_key):
         language = voice_key['language_code']
 
         sex_param = ''
@@ -84,21 +85,26 @@ class ForvoService(cloudlanguagetools.service.Service):
 
         encoded_text = urllib.parse.quote(text)
 
-        url = f'{self.url_base}/key/{self.key}/format/json/action/word-pronunciations/word/{encoded_text}/language/{language}{sex_param}{username_param}/order/rate-desc/limit/1{country_code}'
+        return f'{self.url_base}/key/{self.key}/format/json/action/word-pronunciations/word/{encoded_text}/language/{language}{sex_param}{username_param}/order/rate-desc/limit/1{country_code}'
+
+    def get_audio_url(self, data, text, voice_key):
+        items = data['items']
+        if len(items) == 0:
+            error_message = f"Pronunciation not found in Forvo for word [{text}], language={voice_key['language_code']}, country={voice_key['country_code']}"
+            raise cloudlanguagetools.errors.NotFoundError(error_message)
+        return items[0]['pathmp3']
+
+    def get_tts_audio(self, text, voice_key, options):
+        url = self.get_pronunciation_url(text, voice_key)
 
         try:
-            response = requests.get(url, headers=self.get_headers(), timeout=cloudlanguagetools.constants.RequestTimeout)
+            response = self.get_session().get(url, headers=self.get_headers())
             response.raise_for_status()
 
-            data = response.json()
-            items = data['items']
-            if len(items) == 0:
-                error_message = f"Pronunciation not found in Forvo for word [{text}], language={language}, country={voice_key['country_code']}"
-                raise cloudlanguagetools.errors.NotFoundError(error_message)
-            audio_url = items[0]['pathmp3']
+            audio_url = self.get_audio_url(response.json(), text, voice_key)
             output_temp_file = tempfile.NamedTemporaryFile()
             output_temp_filename = output_temp_file.name
-            audio_request = requests.get(audio_url, headers=self.get_headers(), timeout=cloudlanguagetools.constants.RequestTimeout)
+            audio_request = self.get_session().get(audio_url, headers=self.get_headers())
             open(output_temp_filename, 'wb').write(audio_request.content)
             return output_temp_file
         except requests.exceptions.ReadTimeout as exception:
@@ -110,6 +116,25 @@ class ForvoService(cloudlanguagetools.service.Service):
             logger.exception('could not retrieve forvo audio')
             raise cloudlanguagetools.errors.RequestError('Unable to retrieve audio from Forvo')
 
+    async def aget_tts_audio(self, text, voice_key, options):
+        url = self.get_pronunciation_url(text, voice_key)
+        session = cloudlanguagetools.asynchttp.get_session()
+        try:
+            async with session.get(url, headers=self.get_headers()) as response:
+                response.raise_for_status()
+                data = await response.json(content_type=None)
+            audio_url = self.get_audio_url(data, text, voice_key)
+            async with session.get(audio_url, headers=self.get_headers()) as audio_response:
+                return cloudlanguagetools.asynchttp.write_temp_file(await audio_response.read())
+        except asyncio.TimeoutError as exception:
+            raise cloudlanguagetools.errors.TimeoutError(f'timeout while retrieving forvo audio')
+        except cloudlanguagetools.errors.NotFoundError as exception:
+            raise exception
+        except Exception as exception:
+            # make sure not to leak url and key
+            logger.exception('could not retrieve forvo audio')
+            raise cloudlanguagetools.errors.RequestError('Unable to retrieve audio from Forvo')
+
 
     def get_language_enum(self, language_id):
         forvo_language_id_map = {
@@ -271,7 +296,7 @@ class ForvoService(cloudlanguagetools.service.Service):
 
         # https://api.forvo.com/documentation/word-pronunciations/
         url = f'{self.url_base}/key/{self.key}/format/json/action/language-list/min-pronunciations/5000'
-        response = requests.get(url, headers=self.get_headers(), timeout=cloudlanguagetools.constants.RequestTimeout)
+        response = self.get_session().get(url, headers=self.get_headers())
         if response.status_code == 200:
             data = response.json()
             languages = data['items']
@@ -1,5 +1,5 @@
 import json
-import requests
+import asyncio
 import tempfile
 import logging
 import time
@@ -11,6 +11,7 @@ import cloudlanguagetools.ttsvoice
 import cloudlanguagetools.translationlanguage
 import cloudlanguagetools.transliterationlanguage
 import cloudlanguagetools.errors
+import cloudlanguagetools.asynchttp
 
 
 FPTAI_VOICE_SPEED_DEFAULT = 0
@@ -46,8 +47,10 @@ class FptAiVoice(cloudlanguagetools.ttsvoice.TtsVoice):
 
 
 class FptAiService(cloudlanguagetools.service.Service):
+    CATALOG_TTL = cloudlanguagetools.constants.CatalogStaticTTL
+
     def __init__(self):
-        pass
+        self.api_url = 'https://api.fpt.ai/hmi/tts/v5'
 
     def configure(self, config):
         self.api_key = config['key']
@@ -56,12 +59,7 @@ class FptAiService(cloudlanguagetools.service.Service):
         raise cloudlanguagetools.errors.RequestError('not supported')
 
 
-    def get_tts_audio(self, text, voice_key, options):
-        output_temp_file = tempfile.NamedTemporaryFile()
-        output_temp_filename = output_temp_file.name
-
-        api_url = "https://api.fpt.ai/hmi/tts/v5"
-        body = text
+    def get_tts_headers(self, voice_key, options):
         headers = {
             'api_key': self.api_key,
             'voice': voice_key['voice_id'],
@@ -72,8 +70,15 @@ class FptAiService(cloudlanguagetools.service.Service):
         speed = options.get('speed', FPTAI_VOICE_SPEED_DEFAULT)
         if speed != FPTAI_VOICE_SPEED_DEFAULT:
             headers['speed'] = str(speed)
-        response = requests.post(api_url, headers=headers, data=body.encode('utf-8'), 
-            timeout=cloudlanguagetools.constants.RequestTimeout)
+        return headers
+
+    def get_tts_audio(self, text, voice_key, options):
+        output_temp_file = tempfile.NamedTemporaryFile()
+        output_temp_filename = output_temp_file.name
+
+        body = text
+        headers = self.get_tts_headers(voice_key, options)
+        response = self.get_session().post(self.api_url, headers=headers, data=body.encode('utf-8'))
 
         if response.status_code == 200:
             response_data = response.json()
@@ -88,7 +93,7 @@ class FptAiService(cloudlanguagetools.service.Service):
             while audio_available == False and max_tries > 0:
                 time.sleep(wait_time)
                 logging.debug(f'checking whether audio is available on {async_url}')
-                response = requests.get(async_url, allow_redirects=True, timeout=cloudlanguagetools.constants.RequestTimeout)
+                response = self.get_session().get(async_url, allow_redirects=True)
                 if response.status_code == 200 and len(response.content) > 0:
                     with open(output_temp_filename, 'wb') as audio:
                         audio.write(response.content)                    
@@ -105,6 +110,30 @@ class FptAiService(cloudlanguagetools.service.Service):
         error_message = f'could not retrieve FPT.AI audio: {response.content}'
         raise cloudlanguagetools.errors.RequestError(error_message)
 
+    async def aget_tts_audio(self, text, voice_key, options):
+        session = cloudlanguagetools.asynchttp.get_session()
+        headers = self.get_tts_headers(voice_key, options)
+        async with session.post(self.api_url, headers=headers, data=text.encode('utf-8')) as response:
+            if response.status != 200:
+                error_message = f'could not retrieve FPT.AI audio: {await response.read()}'
+                raise cloudlanguagetools.errors.RequestError(error_message)
+            response_data = await response.json(content_type=None)
+        async_url = response_data['async']
+
+        # wait until the audio is available, without holding a thread
+        total_tries = 7
+        wait_time = 0.2
+        for i in range(total_tries):
+            await asyncio.sleep(wait_time)
+            async with session.get(async_url, allow_redirects=True) as response:
+                content = await response.read()
+                if response.status == 200 and len(content) > 0:
+                    return cloudlanguagetools.asynchttp.write_temp_file(content)
+            wait_time = wait_time * 2
+
+        error_message = f'could not retrieve audio after {total_tries} tries (url {async_url})'
+        raise cloudlanguagetools.errors.RequestError(error_message)
+
 
     def get_tts_voice_list(self):
         # returns list of TtSVoice
@@ -1,18 +1,32 @@
-import os
+import json
 import tempfile
 import html
 import base64
+import hashlib
 import logging
+import threading
+import google.auth
+import google.auth.exceptions
+import google.oauth2.service_account
 import google.cloud.texttospeech
+import google.cloud.texttospeech_v1.services.text_to_speech.transports
 import google.cloud.translate_v2
 import google.api_core.exceptions
 import cloudlanguagetools.service
 import cloudlanguagetools.constants
 import cloudlanguagetools.options
 import cloudlanguagetools.languages
+import cloudlanguagetools.errors
+import cloudlanguagetools.translationlanguage
+import cloudlanguagetools.ttsvoice
+import cloudlanguagetools.translationbatch
 
 logger = logging.getLogger(__name__)
 
+# https://cloud.google.com/translate/quotas, translate_v2 accepts up to 128 text segments per request
+TRANSLATION_BATCH_MAX_ITEMS = 128
+TRANSLATION_BATCH_MAX_CHARS = 30000
+
 def language_code_to_enum(language_code):
     override_map = {
         'cmn-TW': cloudlanguagetools.languages.AudioLanguage.zh_TW,
@@ -112,29 +126,62 @@ class GoogleTranslationLanguage(cloudlanguagetools.translationlanguage.Translati
         return self.language_id
 
 
+GRPC_CHANNEL_OPTIONS = [
+    ('grpc.keepalive_time_ms', cloudlanguagetools.constants.GrpcKeepaliveTime),
+    ('grpc.keepalive_timeout_ms', cloudlanguagetools.constants.GrpcKeepaliveTimeout),
+]
+
+GOOGLE_SCOPES = ['https://www.googleapis.com/auth/cloud-platform']
+
+def create_tts_channel(host, **kwargs):
+    kwargs['options'] = kwargs.get('options', []) + GRPC_CHANNEL_OPTIONS
+    return google.cloud.texttospeech_v1.services.text_to_speech.transports.TextToSpeechGrpcTransport.create_channel(host, **kwargs)
+
 class GoogleService(cloudlanguagetools.service.Service):
     def __init__(self):
-        pass
+        self.lock = threading.Lock()
+        self.credentials_hash = None
+        self.client = None
+        self.translation_client = None
 
     def configure(self, config):
         data_bytes = base64.b64decode(config['key'])
-        data_str = data_bytes.decode('utf-8')    
-        # write to file
-        # note: temp file needs to be a member so it doesn't get collected
-        self.google_key_temp_file = tempfile.NamedTemporaryFile()  
-        google_key_filename = self.google_key_temp_file.name
-        with open(google_key_filename, 'w') as f:
-            f.write(data_str)    
-            f.close()
-        os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = google_key_filename
+        credentials_hash = hashlib.sha256(data_bytes).hexdigest()
+        with self.lock:
+            if credentials_hash == self.credentials_hash:
+                # same service account, keep the existing clients and their channels
+                return
+            credentials = google.oauth2.service_account.Credentials.from_service_account_info(json.loads(data_bytes.decode('utf-8')))
+            self.create_clients(credentials)
+            self.credentials_hash = credentials_hash
+
+    def create_clients(self, credentials):
+        # clients are thread-safe, they are shared by all requests
+        transport = google.cloud.texttospeech_v1.services.text_to_speech.transports.TextToSpeechGrpcTransport(
+            credentials=credentials, channel=create_tts_channel)
+        self.client = google.cloud.texttospeech.TextToSpeechClient(transport=transport)
+        self.translation_client = google.cloud.translate_v2.Client(credentials=credentials)
+
+    def create_default_clients(self):
+        """no key configured, use the application default credentials (GOOGLE_APPLICATION_CREDENTIALS, gcloud, metadata server)"""
+        with self.lock:
+            if self.client != None:
+                return
+            try:
+                credentials, project = google.auth.default(scopes=GOOGLE_SCOPES)
+            except google.auth.exceptions.DefaultCredentialsError as e:
+                raise cloudlanguagetools.errors.RequestError(f'Google: no key configured and no application default credentials: {e}')
+            self.create_clients(credentials)
 
     def get_client(self):
-        client = google.cloud.texttospeech.TextToSpeechClient()
-        return client
+        if self.client == None:
+            self.create_default_clients()
+        return self.client
 
     def get_translation_client(self):
-        translate_client = google.cloud.translate_v2.Client()
-        return translate_client
+        if self.translation_client == None:
+            self.create_default_clients()
+        return self.translation_client
 
     def get_tts_audio(self, text, voice_key, options):
         audio_format_str = options.get(cloudlanguagetools.options.AUDIO_FORMAT_PARAMETER, cloudlanguagetools.options.AudioFormat.mp3.name)
@@ -215,8 +262,20 @@ class GoogleService(cloudlanguagetools.service.Service):
         except google.api_core.exceptions.BadRequest as error:
             raise cloudlanguagetools.errors.RequestError(str(error))
 
+    def get_translation_batch(self, texts, from_language_key, to_language_key):
+        client = self.get_translation_client()
+
+        def translate_chunk(chunk_texts):
+            try:
+                results = client.translate(chunk_texts, source_language=from_language_key, target_language=to_language_key)
+                return [html.unescape(result["translatedText"]) for result in results]
+            except google.api_core.exceptions.BadRequest as error:
+                raise cloudlanguagetools.errors.RequestError(str(error))
+
+        return cloudlanguagetools.translationbatch.translate_chunked(texts, TRANSLATION_BATCH_MAX_ITEMS, TRANSLATION_BATCH_MAX_CHARS, translate_chunk)
+
     def get_translation_languages(self):
-        translate_client = google.cloud.translate_v2.Client()
+        translate_client = self.get_translation_client()
 
         results = translate_client.get_languages()
 
@@ -0,0 +1,68 @@
+"""pooled http session, one per service, with timeouts from constants and retries on 429 / 5xx for idempotent requests"""
+
+import logging
+
+import requests
+import requests.adapters
+import urllib3.util.retry
+import urllib3.exceptions
+
+import cloudlanguagetools.constants
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUS_CODES = [429, 500, 502, 503, 504]
+
+class CappedRetry(urllib3.util.retry.Retry):
+    """don't sleep inside the request when the server asks to retry much later, return its response instead"""
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        if response != None and self.respect_retry_after_header:
+            retry_after = self.get_retry_after(response)
+            if retry_after != None and retry_after > cloudlanguagetools.constants.HttpRetryAfterMax:
+                raise urllib3.exceptions.MaxRetryError(_pool, url, 'Retry-After too long')
+        return super().increment(method, url, response, error, _pool, _stacktrace)
+
+class PooledSession(requests.Session):
+    def __init__(self, pool_maxsize=cloudlanguagetools.constants.HttpPoolMaxSize,
+                 retries=cloudlanguagetools.constants.HttpRetries,
+                 timeout=(cloudlanguagetools.constants.ConnectTimeout, cloudlanguagetools.constants.RequestTimeout)):
+        super().__init__()
+        self.timeout = timeout
+        self.pool_maxsize = pool_maxsize
+        retry = CappedRetry(
+            total=retries,
+            connect=retries,
+            read=False, # the request may have been processed, don't send it twice, raise ReadTimeout
+            status=retries,
+            status_forcelist=RETRY_STATUS_CODES,
+            allowed_methods=urllib3.util.retry.Retry.DEFAULT_ALLOWED_METHODS,
+            backoff_factor=cloudlanguagetools.constants.HttpRetryBackoff,
+            backoff_jitter=cloudlanguagetools.constants.HttpRetryBackoff,
+            respect_retry_after_header=True,
+            # return the last response, callers check the status code
+            raise_on_status=False)
+        # pool_connections: number of hosts to keep pools for, pool_maxsize: connections kept per host
+        self.adapter = requests.adapters.HTTPAdapter(pool_connections=cloudlanguagetools.constants.HttpPoolHosts,
+            pool_maxsize=pool_maxsize, max_retries=retry)
+        self.mount('https://', self.adapter)
+        self.mount('http://', self.adapter)
+
+    def request(self, method, url, **kwargs):
+        if kwargs.get('timeout', None) == None:
+            kwargs['timeout'] = self.timeout
+        return super().request(method, url, **kwargs)
+
+    def get_pool_stats(self):
+        """host -> connections opened, requests sent"""
+        result = {}
+        pools = self.adapter.poolmanager.pools
+        for pool_key in list(pools.keys()):
+            pool = pools.get(pool_key)
+            if pool == None:
+                continue
+            result[f'{pool.scheme}://{pool.host}:{pool.port}'] = {
+                'num_connections': pool.num_connections,
+                'num_requests': pool.num_requests,
+                'pool_maxsize': self.pool_maxsize
+            }
+        return result
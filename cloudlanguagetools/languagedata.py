@@ -0,0 +1,83 @@
+"""language data (get_language_data_json_v2 format), serialized once per catalog version, with an ETag"""
+
+import json
+import gzip
+import hashlib
+import logging
+import timeit
+
+import cloudlanguagetools.constants
+
+# brotli is optional, only gzip is offered when it's not installed
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+def build_language_data_v2(translation_language_list, transliteration_language_list, tts_voice_list,
+                           tokenization_options, dictionary_lookup_options):
+    categories = {
+        'translation_options': translation_language_list,
+        'transliteration_options': transliteration_language_list,
+        'voice_list': tts_voice_list,
+        'tokenization_options': tokenization_options,
+        'dictionary_lookup_options': dictionary_lookup_options,
+    }
+    premium = {}
+    free = {}
+    for category, option_list in categories.items():
+        # call json_obj() only once per option
+        json_list = [(option.service_fee, option.json_obj()) for option in option_list]
+        premium[category] = [json_obj for service_fee, json_obj in json_list]
+        free[category] = [json_obj for service_fee, json_obj in json_list if service_fee == cloudlanguagetools.constants.ServiceFee.free]
+    return {
+        'premium': premium,
+        'free': free
+    }
+
+class LanguageDataSnapshot():
+    def __init__(self, version, data):
+        starttime = timeit.default_timer()
+        # catalog version this snapshot was built from
+        self.version = version
+        # note: shared between all callers, must not be modified
+        self.data = data
+        self.json_bytes = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        self.etag = '"' + hashlib.sha256(self.json_bytes).hexdigest() + '"'
+        self.gzip_bytes = gzip.compress(self.json_bytes, compresslevel=9, mtime=0)
+        self.brotli_bytes = None
+        if brotli != None:
+            self.brotli_bytes = brotli.compress(self.json_bytes)
+        time_diff = timeit.default_timer() - starttime
+        logger.info(f'built language data snapshot version {version}, etag {self.etag}, {len(self.json_bytes)} bytes, '
+            f'gzip: {len(self.gzip_bytes)} bytes, processing time: {time_diff:.2f}s')
+
+    def etag_matches(self, if_none_match):
+        """whether the If-None-Match header sent by the client matches this snapshot (client can reuse its copy)"""
+        if if_none_match == None:
+            return False
+        for tag in if_none_match.split(','):
+            tag = tag.strip()
+            if tag.startswith('W/'):
+                tag = tag[2:]
+            if tag == '*' or tag == self.etag:
+                return True
+        return False
+
+    def get_body(self, accept_encoding=None):
+        """return (body bytes, content encoding) for the Accept-Encoding header sent by the client.
+        content encoding is None if the body is not compressed"""
+        accepted_encodings = []
+        if accept_encoding != None:
+            for entry in accept_encoding.split(','):
+                components = [x.strip() for x in entry.split(';')]
+                if 'q=0' in components:
+                    continue
+                accepted_encodings.append(components[0])
+        if self.brotli_bytes != None and 'br' in accepted_encodings:
+            return self.brotli_bytes, 'br'
+        if 'gzip' in accepted_encodings:
+            return self.gzip_bytes, 'gzip'
+        return self.json_bytes, None
@@ -1,6 +1,9 @@
 import cloudlanguagetools.service
 import cloudlanguagetools.translationlanguage
-import requests
+import cloudlanguagetools.constants
+import cloudlanguagetools.errors
+import cloudlanguagetools.asynchttp
+import cloudlanguagetools.languages
 
 import logging
 import pprint
@@ -55,7 +58,7 @@ class LibreTranslateService(cloudlanguagetools.service.Service):
             'target': to_language_key
         }
         logger.debug(f'translating using parameters: {data}')
-        response = requests.post(self.BASE_URL + '/translate', data=data, timeout=cloudlanguagetools.constants.RequestTimeout)
+        response = self.get_session().post(self.BASE_URL + '/translate', data=data)
         response_data = response.json()        
 
         if response.status_code == 200:
@@ -64,13 +67,27 @@ class LibreTranslateService(cloudlanguagetools.service.Service):
         error_message = f'LibreTranslate: could not translate text [{text}] from {from_language_key} to {to_language_key} ({response_data})'
         raise cloudlanguagetools.errors.RequestError(error_message)
 
+    async def aget_translation(self, text, from_language_key, to_language_key):
+        data = {
+            'q': text,
+            'source': from_language_key,
+            'target': to_language_key
+        }
+        async with cloudlanguagetools.asynchttp.get_session().post(self.BASE_URL + '/translate', data=data) as response:
+            response_data = await response.json(content_type=None)
+            if response.status == 200:
+                return response_data['translatedText']
+
+        error_message = f'LibreTranslate: could not translate text [{text}] from {from_language_key} to {to_language_key} ({response_data})'
+        raise cloudlanguagetools.errors.RequestError(error_message)
+
     def get_transliteration(self, text, transliteration_key):
         raise Exception('not supported')
 
     def get_translation_language_list(self):
         result = []
 
-        response = requests.get(self.BASE_URL + '/languages', timeout=cloudlanguagetools.constants.RequestTimeout)
+        response = self.get_session().get(self.BASE_URL + '/languages')
         language_list = response.json()
         for language in language_list:
             try:
@@ -1,7 +1,10 @@
 import json
+import threading
 import requests
 import cloudlanguagetools.constants
 import cloudlanguagetools.languages
+import cloudlanguagetools.service
+import cloudlanguagetools.transliterationlanguage
 import pinyin_jyutping
 
 
@@ -42,8 +45,22 @@ class MandarinCantoneseTransliteration(cloudlanguagetools.transliterationlanguag
         }
 
 class MandarinCantoneseService(cloudlanguagetools.service.Service):
+    CATALOG_TTL = cloudlanguagetools.constants.CatalogStaticTTL
+
     def __init__(self):
-        self.pinyin_jyutping = pinyin_jyutping.PinyinJyutping()
+        # the pinyin / jyutping dictionaries take a while to load, only load them when first needed
+        self.pinyin_jyutping_instance = None
+        self.pinyin_jyutping_lock = threading.Lock()
+
+    def load_data(self):
+        self.get_pinyin_jyutping()
+
+    def get_pinyin_jyutping(self):
+        if self.pinyin_jyutping_instance == None:
+            with self.pinyin_jyutping_lock:
+                if self.pinyin_jyutping_instance == None:
+                    self.pinyin_jyutping_instance = pinyin_jyutping.PinyinJyutping()
+        return self.pinyin_jyutping_instance
 
 
     def get_tts_voice_list(self):
@@ -63,16 +80,16 @@ class MandarinCantoneseService(cloudlanguagetools.service.Service):
 
     def get_transliteration(self, text, transliteration_key):
         if transliteration_key['conversion_type'] == 'pinyin':
-            return self.pinyin_jyutping.pinyin(text, tone_numbers=transliteration_key['tone_numbers'], spaces=transliteration_key['spaces'])
+            return self.get_pinyin_jyutping().pinyin(text, tone_numbers=transliteration_key['tone_numbers'], spaces=transliteration_key['spaces'])
         elif transliteration_key['conversion_type'] == 'jyutping':
-            return self.pinyin_jyutping.jyutping(text, tone_numbers=transliteration_key['tone_numbers'], spaces=transliteration_key['spaces'])
+            return self.get_pinyin_jyutping().jyutping(text, tone_numbers=transliteration_key['tone_numbers'], spaces=transliteration_key['spaces'])
 
         raise Exception(f"unsupported conversion type: {transliteration_key['conversion_type']}")
 
     # full access, return all results
     def get_pinyin(self, text, tone_numbers, spaces, corrections):
         if len(corrections) == 0:
-            return self.pinyin_jyutping.pinyin_all_solutions(text, tone_numbers, spaces)
+            return self.get_pinyin_jyutping().pinyin_all_solutions(text, tone_numbers, spaces)
         else:
             with_corrections = pinyin_jyutping.PinyinJyutping()
             with_corrections.load_pinyin_corrections(corrections)
@@ -80,7 +97,7 @@ class MandarinCantoneseService(cloudlanguagetools.service.Service):
 
     def get_jyutping(self, text, tone_numbers, spaces, corrections):
         if len(corrections) == 0:
-            return self.pinyin_jyutping.jyutping_all_solutions(text, tone_numbers, spaces)
+            return self.get_pinyin_jyutping().jyutping_all_solutions(text, tone_numbers, spaces)
         else:
             with_corrections = pinyin_jyutping.PinyinJyutping()
             with_corrections.load_jyutping_corrections(corrections)
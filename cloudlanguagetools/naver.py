@@ -1,5 +1,4 @@
 import json
-import requests
 import tempfile
 import logging
 import uuid
@@ -13,6 +12,7 @@ import cloudlanguagetools.ttsvoice
 import cloudlanguagetools.translationlanguage
 import cloudlanguagetools.transliterationlanguage
 import cloudlanguagetools.errors
+import cloudlanguagetools.asynchttp
 
 NAVER_VOICE_SPEED_DEFAULT = 0
 NAVER_VOICE_PITCH_DEFAULT = 0
@@ -62,6 +62,8 @@ class NaverTranslationLanguage(cloudlanguagetools.translationlanguage.Translatio
         return self.language_id
 
 class NaverService(cloudlanguagetools.service.Service):
+    CATALOG_TTL = cloudlanguagetools.constants.CatalogStaticTTL
+
     def __init__(self):
         pass
 
@@ -83,7 +85,7 @@ class NaverService(cloudlanguagetools.service.Service):
         }
 
         # alternate_data = 'speaker=clara&text=vehicle&volume=0&speed=0&pitch=0&format=mp3'
-        response = requests.post(url, json=data, headers=headers, timeout=cloudlanguagetools.constants.RequestTimeout)
+        response = self.get_session().post(url, json=data, headers=headers)
         if response.status_code == 200:
             response_data = response.json()
             return response_data['message']['result']['translatedText']
@@ -91,6 +93,25 @@ class NaverService(cloudlanguagetools.service.Service):
         error_message = f'Status code: {response.status_code}: {response.content}'
         raise cloudlanguagetools.errors.RequestError(error_message)
 
+    async def aget_translation(self, text, from_language_key, to_language_key):
+        url = 'https://naveropenapi.apigw.ntruss.com/nmt/v1/translation'
+        headers = {
+            'X-NCP-APIGW-API-KEY-ID': self.client_id,
+            'X-NCP-APIGW-API-KEY': self.client_secret
+        }
+        data = {
+            'text': text,
+            'source': from_language_key,
+            'target': to_language_key
+        }
+        async with cloudlanguagetools.asynchttp.get_session().post(url, json=data, headers=headers) as response:
+            if response.status == 200:
+                response_data = await response.json()
+                return response_data['message']['result']['translatedText']
+            content = await response.read()
+
+        error_message = f'Status code: {response.status}: {content}'
+        raise cloudlanguagetools.errors.RequestError(error_message)
 
     def get_tts_audio(self, text, voice_key, options):
         output_temp_file = tempfile.NamedTemporaryFile()
@@ -111,7 +132,7 @@ class NaverService(cloudlanguagetools.service.Service):
         }
 
         # alternate_data = 'speaker=clara&text=vehicle&volume=0&speed=0&pitch=0&format=mp3'
-        response = requests.post(url, data=data, headers=headers, timeout=cloudlanguagetools.constants.RequestTimeout)
+        response = self.get_session().post(url, data=data, headers=headers)
         if response.status_code == 200:
             with open(output_temp_filename, 'wb') as audio:
                 audio.write(response.content)
@@ -121,6 +142,27 @@ class NaverService(cloudlanguagetools.service.Service):
         error_message = f'Status code: {response.status_code}: {response_data}'
         raise cloudlanguagetools.errors.RequestError(error_message)
 
+    async def aget_tts_audio(self, text, voice_key, options):
+        url = 'https://naveropenapi.apigw.ntruss.com/tts-premium/v1/tts'
+        headers = {
+            'Content-Type': 'application/x-www-form-urlencoded',
+            'X-NCP-APIGW-API-KEY-ID': self.client_id,
+            'X-NCP-APIGW-API-KEY': self.client_secret
+        }
+        data = {
+            'text': text,
+            'speaker': voice_key['name'],
+            'speed': options.get('speed', NAVER_VOICE_SPEED_DEFAULT),
+            'pitch': options.get('pitch', NAVER_VOICE_PITCH_DEFAULT)
+        }
+        async with cloudlanguagetools.asynchttp.get_session().post(url, data=data, headers=headers) as response:
+            if response.status == 200:
+                return cloudlanguagetools.asynchttp.write_temp_file(await response.read())
+            response_data = await response.json(content_type=None)
+
+        error_message = f'Status code: {response.status}: {response_data}'
+        raise cloudlanguagetools.errors.RequestError(error_message)
+
     def get_tts_voice_list(self):
         # returns list of TtSVoice
         return [
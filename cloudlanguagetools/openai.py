@@ -10,6 +10,7 @@ import cloudlanguagetools.service
 import cloudlanguagetools.constants
 import cloudlanguagetools.languages
 import cloudlanguagetools.options
+import cloudlanguagetools.ttsvoice
 
 from cloudlanguagetools.languages import AudioLanguage
 
@@ -55,6 +56,8 @@ class OpenAIVoice(cloudlanguagetools.ttsvoice.TtsVoice):
         }
 
 class OpenAIService(cloudlanguagetools.service.Service):
+    CATALOG_TTL = cloudlanguagetools.constants.CatalogStaticTTL
+
     def __init__(self):
         self.chatbot_model = "gpt-3.5-turbo"
 
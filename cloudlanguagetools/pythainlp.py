@@ -6,6 +6,8 @@ import cloudlanguagetools.service
 import cloudlanguagetools.constants
 import cloudlanguagetools.languages
 import cloudlanguagetools.tokenization
+import cloudlanguagetools.errors
+import cloudlanguagetools.transliterationlanguage
 
 class PyThaiNLPTransliterationMode(enum.Enum):
     Romanization = enum.auto()
@@ -51,6 +53,8 @@ class PyThaiNLPTokenization(cloudlanguagetools.tokenization.Tokenization):
         }
 
 class PyThaiNLPService(cloudlanguagetools.service.Service):
+    CATALOG_TTL = cloudlanguagetools.constants.CatalogStaticTTL
+
     def __init__(self):
         pass
 
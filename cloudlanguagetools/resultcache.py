@@ -0,0 +1,167 @@
+"""cache for translation / transliteration / dictionary lookup results, keyed by a hash of
+(service, operation, NFC normalized text, key). only successful, json serializable results are cached"""
+
+import json
+import time
+import hashlib
+import logging
+import sqlite3
+import threading
+import unicodedata
+
+import cachetools
+
+import cloudlanguagetools.constants
+
+# redis is optional, only required for the redis backend
+try:
+    import redis
+except ImportError:
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+class MemoryBackend():
+    """bounded LRU + TTL cache, local to the process. values are stored serialized, so that callers can't modify them"""
+    def __init__(self, maxsize=cloudlanguagetools.constants.ResultCacheMaxSize, ttl=cloudlanguagetools.constants.ResultCacheTimeout):
+        self.cache = cachetools.TTLCache(maxsize=maxsize, ttl=ttl)
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            value = self.cache.get(key, None)
+        if value == None:
+            return None
+        return json.loads(value)
+
+    def set(self, key, value):
+        value = json.dumps(value)
+        with self.lock:
+            self.cache[key] = value
+
+class SQLiteBackend():
+    """local file, shared between processes on the same host"""
+    def __init__(self, path, ttl=cloudlanguagetools.constants.ResultCacheTimeout):
+        self.path = path
+        self.ttl = ttl
+        self.thread_local = threading.local()
+        connection = self.get_connection()
+        with connection:
+            connection.execute('CREATE TABLE IF NOT EXISTS results (key text PRIMARY KEY, value text, timestamp real)')
+
+    def get_connection(self):
+        # sqlite connections can't be shared between threads
+        connection = getattr(self.thread_local, 'connection', None)
+        if connection == None:
+            connection = sqlite3.connect(self.path, timeout=10)
+            connection.execute('PRAGMA journal_mode=WAL')
+            self.thread_local.connection = connection
+        return connection
+
+    def get(self, key):
+        row = self.get_connection().execute('SELECT value, timestamp FROM results WHERE key=?', (key,)).fetchone()
+        if row == None:
+            return None
+        value, timestamp = row
+        if time.time() - timestamp > self.ttl:
+            return None
+        return json.loads(value)
+
+    def set(self, key, value):
+        connection = self.get_connection()
+        with connection:
+            connection.execute('INSERT OR REPLACE INTO results VALUES (?, ?, ?)', (key, json.dumps(value), time.time()))
+
+class RedisBackend():
+    """any server speaking the redis protocol, shared between hosts"""
+    def __init__(self, url, ttl=cloudlanguagetools.constants.ResultCacheTimeout):
+        if redis == None:
+            raise Exception('the redis module is required for the redis result cache backend')
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+
+    def get(self, key):
+        value = self.client.get(key)
+        if value == None:
+            return None
+        return json.loads(value)
+
+    def set(self, key, value):
+        self.client.set(key, json.dumps(value), ex=self.ttl)
+
+def create_backend(spec):
+    """spec: 'memory', 'sqlite:<path>' or 'redis://...' / 'rediss://...'"""
+    if spec == 'memory':
+        return MemoryBackend()
+    if spec.startswith('sqlite:'):
+        return SQLiteBackend(spec[len('sqlite:'):])
+    if spec.startswith('redis://') or spec.startswith('rediss://'):
+        return RedisBackend(spec)
+    raise Exception(f'unknown result cache backend: {spec}')
+
+class ResultCache():
+    def __init__(self, backend):
+        self.backend = backend
+        # services whose results must not be cached
+        self.disabled_services = set()
+        self.lock = threading.Lock()
+        # operation -> count
+        self.hits = {}
+        self.misses = {}
+
+    def disable_service(self, service_name):
+        self.disabled_services.add(service_name)
+
+    def enable_service(self, service_name):
+        self.disabled_services.discard(service_name)
+
+    def is_enabled(self, service_name):
+        return service_name not in self.disabled_services
+
+    def get_key(self, service_name, operation, text, key):
+        text = unicodedata.normalize('NFC', text)
+        key_str = json.dumps([service_name, operation, text, key], sort_keys=True, ensure_ascii=False)
+        return f'clt_result_{hashlib.sha256(key_str.encode("utf-8")).hexdigest()}'
+
+    def count(self, counters, operation, count=1):
+        with self.lock:
+            counters[operation] = counters.get(operation, 0) + count
+
+    def get(self, cache_key, operation):
+        """return the cached value, or None"""
+        try:
+            value = self.backend.get(cache_key)
+        except Exception:
+            # the cache must never break a request
+            logger.exception(f'could not read from result cache')
+            value = None
+        if value == None:
+            self.count(self.misses, operation)
+        else:
+            self.count(self.hits, operation)
+        return value
+
+    def set(self, cache_key, value):
+        try:
+            self.backend.set(cache_key, value)
+        except Exception:
+            logger.exception(f'could not write to result cache')
+
+    def get_or_compute(self, service_name, operation, text, key, compute_fn):
+        if not self.is_enabled(service_name):
+            return compute_fn()
+        cache_key = self.get_key(service_name, operation, text, key)
+        value = self.get(cache_key, operation)
+        if value != None:
+            return value
+        value = compute_fn()
+        self.set(cache_key, value)
+        return value
+
+    def get_metrics(self):
+        with self.lock:
+            return {
+                'hits': dict(self.hits),
+                'misses': dict(self.misses),
+                'disabled_services': sorted(self.disabled_services)
+            }
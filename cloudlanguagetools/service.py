@@ -1,8 +1,45 @@
 
+import asyncio
+import threading
+
+import cloudlanguagetools.constants
+import cloudlanguagetools.errors
+import cloudlanguagetools.httpsession
+import cloudlanguagetools.translationbatch
+
+# protects the creation of http sessions
+session_lock = threading.Lock()
+
 class Service():
+    # how long the voice list, translation languages, etc. for this service are cached
+    CATALOG_TTL = cloudlanguagetools.constants.TTLCacheTimeout
+    # whether translation / transliteration / dictionary lookup results and audio from this service can be cached
+    CACHE_RESULTS = True
+    # keep-alive connections per host, and retries, for this service's http session
+    HTTP_POOL_MAXSIZE = cloudlanguagetools.constants.HttpPoolMaxSize
+    HTTP_RETRIES = cloudlanguagetools.constants.HttpRetries
+
     def __init__(self):
         pass
 
+    def get_session(self) -> cloudlanguagetools.httpsession.PooledSession:
+        """pooled http session, shared by all requests to this service"""
+        # services don't call Service.__init__, so the session is created on first use
+        session = getattr(self, 'http_session', None)
+        if session == None:
+            with session_lock:
+                session = getattr(self, 'http_session', None)
+                if session == None:
+                    session = cloudlanguagetools.httpsession.PooledSession(pool_maxsize=self.HTTP_POOL_MAXSIZE, retries=self.HTTP_RETRIES)
+                    self.http_session = session
+        return session
+
+    def get_http_pool_stats(self):
+        session = getattr(self, 'http_session', None)
+        if session == None:
+            return {}
+        return session.get_pool_stats()
+
     # used for pre-loading models
     def load_data(self):
         pass
@@ -20,4 +57,53 @@ class Service():
         return []
 
     def get_dictionary_lookup_list(self):
-        return []
\ No newline at end of file
+        return []
+
+    def get_translation_batch(self, texts, from_language_key, to_language_key):
+        """translate a list of texts, returns a list in the same order, each item is
+        {'translation': translated text} or {'error': error message}.
+        services with a multi-text endpoint override this, the default translates one text at a time"""
+        return [cloudlanguagetools.translationbatch.translate_item(self, text, from_language_key, to_language_key) for text in texts]
+
+    def get_tokenization_batch(self, texts, tokenization_key):
+        """tokenize a list of texts, returns a list in the same order, each item is
+        {'result': list of tokens} or {'error': error message}"""
+        result = []
+        for text in texts:
+            try:
+                result.append({'result': self.get_tokenization(text, tokenization_key)})
+            except cloudlanguagetools.errors.RequestError as e:
+                result.append({'error': str(e)})
+        return result
+
+    def get_dictionary_lookup_batch(self, texts, lookup_key):
+        """look up a list of texts, returns a list in the same order, each item is
+        {'result': lookup result} or {'error': error message}.
+        services which can look up several texts at once override this, the default looks up one text at a time"""
+        result = []
+        for text in texts:
+            try:
+                result.append({'result': self.get_dictionary_lookup(text, lookup_key)})
+            except (cloudlanguagetools.errors.RequestError, cloudlanguagetools.errors.NotFoundError) as e:
+                result.append({'error': str(e)})
+        return result
+
+    # async API
+    # =========
+    # services calling HTTP APIs have native aiohttp implementations (Azure, DeepL, Watson, Naver, ElevenLabs, Forvo,
+    # CereProc, VocalWare, FptAi, Voicen, EasyPronunciation, LibreTranslate). the defaults below run the blocking
+    # method in asyncio's default thread pool, so concurrent calls are limited to that pool's size. this applies to
+    # Google, Amazon and OpenAI, which go through their SDKs (grpc, boto3, openai), and to the services running
+    # locally (Wenlin, Epitran, etc)
+
+    async def aget_translation(self, text, from_language_key, to_language_key):
+        return await asyncio.to_thread(self.get_translation, text, from_language_key, to_language_key)
+
+    async def aget_transliteration(self, text, transliteration_key):
+        return await asyncio.to_thread(self.get_transliteration, text, transliteration_key)
+
+    async def aget_dictionary_lookup(self, text, lookup_key):
+        return await asyncio.to_thread(self.get_dictionary_lookup, text, lookup_key)
+
+    async def aget_tts_audio(self, text, voice_key, options):
+        return await asyncio.to_thread(self.get_tts_audio, text, voice_key, options)
@@ -3,66 +3,88 @@ import base64
 import tempfile
 import logging
 import timeit
-import cachetools
+import asyncio
+import threading
+import concurrent.futures
 from typing import List
 import cloudlanguagetools.constants
 import cloudlanguagetools.languages
 import cloudlanguagetools.errors
-import cloudlanguagetools.azure
-import cloudlanguagetools.google
-import cloudlanguagetools.watson
-import cloudlanguagetools.naver
-import cloudlanguagetools.amazon
-import cloudlanguagetools.forvo
-import cloudlanguagetools.cereproc
-import cloudlanguagetools.vocalware
-import cloudlanguagetools.fptai
-import cloudlanguagetools.voicen
-import cloudlanguagetools.elevenlabs
-import cloudlanguagetools.deepl
-import cloudlanguagetools.epitran
-import cloudlanguagetools.mandarincantonese
-import cloudlanguagetools.easypronunciation
-import cloudlanguagetools.pythainlp
-import cloudlanguagetools.spacy
-import cloudlanguagetools.wenlin
-import cloudlanguagetools.libretranslate
-import cloudlanguagetools.openai
 import cloudlanguagetools.encryption
+import cloudlanguagetools.serviceregistry
 import cloudlanguagetools.translationlanguage
+import cloudlanguagetools.catalog
+import cloudlanguagetools.catalogindex
+import cloudlanguagetools.languagedata
+import cloudlanguagetools.resultcache
+import cloudlanguagetools.audiocache
+import cloudlanguagetools.translationbatch
 
 LOAD_TEST_SERVICES_ONLY = os.environ.get('CLOUDLANGUAGETOOLS_CORE_TEST_SERVICES', 'no') == 'yes'
-
-if LOAD_TEST_SERVICES_ONLY:
-    import cloudlanguagetools.test_services
+# when set, the catalog (voices, translation languages, etc) is persisted to that file and loaded at startup
+CATALOG_PATH = os.environ.get('CLOUDLANGUAGETOOLS_CORE_CATALOG_PATH', None)
+# translation / transliteration / dictionary lookup result cache: 'memory' (bounded to ResultCacheMaxSize entries),
+# 'sqlite:<path>' or 'redis://...'. off unless set
+RESULT_CACHE = os.environ.get('CLOUDLANGUAGETOOLS_CORE_RESULT_CACHE', 'none')
+# when set, generated audio is stored in that directory and reused for identical requests
+AUDIO_CACHE_DIR = os.environ.get('CLOUDLANGUAGETOOLS_CORE_AUDIO_CACHE_DIR', None)
+
+# service enum, module, class. modules are only imported when the service is first used
+SERVICE_LIST = [
+    (cloudlanguagetools.constants.Service.Azure, 'cloudlanguagetools.azure', 'AzureService'),
+    (cloudlanguagetools.constants.Service.Google, 'cloudlanguagetools.google', 'GoogleService'),
+    (cloudlanguagetools.constants.Service.Watson, 'cloudlanguagetools.watson', 'WatsonService'),
+    (cloudlanguagetools.constants.Service.Naver, 'cloudlanguagetools.naver', 'NaverService'),
+    (cloudlanguagetools.constants.Service.Amazon, 'cloudlanguagetools.amazon', 'AmazonService'),
+    (cloudlanguagetools.constants.Service.Forvo, 'cloudlanguagetools.forvo', 'ForvoService'),
+    (cloudlanguagetools.constants.Service.CereProc, 'cloudlanguagetools.cereproc', 'CereProcService'),
+    (cloudlanguagetools.constants.Service.VocalWare, 'cloudlanguagetools.vocalware', 'VocalWareService'),
+    (cloudlanguagetools.constants.Service.FptAi, 'cloudlanguagetools.fptai', 'FptAiService'),
+    (cloudlanguagetools.constants.Service.ElevenLabs, 'cloudlanguagetools.elevenlabs', 'ElevenLabsService'),
+    (cloudlanguagetools.constants.Service.EasyPronunciation, 'cloudlanguagetools.easypronunciation', 'EasyPronunciationService'),
+    (cloudlanguagetools.constants.Service.Epitran, 'cloudlanguagetools.epitran', 'EpitranService'),
+    (cloudlanguagetools.constants.Service.DeepL, 'cloudlanguagetools.deepl', 'DeepLService'),
+    (cloudlanguagetools.constants.Service.PyThaiNLP, 'cloudlanguagetools.pythainlp', 'PyThaiNLPService'),
+    (cloudlanguagetools.constants.Service.Spacy, 'cloudlanguagetools.spacy', 'SpacyService'),
+    (cloudlanguagetools.constants.Service.ChineseSegmentation, 'cloudlanguagetools.chinesesegmentation', 'ChineseSegmentationService'),
+    (cloudlanguagetools.constants.Service.MandarinCantonese, 'cloudlanguagetools.mandarincantonese', 'MandarinCantoneseService'),
+    (cloudlanguagetools.constants.Service.Wenlin, 'cloudlanguagetools.wenlin', 'WenlinService'),
+    (cloudlanguagetools.constants.Service.OpenAI, 'cloudlanguagetools.openai', 'OpenAIService'),
+]
+
+TEST_SERVICE_LIST = [
+    (cloudlanguagetools.constants.Service.TestServiceA, 'cloudlanguagetools.test_services', 'TestServiceA'),
+    (cloudlanguagetools.constants.Service.TestServiceB, 'cloudlanguagetools.test_services', 'TestServiceB'),
+]
 
 
 class ServiceManager():
     def  __init__(self):
-        self.services = {}
+        # services are imported and constructed on first access
+        self.services = cloudlanguagetools.serviceregistry.ServiceRegistry()
+        # bounded pool used to fan out requests to several services at once
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=cloudlanguagetools.constants.MaxWorkers,
+            thread_name_prefix='cloudlanguagetools')
 
+        service_list = SERVICE_LIST
         if LOAD_TEST_SERVICES_ONLY:
-            self.services[cloudlanguagetools.constants.Service.TestServiceA] = cloudlanguagetools.test_services.TestServiceA()
-            self.services[cloudlanguagetools.constants.Service.TestServiceB] = cloudlanguagetools.test_services.TestServiceB()
-        else:
-            self.services[cloudlanguagetools.constants.Service.Azure] = cloudlanguagetools.azure.AzureService()
-            self.services[cloudlanguagetools.constants.Service.Google] = cloudlanguagetools.google.GoogleService()
-            self.services[cloudlanguagetools.constants.Service.Watson] = cloudlanguagetools.watson.WatsonService()
-            self.services[cloudlanguagetools.constants.Service.Naver] = cloudlanguagetools.naver.NaverService()
-            self.services[cloudlanguagetools.constants.Service.Amazon] = cloudlanguagetools.amazon.AmazonService()
-            self.services[cloudlanguagetools.constants.Service.Forvo] = cloudlanguagetools.forvo.ForvoService()
-            self.services[cloudlanguagetools.constants.Service.CereProc] = cloudlanguagetools.cereproc.CereProcService()
-            self.services[cloudlanguagetools.constants.Service.VocalWare] = cloudlanguagetools.vocalware.VocalWareService()
-            self.services[cloudlanguagetools.constants.Service.FptAi] = cloudlanguagetools.fptai.FptAiService()
-            self.services[cloudlanguagetools.constants.Service.ElevenLabs] = cloudlanguagetools.elevenlabs.ElevenLabsService()
-            self.services[cloudlanguagetools.constants.Service.EasyPronunciation] = cloudlanguagetools.easypronunciation.EasyPronunciationService()
-            self.services[cloudlanguagetools.constants.Service.Epitran] = cloudlanguagetools.epitran.EpitranService()
-            self.services[cloudlanguagetools.constants.Service.DeepL] = cloudlanguagetools.deepl.DeepLService()
-            self.services[cloudlanguagetools.constants.Service.PyThaiNLP] = cloudlanguagetools.pythainlp.PyThaiNLPService()
-            self.services[cloudlanguagetools.constants.Service.Spacy] = cloudlanguagetools.spacy.SpacyService()
-            self.services[cloudlanguagetools.constants.Service.MandarinCantonese] = cloudlanguagetools.mandarincantonese.MandarinCantoneseService()            
-            self.services[cloudlanguagetools.constants.Service.Wenlin] = cloudlanguagetools.wenlin.WenlinService()
-            self.services[cloudlanguagetools.constants.Service.OpenAI] = cloudlanguagetools.openai.OpenAIService()
+            service_list = TEST_SERVICE_LIST
+        for service_enum, module_name, class_name in service_list:
+            self.services.register(service_enum, module_name, class_name)
+
+        self.result_cache = None
+        if RESULT_CACHE != 'none':
+            self.result_cache = cloudlanguagetools.resultcache.ResultCache(cloudlanguagetools.resultcache.create_backend(RESULT_CACHE))
+        self.audio_cache = None
+        if AUDIO_CACHE_DIR != None:
+            self.enable_audio_cache(AUDIO_CACHE_DIR)
+
+        self.catalog = cloudlanguagetools.catalog.Catalog(self.services)
+        if CATALOG_PATH != None:
+            self.load_catalog(CATALOG_PATH)
+        # only one thread rebuilds the snapshot at a time
+        self.language_data_snapshot_lock = threading.Lock()
+        self.language_data_snapshot = None
 
     def configure_default(self):
         # use the stored keys to configure services
@@ -72,11 +94,12 @@ class ServiceManager():
         for service_name, value in config.items():
             service_enum = cloudlanguagetools.constants.Service[service_name]
             if service_enum in self.services:
-                self.services[service_enum].configure(value)
+                self.services.configure(service_enum, value)
 
     def get_language_data_json(self):
         # retrieve all language data (tts, translation, transliteration, etc)
         logging.info('retrieving language data')
+        self.refresh_catalog()
         
         logging.info('retrieving language list')
         language_list = self.get_language_list()
@@ -103,36 +126,32 @@ class ServiceManager():
 
     def get_language_data_json_v2(self):
         # retrieve all language data (tts, translation, transliteration, etc), sort by free/free+paid
-        logging.info('retrieving language data')
-        
-        logging.info('retrieving translation list')
-        translation_language_list = self.get_translation_language_list()
-        logging.info('retrieving transliteration language list')
-        transliteration_language_list = self.get_transliteration_language_list()
-        logging.info('retrieving tts voice list')
-        tts_voice_list = self.get_tts_voice_list()
-        logging.info('retrieving tokenization options')
-        tokenization_options = self.get_tokenization_options()
-        logging.info('retrieving dictionary lookup options')
-        dictionary_lookup_options = self.get_dictionary_lookup_options()        
-
-        return {
-            'premium': {
-                'translation_options': [option.json_obj() for option in translation_language_list],
-                'transliteration_options': [option.json_obj() for option in transliteration_language_list],
-                'voice_list': [voice.json_obj() for voice in tts_voice_list],
-                'tokenization_options': [option.json_obj() for option in tokenization_options],
-                'dictionary_lookup_options': [option.json_obj() for option in dictionary_lookup_options],
-            },
-            'free': {
-                'translation_options': [option.json_obj() for option in translation_language_list if option.service_fee == cloudlanguagetools.constants.ServiceFee.free],
-                'transliteration_options': [option.json_obj() for option in transliteration_language_list if option.service_fee == cloudlanguagetools.constants.ServiceFee.free],
-                'voice_list': [voice.json_obj() for voice in tts_voice_list if voice.service_fee == cloudlanguagetools.constants.ServiceFee.free],
-                'tokenization_options': [option.json_obj() for option in tokenization_options if option.service_fee == cloudlanguagetools.constants.ServiceFee.free],
-                'dictionary_lookup_options': [option.json_obj() for option in dictionary_lookup_options if option.service_fee == cloudlanguagetools.constants.ServiceFee.free],
-            }
-        }
-                
+        # note: the returned dict is shared, it must not be modified
+        return self.get_language_data_snapshot().data
+
+    def get_language_data_snapshot(self) -> cloudlanguagetools.languagedata.LanguageDataSnapshot:
+        """language data (get_language_data_json_v2 format) serialized to json / compressed, with an ETag.
+        only rebuilt when the catalog changes"""
+        self.refresh_catalog()
+        snapshot = self.language_data_snapshot
+        if snapshot != None and snapshot.version == self.catalog.version:
+            return snapshot
+
+        with self.language_data_snapshot_lock:
+            snapshot = self.language_data_snapshot
+            version = self.catalog.version
+            if snapshot != None and snapshot.version == version:
+                return snapshot
+            logging.info('building language data snapshot')
+            data = cloudlanguagetools.languagedata.build_language_data_v2(
+                self.get_translation_language_list(),
+                self.get_transliteration_language_list(),
+                self.get_tts_voice_list(),
+                self.get_tokenization_options(),
+                self.get_dictionary_lookup_options())
+            snapshot = cloudlanguagetools.languagedata.LanguageDataSnapshot(version, data)
+            self.language_data_snapshot = snapshot
+            return snapshot
 
     def get_language_list(self):
         result_dict = {}
@@ -140,48 +159,51 @@ class ServiceManager():
             result_dict[language.name] = language.lang_name
         return result_dict
 
-    @cachetools.cached(cache=cachetools.TTLCache(maxsize=1024, ttl=cloudlanguagetools.constants.TTLCacheTimeout))
+    def refresh_catalog(self, force=False):
+        """retrieve any missing or expired catalog entries (voices, translation languages, etc) from all services concurrently"""
+        self.catalog.refresh(list(cloudlanguagetools.catalog.CatalogType), force=force)
+
+    def load_catalog(self, path):
+        """serve the catalog saved in that file until services return their current catalog, save refreshed catalogs there"""
+        self.catalog.load_store(path)
+
+    def get_http_pool_stats(self):
+        """http connection pool statistics, per service, for services which have been used"""
+        return {service_enum.name: self.services[service_enum].get_http_pool_stats() for service_enum in self.services.get_loaded_services()}
+
+    def get_catalog_metrics(self):
+        """catalog refresh counts, durations and failures, per service and catalog type"""
+        return self.catalog.get_metrics()
+
+    def get_catalog_index(self) -> cloudlanguagetools.catalogindex.CatalogIndex:
+        """return an immutable index over the catalog, to look up voices, translation options, etc by language"""
+        return self.catalog.get_index()
+
     def get_tts_voice_list(self):
-        result = []
-        for key, service in self.services.items():
-            logging.info(f'retrieving voice list from {key}')
-            result.extend(service.get_tts_voice_list())
-        return result
+        return self.catalog.get_entries(cloudlanguagetools.catalog.CatalogType.tts_voice_list)
 
     def get_tts_voice_list_json(self):
         tts_voice_list = self.get_tts_voice_list()
         return [voice.json_obj() for voice in tts_voice_list]
 
-    @cachetools.cached(cache=cachetools.TTLCache(maxsize=1024, ttl=cloudlanguagetools.constants.TTLCacheTimeout))
     def get_translation_language_list(self) -> List[cloudlanguagetools.translationlanguage.TranslationLanguage]:
-        result = []
-        for key, service in self.services.items():
-            result.extend(service.get_translation_language_list())
-        return result        
+        return self.catalog.get_entries(cloudlanguagetools.catalog.CatalogType.translation_language_list)
 
     def get_translation_language_list_json(self):
         """return list of languages supported for translation, using plain objects/strings"""
         language_list = self.get_translation_language_list()
         return [language.json_obj() for language in language_list]
 
-    @cachetools.cached(cache=cachetools.TTLCache(maxsize=1024, ttl=cloudlanguagetools.constants.TTLCacheTimeout))
     def get_transliteration_language_list(self):
-        result = []
-        for key, service in self.services.items():
-            result.extend(service.get_transliteration_language_list())
-        return result
+        return self.catalog.get_entries(cloudlanguagetools.catalog.CatalogType.transliteration_language_list)
 
     def get_transliteration_language_list_json(self):
         """return list of languages supported for transliteration, using plain objects/strings"""
         language_list = self.get_transliteration_language_list()
         return [language.json_obj() for language in language_list]
 
-    @cachetools.cached(cache=cachetools.TTLCache(maxsize=1024, ttl=cloudlanguagetools.constants.TTLCacheTimeout))
     def get_tokenization_options(self):
-        result = []
-        for key, service in self.services.items():
-            result.extend(service.get_tokenization_options())
-        return result
+        return self.catalog.get_entries(cloudlanguagetools.catalog.CatalogType.tokenization_options)
 
     def get_tokenization_options_json(self):
         """return list of languages supported for tokenization, using plain objects/strings"""
@@ -190,55 +212,145 @@ class ServiceManager():
 
     # dictionary lookups
 
-    @cachetools.cached(cache=cachetools.TTLCache(maxsize=1024, ttl=cloudlanguagetools.constants.TTLCacheTimeout))
     def get_dictionary_lookup_options(self):
-        result = []
-        for key, service in self.services.items():
-            result.extend(service.get_dictionary_lookup_list())
-        return result
+        return self.catalog.get_entries(cloudlanguagetools.catalog.CatalogType.dictionary_lookup_list)
 
     def get_dictionary_lookup_options_json(self):
         dictionary_lookup_list = self.get_dictionary_lookup_options()
         return [dict_lookup_option.json_obj() for dict_lookup_option in dictionary_lookup_list]
 
+    def enable_audio_cache(self, directory, max_bytes=cloudlanguagetools.constants.AudioCacheMaxBytes):
+        self.audio_cache = cloudlanguagetools.audiocache.AudioCache(directory, max_bytes)
+
+    def get_audio_cache_metrics(self):
+        if self.audio_cache == None:
+            return None
+        return self.audio_cache.get_metrics()
+
     def get_tts_audio(self, text, service_name, voice_id, options):
         service_enum = cloudlanguagetools.constants.Service[service_name]
         service = self.services[service_enum]
-        return service.get_tts_audio(text, voice_id, options)
+        if self.audio_cache == None or not service.CACHE_RESULTS:
+            return service.get_tts_audio(text, voice_id, options)
+        key = self.audio_cache.get_key(service_enum.name, voice_id, options, text)
+        return self.audio_cache.get_or_generate(key, lambda: service.get_tts_audio(text, voice_id, options),
+            cloudlanguagetools.audiocache.get_audio_suffix(options))
+
+    def use_result_cache(self, service_enum):
+        return self.result_cache != None and self.services[service_enum].CACHE_RESULTS and self.result_cache.is_enabled(service_enum.name)
+
+    def get_cached_result(self, service_enum, operation, text, key, compute_fn):
+        if not self.use_result_cache(service_enum):
+            return compute_fn()
+        return self.result_cache.get_or_compute(service_enum.name, operation, text, key, compute_fn)
+
+    def get_result_cache_metrics(self):
+        """result cache hits / misses per operation"""
+        if self.result_cache == None:
+            return None
+        return self.result_cache.get_metrics()
 
     def get_translation(self, text, service_name: str, from_language_key, to_language_key):
         """return text"""
         service_enum = cloudlanguagetools.constants.Service[service_name]
         service = self.services[service_enum]
-        return service.get_translation(text, from_language_key, to_language_key)
+        return self.get_cached_result(service_enum, 'translation', text, [from_language_key, to_language_key],
+            lambda: service.get_translation(text, from_language_key, to_language_key))
 
-    def get_all_translations(self, text, from_language, to_language):
-        global_starttime = timeit.default_timer()
+    def get_translation_batch(self, texts, service_name: str, from_language_key, to_language_key):
+        """translate a list of texts with a single service, using its multi-text endpoint when available.
+        returns a list in the same order as texts, each item is {'translation': translated text} or {'error': error message}"""
+        service_enum = cloudlanguagetools.constants.Service[service_name]
+        service = self.services[service_enum]
+        texts = list(texts)
+        if not self.use_result_cache(service_enum):
+            return service.get_translation_batch(texts, from_language_key, to_language_key)
+
+        # only send the texts which aren't cached
+        key = [from_language_key, to_language_key]
+        cache_keys = [self.result_cache.get_key(service_enum.name, 'translation', text, key) for text in texts]
+        result = [None] * len(texts)
+        missing_indices = []
+        for i, cache_key in enumerate(cache_keys):
+            translation = self.result_cache.get(cache_key, 'translation')
+            if translation != None:
+                result[i] = cloudlanguagetools.translationbatch.translation_item(translation)
+            else:
+                missing_indices.append(i)
+        if len(missing_indices) > 0:
+            missing_result = service.get_translation_batch([texts[i] for i in missing_indices], from_language_key, to_language_key)
+            for i, item in zip(missing_indices, missing_result):
+                result[i] = item
+                if 'translation' in item:
+                    self.result_cache.set(cache_keys[i], item['translation'])
+        return result
 
-        translation_language_list = self.get_translation_language_list()
+    def get_all_translations(self, text, from_language, to_language, deadline=cloudlanguagetools.constants.AllTranslationsDeadline):
+        """return a dict of service name -> translated text, for all services which finished before the deadline"""
+        result = self.get_all_translations_timed(text, from_language, to_language, deadline)
+        return result['translations']
 
-        result = {}
-        for service_enum, service in self.services.items():
+    def get_all_translations_timed(self, text, from_language, to_language, deadline=cloudlanguagetools.constants.AllTranslationsDeadline):
+        """query all translation services concurrently, return translations along with per-service processing time.
+        services which haven't returned by the deadline are listed under timed_out"""
+        global_starttime = timeit.default_timer()
+
+        catalog_index = self.get_catalog_index()
+        from_language_enum = cloudlanguagetools.languages.Language.__members__.get(from_language, None)
+        to_language_enum = cloudlanguagetools.languages.Language.__members__.get(to_language, None)
+
+        def translate_timed(service_name, from_language_id, to_language_id):
+            starttime = timeit.default_timer()
+            translation = None
+            try:
+                translation = self.get_translation(text, service_name, from_language_id, to_language_id)
+            except cloudlanguagetools.errors.RequestError:
+                pass # don't do anything
+            except Exception as e:
+                # default exception handler
+                logging.exception(f'could not retrieve translation for service {service_name}, text: {text}')
+            time_diff = timeit.default_timer() - starttime
+            logging.info(f'get_all_translation processing time for {service_name}: {time_diff:.1f}')
+            return translation, time_diff
+
+        # only the services offering both languages, the others are never constructed
+        service_enums = catalog_index.get_translation_services(from_language_enum) & catalog_index.get_translation_services(to_language_enum)
+        futures = {}
+        for service_enum in [x for x in self.services.keys() if x in service_enums]:
             service_name = service_enum.name
             # locate from language key
-            from_language_entries = [x for x in translation_language_list if x.service.name == service_name and x.get_language_code() == from_language]
+            from_language_entries = catalog_index.get_translation_options(from_language_enum, service_enum)
             if len(from_language_entries) == 1:
-                starttime = timeit.default_timer()
                 # this service provides the "from" language in translation list
                 from_language_id = from_language_entries[0].get_language_id()
                 # locate to language key
-                to_language_entries = [x for x in translation_language_list if x.service.name == service_name and x.get_language_code() == to_language]
+                to_language_entries = catalog_index.get_translation_options(to_language_enum, service_enum)
                 if len(to_language_entries) == 1:
                     to_language_id = to_language_entries[0].get_language_id()
-                    try:
-                        result[service_name] = self.get_translation(text, service_name, from_language_id, to_language_id)
-                    except cloudlanguagetools.errors.RequestError:
-                        pass # don't do anything
-                    except Exception as e:
-                        # default exception handler
-                        logging.exception(f'could not retrieve translation for service {service_name}, text: {text}')
-                    time_diff = timeit.default_timer() - starttime
-                    logging.info(f'get_all_translation processing time for {service_name}: {time_diff:.1f}')
+                    future = self.executor.submit(translate_timed, service_name, from_language_id, to_language_id)
+                    futures[future] = service_name
+
+        done, not_done = concurrent.futures.wait(futures.keys(), timeout=deadline)
+
+        result = {
+            'translations': {},
+            'processing_time': {},
+            'timed_out': []
+        }
+        for future in done:
+            service_name = futures[future]
+            translation, time_diff = future.result()
+            if translation != None:
+                result['translations'][service_name] = translation
+            result['processing_time'][service_name] = time_diff
+        for future in not_done:
+            # the request will still run to completion in the background, but we won't wait for it
+            future.cancel()
+            service_name = futures[future]
+            logging.warning(f'get_all_translation: {service_name} did not finish within {deadline}s deadline')
+            result['timed_out'].append(service_name)
+        result['timed_out'].sort()
+
         global_time_diff = timeit.default_timer() - global_starttime
         logging.info(f'get_all_translation total processing time: {global_time_diff:.1f}')
         return result
@@ -246,17 +358,52 @@ class ServiceManager():
     def get_transliteration(self, text, service_name: str, transliteration_key):
         service_enum = cloudlanguagetools.constants.Service[service_name]
         service = self.services[service_enum]
-        return service.get_transliteration(text, transliteration_key)
+        return self.get_cached_result(service_enum, 'transliteration', text, transliteration_key,
+            lambda: service.get_transliteration(text, transliteration_key))
 
     def get_tokenization(self, text, service_name: str, tokenization_key):
         service_enum = cloudlanguagetools.constants.Service[service_name]
         service = self.services[service_enum]
         return service.get_tokenization(text, tokenization_key)
 
+    def get_tokenization_batch(self, texts, service_name: str, tokenization_key):
+        """returns a list in the same order as texts, each item is {'result': list of tokens} or {'error': error message}"""
+        service_enum = cloudlanguagetools.constants.Service[service_name]
+        service = self.services[service_enum]
+        return service.get_tokenization_batch(list(texts), tokenization_key)
+
     def get_dictionary_lookup(self, text, service_name, lookup_key):
         service_enum = cloudlanguagetools.constants.Service[service_name]
         service = self.services[service_enum]
-        return service.get_dictionary_lookup(text, lookup_key)
+        return self.get_cached_result(service_enum, 'dictionary_lookup', text, lookup_key,
+            lambda: service.get_dictionary_lookup(text, lookup_key))
+
+    def get_dictionary_lookup_batch(self, texts, service_name, lookup_key):
+        """look up a list of texts with a single service, in one query when the service supports it.
+        returns a list in the same order as texts, each item is {'result': lookup result} or {'error': error message}"""
+        service_enum = cloudlanguagetools.constants.Service[service_name]
+        service = self.services[service_enum]
+        texts = list(texts)
+        if not self.use_result_cache(service_enum):
+            return service.get_dictionary_lookup_batch(texts, lookup_key)
+
+        # only look up the texts which aren't cached
+        cache_keys = [self.result_cache.get_key(service_enum.name, 'dictionary_lookup', text, lookup_key) for text in texts]
+        result = [None] * len(texts)
+        missing_indices = []
+        for i, cache_key in enumerate(cache_keys):
+            lookup_result = self.result_cache.get(cache_key, 'dictionary_lookup')
+            if lookup_result != None:
+                result[i] = {'result': lookup_result}
+            else:
+                missing_indices.append(i)
+        if len(missing_indices) > 0:
+            missing_result = service.get_dictionary_lookup_batch([texts[i] for i in missing_indices], lookup_key)
+            for i, item in zip(missing_indices, missing_result):
+                result[i] = item
+                if 'result' in item:
+                    self.result_cache.set(cache_keys[i], item['result'])
+        return result
 
     def get_breakdown(self, text, tokenization_option, translation_option, transliteration_option):
         
@@ -274,7 +421,31 @@ class ServiceManager():
             transliteration_service = transliteration_option['service']
             transliteration_key = transliteration_option['transliteration_key']
 
-        # then, enrich tokens with translation and transliteration
+        # then, enrich tokens with translation and transliteration.
+        # each distinct lemma / token is only processed once, translations are sent as a single batch and
+        # transliterations run concurrently, so that latency is about one round trip rather than one per token
+        lemmas = []
+        if translation_option != None:
+            lemmas = list(dict.fromkeys([token['lemma'] for token in tokenization_result if token['can_translate']]))
+        transliteration_tokens = []
+        if transliteration_option != None:
+            transliteration_tokens = list(dict.fromkeys([token['token'] for token in tokenization_result if token['can_transliterate']]))
+
+        translation_future = None
+        if len(lemmas) > 0:
+            translation_future = self.executor.submit(self.get_translation_batch, lemmas,
+                translation_service, translation_source_language_id, translation_target_language_id)
+        transliteration_futures = {token: self.executor.submit(self.get_transliteration, token, transliteration_service, transliteration_key)
+            for token in transliteration_tokens}
+
+        translations = {}
+        if translation_future != None:
+            for lemma, item in zip(lemmas, translation_future.result()):
+                if 'error' in item:
+                    raise cloudlanguagetools.errors.RequestError(item['error'])
+                translations[lemma] = item['translation']
+        transliterations = {token: future.result() for token, future in transliteration_futures.items()}
+
         result = []
         for token in tokenization_result:
             entry = {
@@ -283,12 +454,10 @@ class ServiceManager():
             }
 
             if token['can_translate'] and translation_option != None:
-                # translate this token (lemma)
-                entry['translation'] = self.get_translation(token['lemma'], translation_service, translation_source_language_id, translation_target_language_id)
+                entry['translation'] = translations[token['lemma']]
 
             if token['can_transliterate'] and transliteration_option != None:
-                # transliterate the token
-                entry['transliteration'] = self.get_transliteration(token['token'], transliteration_service, transliteration_key)
+                entry['transliteration'] = transliterations[token['token']]
 
             if 'pos_description' in token:
                 entry['pos_description'] = token['pos_description']
@@ -297,6 +466,58 @@ class ServiceManager():
         
         return result
 
+    # async API
+    # =========
+    # same as the blocking methods above. cancelling the awaiting task (for example when the client disconnects)
+    # cancels the request to services which have a native async implementation
+
+    async def aget_cached_result(self, service_enum, operation, text, key, compute_fn):
+        """compute_fn returns a coroutine"""
+        if not self.use_result_cache(service_enum):
+            return await compute_fn()
+        # cache backends may block (sqlite, redis)
+        cache_key = self.result_cache.get_key(service_enum.name, operation, text, key)
+        value = await asyncio.to_thread(self.result_cache.get, cache_key, operation)
+        if value != None:
+            return value
+        value = await compute_fn()
+        await asyncio.to_thread(self.result_cache.set, cache_key, value)
+        return value
+
+    async def aget_translation(self, text, service_name: str, from_language_key, to_language_key):
+        service_enum = cloudlanguagetools.constants.Service[service_name]
+        service = self.services[service_enum]
+        return await self.aget_cached_result(service_enum, 'translation', text, [from_language_key, to_language_key],
+            lambda: service.aget_translation(text, from_language_key, to_language_key))
+
+    async def aget_transliteration(self, text, service_name: str, transliteration_key):
+        service_enum = cloudlanguagetools.constants.Service[service_name]
+        service = self.services[service_enum]
+        return await self.aget_cached_result(service_enum, 'transliteration', text, transliteration_key,
+            lambda: service.aget_transliteration(text, transliteration_key))
+
+    async def aget_dictionary_lookup(self, text, service_name, lookup_key):
+        service_enum = cloudlanguagetools.constants.Service[service_name]
+        service = self.services[service_enum]
+        return await self.aget_cached_result(service_enum, 'dictionary_lookup', text, lookup_key,
+            lambda: service.aget_dictionary_lookup(text, lookup_key))
+
+    async def aget_tts_audio(self, text, service_name, voice_id, options):
+        service_enum = cloudlanguagetools.constants.Service[service_name]
+        service = self.services[service_enum]
+        if self.audio_cache == None or not service.CACHE_RESULTS:
+            return await service.aget_tts_audio(text, voice_id, options)
+        key = self.audio_cache.get_key(service_enum.name, voice_id, options, text)
+        audio_file = await asyncio.to_thread(self.audio_cache.get, key, cloudlanguagetools.audiocache.get_audio_suffix(options))
+        if audio_file != None:
+            return audio_file
+        audio_file = await service.aget_tts_audio(text, voice_id, options)
+        try:
+            await asyncio.to_thread(self.audio_cache.put, key, audio_file.name)
+        except Exception:
+            logging.exception(f'could not store audio in {self.audio_cache.directory}')
+        return audio_file
+
     # special handling for pinyin and jyutping
     # ========================================
     
@@ -343,6 +564,7 @@ class ServiceManager():
             cloudlanguagetools.constants.Service.Epitran,
             cloudlanguagetools.constants.Service.Wenlin,
             cloudlanguagetools.constants.Service.PyThaiNLP,
+            cloudlanguagetools.constants.Service.ChineseSegmentation,
             cloudlanguagetools.constants.Service.TestServiceA,
         ]
 
@@ -0,0 +1,111 @@
+"""service enum -> service instance mapping, each service module is only imported and its service constructed
+when first accessed. configuration passed in before that is applied right after construction"""
+
+import logging
+import importlib
+import threading
+import timeit
+import collections.abc
+
+import cloudlanguagetools.constants
+
+logger = logging.getLogger(__name__)
+
+class ServiceRegistry(collections.abc.MutableMapping):
+    def __init__(self):
+        # service enum -> (module name, class name)
+        self.registrations = {}
+        # service enum -> service instance
+        self.instances = {}
+        # service enum -> configuration to apply on construction
+        self.pending_config = {}
+        # one lock per service, so that services get constructed in parallel
+        self.locks = {}
+        self.registry_lock = threading.Lock()
+
+    def get_service_enum(self, key):
+        # allow lookups by service name
+        if isinstance(key, cloudlanguagetools.constants.Service):
+            return key
+        return cloudlanguagetools.constants.Service[key]
+
+    def get_lock(self, service_enum):
+        with self.registry_lock:
+            return self.locks.setdefault(service_enum, threading.Lock())
+
+    def register(self, service_enum, module_name, class_name):
+        self.registrations[service_enum] = (module_name, class_name)
+
+    def is_loaded(self, key):
+        return self.get_service_enum(key) in self.instances
+
+    def get_loaded_services(self):
+        return list(self.instances.keys())
+
+    def configure(self, key, config):
+        """configure the service now if it's already constructed, otherwise when it gets constructed"""
+        service_enum = self.get_service_enum(key)
+        with self.get_lock(service_enum):
+            service = self.instances.get(service_enum, None)
+            if service == None:
+                self.pending_config[service_enum] = config
+                return
+        service.configure(config)
+
+    def get_service_class(self, key):
+        """the service class, for class level attributes, without constructing the service"""
+        service_enum = self.get_service_enum(key)
+        service = self.instances.get(service_enum, None)
+        if service != None:
+            return type(service)
+        module_name, class_name = self.registrations[service_enum]
+        return getattr(importlib.import_module(module_name), class_name)
+
+    def construct(self, service_enum):
+        starttime = timeit.default_timer()
+        service = self.get_service_class(service_enum)()
+        config = self.pending_config.pop(service_enum, None)
+        if config != None:
+            service.configure(config)
+        time_diff = timeit.default_timer() - starttime
+        logger.info(f'loaded service {service_enum.name} in {time_diff:.2f}s')
+        return service
+
+    def __getitem__(self, key):
+        service_enum = self.get_service_enum(key)
+        service = self.instances.get(service_enum, None)
+        if service != None:
+            return service
+        if service_enum not in self.registrations:
+            raise KeyError(key)
+        with self.get_lock(service_enum):
+            service = self.instances.get(service_enum, None)
+            if service == None:
+                service = self.construct(service_enum)
+                self.instances[service_enum] = service
+        return service
+
+    def __setitem__(self, key, service):
+        service_enum = self.get_service_enum(key)
+        self.instances[service_enum] = service
+        if service_enum not in self.registrations:
+            self.registrations[service_enum] = (type(service).__module__, type(service).__name__)
+
+    def __delitem__(self, key):
+        service_enum = self.get_service_enum(key)
+        del self.registrations[service_enum]
+        self.instances.pop(service_enum, None)
+        self.pending_config.pop(service_enum, None)
+
+    def __contains__(self, key):
+        # doesn't construct the service
+        try:
+            return self.get_service_enum(key) in self.registrations
+        except KeyError:
+            return False
+
+    def __iter__(self):
+        return iter(list(self.registrations.keys()))
+
+    def __len__(self):
+        return len(self.registrations)
@@ -1,11 +1,11 @@
 import logging
-import requests
 import os
 
 import cloudlanguagetools.service
 import cloudlanguagetools.constants
 import cloudlanguagetools.languages
 import cloudlanguagetools.tokenization
+import cloudlanguagetools.errors
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +30,8 @@ class SpacyTokenization(cloudlanguagetools.tokenization.Tokenization):
         }
 
 class SpacyService(cloudlanguagetools.service.Service):
+    CATALOG_TTL = cloudlanguagetools.constants.CatalogStaticTTL
+
     BASE_URL = 'http://spacy-api.vocab.ai'
 
     def __init__(self):
@@ -38,7 +40,7 @@ class SpacyService(cloudlanguagetools.service.Service):
     def get_tokenization(self, text, tokenization_key):
         model_name = tokenization_key['model_name']
 
-        response = requests.post(self.BASE_URL + '/v1/tokenize', json={'language': model_name, 'text': text}, timeout=cloudlanguagetools.constants.RequestTimeout)
+        response = self.get_session().post(self.BASE_URL + '/v1/tokenize', json={'language': model_name, 'text': text})
         response_data = response.json()        
 
         if response.status_code == 200:
@@ -68,6 +68,7 @@ class TestServiceDictionaryLookup(cloudlanguagetools.dictionarylookup.Dictionary
         self.service = service
         self.service_fee = service_fee
         self.language = language
+        self.target_language = cloudlanguagetools.languages.Language.en
         self.name = name
         self.lookup_key = lookup_key
 
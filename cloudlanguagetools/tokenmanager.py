@@ -0,0 +1,72 @@
+"""cache for bearer tokens (azure speech, cereproc), refreshed in the background shortly before they expire.
+when there is no valid token, only one thread fetches it, the others wait for it"""
+
+import time
+import logging
+import threading
+import concurrent.futures
+
+import cloudlanguagetools.constants
+
+logger = logging.getLogger(__name__)
+
+class TokenManager():
+    def __init__(self, fetch_token_fn, refresh_margin=cloudlanguagetools.constants.TokenRefreshMargin,
+                 refresh_ahead=cloudlanguagetools.constants.TokenRefreshAhead):
+        """fetch_token_fn returns (token, expires_in seconds).
+        the token is considered expired refresh_margin seconds before it actually expires,
+        a background refresh starts refresh_ahead seconds before that"""
+        self.fetch_token_fn = fetch_token_fn
+        self.refresh_margin = refresh_margin
+        self.refresh_ahead = refresh_ahead
+        self.lock = threading.Lock()
+        self.token = None
+        self.expires_at = 0
+        # Future of the fetch currently in progress
+        self.inflight = None
+        self.fetch_count = 0
+
+    def fetch(self, future):
+        try:
+            token, expires_in = self.fetch_token_fn()
+        except Exception as e:
+            with self.lock:
+                self.inflight = None
+            future.set_exception(e)
+            return
+        with self.lock:
+            self.token = token
+            self.expires_at = time.time() + expires_in - self.refresh_margin
+            self.fetch_count += 1
+            self.inflight = None
+        future.set_result(token)
+
+    def background_fetch(self, future):
+        self.fetch(future)
+        if future.exception() != None:
+            # the current token is still valid, the next get_token call will retry
+            logger.warning(f'could not refresh token in the background: {future.exception()}')
+
+    def get_token(self):
+        start_fetch = False
+        with self.lock:
+            now = time.time()
+            if self.token != None and now < self.expires_at:
+                if now >= self.expires_at - self.refresh_ahead and self.inflight == None:
+                    self.inflight = concurrent.futures.Future()
+                    threading.Thread(target=self.background_fetch, args=(self.inflight,), daemon=True).start()
+                return self.token
+            future = self.inflight
+            if future == None:
+                future = concurrent.futures.Future()
+                self.inflight = future
+                start_fetch = True
+        if start_fetch:
+            self.fetch(future)
+        return future.result()
+
+    def invalidate(self):
+        """discard the current token, for example after the service rejected it"""
+        with self.lock:
+            self.token = None
+            self.expires_at = 0
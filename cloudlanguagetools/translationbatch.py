@@ -0,0 +1,57 @@
+"""helpers for Service.get_translation_batch, results are {'translation': text} or {'error': message}, in input order"""
+
+import logging
+
+import cloudlanguagetools.errors
+
+logger = logging.getLogger(__name__)
+
+def translation_item(translation):
+    return {'translation': translation}
+
+def error_item(error_message):
+    return {'error': error_message}
+
+def chunk_texts(texts, max_items, max_chars):
+    """split texts into lists of indices, so that each request stays within the provider's item and character limits.
+    a text longer than max_chars goes into its own chunk, the provider will report an error for it"""
+    chunk = []
+    chunk_chars = 0
+    for index, text in enumerate(texts):
+        text_chars = len(text)
+        if len(chunk) > 0 and (len(chunk) >= max_items or chunk_chars + text_chars > max_chars):
+            yield chunk
+            chunk = []
+            chunk_chars = 0
+        chunk.append(index)
+        chunk_chars += text_chars
+    if len(chunk) > 0:
+        yield chunk
+
+def translate_item(service, text, from_language_key, to_language_key):
+    try:
+        return translation_item(service.get_translation(text, from_language_key, to_language_key))
+    except cloudlanguagetools.errors.RequestError as e:
+        return error_item(str(e))
+    except Exception as e:
+        logger.exception(f'could not translate text [{text}] with {service.__class__.__name__}')
+        return error_item(str(e))
+
+def translate_chunked(texts, max_items, max_chars, translate_chunk_fn):
+    """translate_chunk_fn receives a list of texts and returns the list of translations.
+    if a request fails, all the items in that chunk get the error"""
+    result = [None] * len(texts)
+    for chunk in chunk_texts(texts, max_items, max_chars):
+        chunk_texts_list = [texts[i] for i in chunk]
+        try:
+            translations = translate_chunk_fn(chunk_texts_list)
+            if len(translations) != len(chunk):
+                raise cloudlanguagetools.errors.RequestError(f'expected {len(chunk)} translations, got {len(translations)}')
+            for index, translation in zip(chunk, translations):
+                result[index] = translation_item(translation)
+        except Exception as e:
+            if not isinstance(e, cloudlanguagetools.errors.RequestError):
+                logger.exception(f'could not translate batch of {len(chunk)} texts')
+            for index in chunk:
+                result[index] = error_item(str(e))
+    return result
@@ -1,3 +1,4 @@
+import asyncio
 import requests
 import urllib
 import hashlib
@@ -12,6 +13,9 @@ import cloudlanguagetools.ttsvoice
 import cloudlanguagetools.translationlanguage
 import cloudlanguagetools.transliterationlanguage
 import cloudlanguagetools.errors
+import cloudlanguagetools.asynchttp
+
+import aiohttp
 
 logger = logging.getLogger(__name__)
 
@@ -41,8 +45,10 @@ class VocalWareVoice(cloudlanguagetools.ttsvoice.TtsVoice):
 
 
 class VocalWareService(cloudlanguagetools.service.Service):
+    CATALOG_TTL = cloudlanguagetools.constants.CatalogStaticTTL
+
     def __init__(self):
-        pass
+        self.url_base = 'http://www.vocalware.com'
 
     def configure(self, config):
         self.secret_phrase = config['secret_phrase']
@@ -52,10 +58,7 @@ class VocalWareService(cloudlanguagetools.service.Service):
     def get_translation(self, text, from_language_key, to_language_key):
         raise cloudlanguagetools.errors.RequestError('not supported')
 
-    def get_tts_audio(self, text, voice_key, options):
-        output_temp_file = tempfile.NamedTemporaryFile()
-        output_temp_filename = output_temp_file.name
-
+    def get_audio_url(self, text, voice_key):
         urlencoded_text = urllib.parse.unquote_plus(text)
 
         # checksum calculation
@@ -64,19 +67,36 @@ class VocalWareService(cloudlanguagetools.service.Service):
         checksum = hashlib.md5(checksum_input.encode('utf-8')).hexdigest()
 
         url_parameters = f"""EID={voice_key['engine_id']}&LID={voice_key['language_id']}&VID={voice_key['voice_id']}&TXT={urlencoded_text}&ACC={self.account_id}&API={self.api_id}&CS={checksum}"""
-        url = f"""http://www.vocalware.com/tts/gen.php?{url_parameters}"""
+        return f"""{self.url_base}/tts/gen.php?{url_parameters}"""
+
+    def has_timeout_header(self, headers):
+        if '408 Request Timeout' in headers.get('X-Error', ''):
+            logger.warn(f"found timeout in response header: {headers['X-Error']}, {headers.get('X-ErrorLine')}")
+            return True
+        return False
+
+    def get_error(self, status_code, content, has_timeout_response_header):
+        if has_timeout_response_header:
+            return cloudlanguagetools.errors.TimeoutError(f'timeout while retrieving VocalWare audio')
+        # reformat certain error messages
+        if status_code == 503:
+            return cloudlanguagetools.errors.RequestError(f'VocalWare service temporarily unavailable (503)')
+        return cloudlanguagetools.errors.RequestError(f'Status code: {status_code}: {content}')
+
+    def get_tts_audio(self, text, voice_key, options):
+        output_temp_file = tempfile.NamedTemporaryFile()
+        output_temp_filename = output_temp_file.name
+
+        url = self.get_audio_url(text, voice_key)
 
         retry_count = 3
         has_timeout_response_header = False
         while retry_count > 0:
             logger.debug(f'retrieving url {url}, retry_count: {retry_count}')
             try:
-                response = requests.get(url, timeout=cloudlanguagetools.constants.RequestTimeout)
+                response = self.get_session().get(url)
                 logger.debug(f'response.status_code: {response.status_code}')
-                has_timeout_response_header = False
-                if '408 Request Timeout' in response.headers.get('X-Error', ''):
-                    logger.warn(f"found timeout in response header: {response.headers['X-Error']}, {response.headers['X-ErrorLine']}")
-                    has_timeout_response_header = True
+                has_timeout_response_header = self.has_timeout_header(response.headers)
                 if response.status_code == 200 and has_timeout_response_header == False:
                     with open(output_temp_filename, 'wb') as audio:
                         audio.write(response.content)
@@ -86,17 +106,29 @@ class VocalWareService(cloudlanguagetools.service.Service):
             retry_count -= 1
             time.sleep(1)
 
-        response_data = response.content
-        error_message = f'Status code: {response.status_code}: {response_data}'
+        raise self.get_error(response.status_code, response.content, has_timeout_response_header)
 
-        if has_timeout_response_header:
-            raise cloudlanguagetools.errors.TimeoutError(f'timeout while retrieving VocalWare audio')
+    async def aget_tts_audio(self, text, voice_key, options):
+        url = self.get_audio_url(text, voice_key)
 
-        # reformat certain error messages
-        if response.status_code == 503:
-            error_message = f'VocalWare service temporarily unavailable (503)'
+        retry_count = 3
+        has_timeout_response_header = False
+        # no response at all if every attempt fails to connect
+        status_code, content = None, b''
+        while retry_count > 0:
+            try:
+                async with cloudlanguagetools.asynchttp.get_session().get(url) as response:
+                    status_code = response.status
+                    content = await response.read()
+                    has_timeout_response_header = self.has_timeout_header(response.headers)
+                if status_code == 200 and has_timeout_response_header == False:
+                    return cloudlanguagetools.asynchttp.write_temp_file(content)
+            except aiohttp.ClientConnectionError as exception:
+                pass # allow the retry logic to proceed
+            retry_count -= 1
+            await asyncio.sleep(1)
 
-        raise cloudlanguagetools.errors.RequestError(error_message)
+        raise self.get_error(status_code, content, has_timeout_response_header)
 
     def get_tts_voice_list(self):
         # returns list of TtSVoice
@@ -1,5 +1,5 @@
 import json
-import requests
+import asyncio
 import tempfile
 import logging
 import time
@@ -11,6 +11,7 @@ import cloudlanguagetools.ttsvoice
 import cloudlanguagetools.translationlanguage
 import cloudlanguagetools.transliterationlanguage
 import cloudlanguagetools.errors
+import cloudlanguagetools.asynchttp
 
 class VoicenVoice(cloudlanguagetools.ttsvoice.TtsVoice):
     def __init__(self, voice_id, audio_language, gender, name):
@@ -38,8 +39,10 @@ class VoicenVoice(cloudlanguagetools.ttsvoice.TtsVoice):
 note: Voicen Text To Speech service has been decomissioned
 """
 class VoicenService(cloudlanguagetools.service.Service):
+    CATALOG_TTL = cloudlanguagetools.constants.CatalogStaticTTL
+
     def __init__(self):
-        pass
+        self.url_base = 'https://tts.voicen.com'
 
     def configure(self, config):
         self.api_key = config['key']
@@ -69,9 +72,12 @@ class VoicenService(cloudlanguagetools.service.Service):
         return headers
 
     def job_status_ready(self, job_id):
-        check_status_url = f'https://tts.voicen.com/api/v1/jobs/{job_id}/'
-        response = requests.get(check_status_url, headers=self.get_headers(), timeout=cloudlanguagetools.constants.RequestTimeout)
-        status = response.json()['data']['status']        
+        check_status_url = f'{self.url_base}/api/v1/jobs/{job_id}/'
+        response = self.get_session().get(check_status_url, headers=self.get_headers())
+        return self.check_job_status(job_id, response.json())
+
+    def check_job_status(self, job_id, response_data):
+        status = response_data['data']['status']
         if status == 'ready':
             return True
         if status == 'failed':
@@ -86,7 +92,7 @@ class VoicenService(cloudlanguagetools.service.Service):
 
         # create the audio request
         # ========================
-        request_url = 'https://tts.voicen.com/api/v1/jobs/text/'
+        request_url = f'{self.url_base}/api/v1/jobs/text/'
         data = {
             'text': text,
             'lang': voice_key['lang'],
@@ -94,7 +100,7 @@ class VoicenService(cloudlanguagetools.service.Service):
         }
 
         logging.info(f'requesting audio for {text}, voice_key {voice_key}')
-        response = requests.post(request_url, json=data, headers=self.get_headers(), timeout=cloudlanguagetools.constants.RequestTimeout)
+        response = self.get_session().post(request_url, json=data, headers=self.get_headers())
         if response.status_code != 200:
             error_message = f"Status code: {response.status_code} reason: {response.reason}"
             raise cloudlanguagetools.errors.RequestError(error_message)
@@ -119,9 +125,9 @@ class VoicenService(cloudlanguagetools.service.Service):
         # retrieve audio
         # ==============
 
-        retrieve_url = f'https://tts.voicen.com/api/v1/jobs/{job_id}/synthesize/'
+        retrieve_url = f'{self.url_base}/api/v1/jobs/{job_id}/synthesize/'
         logging.info(f'retrieving result from url {retrieve_url}')
-        response = requests.get(retrieve_url, headers=self.get_headers())
+        response = self.get_session().get(retrieve_url, headers=self.get_headers())
 
         if response.status_code == 200:
             with open(output_temp_filename, 'wb') as audio:
@@ -132,6 +138,37 @@ class VoicenService(cloudlanguagetools.service.Service):
         error_message = f"Could not retrieve audio from Voicen: status code: {response.status_code} reason: {response.reason}]]"
         raise cloudlanguagetools.errors.RequestError(error_message)
 
+    async def aget_tts_audio(self, text, voice_key, options):
+        session = cloudlanguagetools.asynchttp.get_session()
+        data = {
+            'text': text,
+            'lang': voice_key['lang'],
+            'voice_id': voice_key['voice_id']
+        }
+        async with session.post(f'{self.url_base}/api/v1/jobs/text/', json=data, headers=self.get_headers()) as response:
+            if response.status != 200:
+                error_message = f"Status code: {response.status} reason: {response.reason}"
+                raise cloudlanguagetools.errors.RequestError(error_message)
+            response_data = await response.json(content_type=None)
+        job_id = response_data['data']['id']
+
+        # wait for job to be ready, without holding a thread
+        total_tries = 7
+        wait_time = 0.2
+        for i in range(total_tries):
+            await asyncio.sleep(wait_time)
+            async with session.get(f'{self.url_base}/api/v1/jobs/{job_id}/', headers=self.get_headers()) as response:
+                job_ready = self.check_job_status(job_id, await response.json(content_type=None))
+            if job_ready:
+                break
+            wait_time = wait_time * 2
+
+        async with session.get(f'{self.url_base}/api/v1/jobs/{job_id}/synthesize/', headers=self.get_headers()) as response:
+            if response.status == 200:
+                return cloudlanguagetools.asynchttp.write_temp_file(await response.read())
+            error_message = f"Could not retrieve audio from Voicen: status code: {response.status} reason: {response.reason}]]"
+            raise cloudlanguagetools.errors.RequestError(error_message)
+
 
     def get_transliteration_language_list(self):
         return []
@@ -1,5 +1,5 @@
 import json
-import requests
+import base64
 import tempfile
 import logging
 import pprint
@@ -11,9 +11,15 @@ import cloudlanguagetools.ttsvoice
 import cloudlanguagetools.translationlanguage
 import cloudlanguagetools.transliterationlanguage
 import cloudlanguagetools.errors
+import cloudlanguagetools.translationbatch
+import cloudlanguagetools.asynchttp
 
 logger = logging.getLogger(__name__)
 
+# https://cloud.ibm.com/apidocs/language-translator, the request body is limited to 50KB
+TRANSLATION_BATCH_MAX_ITEMS = 1000
+TRANSLATION_BATCH_MAX_CHARS = 15000 # characters can take up to 3 bytes
+
 def get_translation_language_enum(language_id):
     # print(f'language_id: {language_id}')
     watson_language_id_map = {
@@ -87,7 +93,7 @@ class WatsonService(cloudlanguagetools.service.Service):
         return []
 
     def get_translation_languages(self):
-        response = requests.get(self.translator_url + '/v3/languages?version=2018-05-01', auth=('apikey', self.translator_key), timeout=cloudlanguagetools.constants.RequestTimeout)
+        response = self.get_session().get(self.translator_url + '/v3/languages?version=2018-05-01', auth=('apikey', self.translator_key))
         return response.json()
 
     def get_translation_language_list(self):
@@ -105,7 +111,7 @@ class WatsonService(cloudlanguagetools.service.Service):
         return result        
 
     def list_voices(self):
-        response = requests.get(self.speech_url + '/v1/voices', auth=('apikey', self.speech_key), timeout=cloudlanguagetools.constants.RequestTimeout)
+        response = self.get_session().get(self.speech_url + '/v1/voices', auth=('apikey', self.speech_key))
         data = response.json()
         logger.debug(f'voices: {data}')
         return data['voices']
@@ -123,6 +129,11 @@ class WatsonService(cloudlanguagetools.service.Service):
 
         return result
 
+    def get_basic_auth_header(self, key):
+        """the async requests send the same credentials as auth=('apikey', key)"""
+        credentials = base64.b64encode(f'apikey:{key}'.encode('utf-8')).decode('utf-8')
+        return f'Basic {credentials}'
+
     def get_tts_audio(self, text, voice_key, options):
         output_temp_file = tempfile.NamedTemporaryFile()
         output_temp_filename = output_temp_file.name
@@ -140,7 +151,7 @@ class WatsonService(cloudlanguagetools.service.Service):
             'text': text
         }
 
-        response = requests.post(constructed_url, data=json.dumps(data), auth=('apikey', self.speech_key), headers=headers, timeout=cloudlanguagetools.constants.RequestTimeout)
+        response = self.get_session().post(constructed_url, data=json.dumps(data), auth=('apikey', self.speech_key), headers=headers)
 
         if response.status_code == 200:
             with open(output_temp_filename, 'wb') as audio:
@@ -151,6 +162,20 @@ class WatsonService(cloudlanguagetools.service.Service):
         error_message = f"Status code: {response.status_code} reason: {response.reason} voice: [{voice_name}]]"
         raise cloudlanguagetools.errors.RequestError(error_message)
 
+    async def aget_tts_audio(self, text, voice_key, options):
+        voice_name = voice_key["name"]
+        url = self.speech_url + f'/v1/synthesize?voice={voice_name}'
+        headers = {
+            'Content-Type': 'application/json',
+            'Accept': 'audio/mp3',
+            'Authorization': self.get_basic_auth_header(self.speech_key)
+        }
+        async with cloudlanguagetools.asynchttp.get_session().post(url, json={'text': text}, headers=headers) as response:
+            if response.status == 200:
+                return cloudlanguagetools.asynchttp.write_temp_file(await response.read())
+            error_message = f"Status code: {response.status} reason: {response.reason} voice: [{voice_name}]]"
+            raise cloudlanguagetools.errors.RequestError(error_message)
+
 
     def get_transliteration_language_list(self):
         return []
@@ -161,7 +186,7 @@ class WatsonService(cloudlanguagetools.service.Service):
             'source': from_language_key,
             'target': to_language_key
         }
-        response = requests.post(self.translator_url + '/v3/translate?version=2018-05-01', auth=('apikey', self.translator_key), json=body, timeout=cloudlanguagetools.constants.RequestTimeout)
+        response = self.get_session().post(self.translator_url + '/v3/translate?version=2018-05-01', auth=('apikey', self.translator_key), json=body)
 
         if response.status_code == 200:
             # {'translations': [{'translation': 'Le coût est très bas.'}], 'word_count': 2, 'character_count': 4}
@@ -169,4 +194,37 @@ class WatsonService(cloudlanguagetools.service.Service):
             return data['translations'][0]['translation']
 
         error_message = error_message = f'Watson: could not translate text [{text}] from {from_language_key} to {to_language_key} ({response.json()})'
-        raise cloudlanguagetools.errors.RequestError(error_message)
\ No newline at end of file
+        raise cloudlanguagetools.errors.RequestError(error_message)
+
+    async def aget_translation(self, text, from_language_key, to_language_key):
+        body = {
+            'text': text,
+            'source': from_language_key,
+            'target': to_language_key
+        }
+        url = self.translator_url + '/v3/translate?version=2018-05-01'
+        headers = {'Authorization': self.get_basic_auth_header(self.translator_key)}
+        async with cloudlanguagetools.asynchttp.get_session().post(url, headers=headers, json=body) as response:
+            if response.status == 200:
+                data = await response.json()
+                return data['translations'][0]['translation']
+            # error responses aren't necessarily json
+            error_text = await response.text()
+
+        error_message = f'Watson: could not translate text [{text}] from {from_language_key} to {to_language_key} ({error_text})'
+        raise cloudlanguagetools.errors.RequestError(error_message)
+
+    def get_translation_batch(self, texts, from_language_key, to_language_key):
+        def translate_chunk(chunk_texts):
+            body = {
+                'text': chunk_texts,
+                'source': from_language_key,
+                'target': to_language_key
+            }
+            response = self.get_session().post(self.translator_url + '/v3/translate?version=2018-05-01', auth=('apikey', self.translator_key), json=body)
+            if response.status_code == 200:
+                return [translation['translation'] for translation in response.json()['translations']]
+            error_message = f'Watson: could not translate {len(chunk_texts)} texts from {from_language_key} to {to_language_key} ({response.json()})'
+            raise cloudlanguagetools.errors.RequestError(error_message)
+
+        return cloudlanguagetools.translationbatch.translate_chunked(texts, TRANSLATION_BATCH_MAX_ITEMS, TRANSLATION_BATCH_MAX_CHARS, translate_chunk)
@@ -1,7 +1,12 @@
-import json
+import os
+import sys
+import array
+import timeit
 import requests
 import tempfile
 import logging
+import threading
+import urllib.parse
 import clt_wenlin
 import sqlite3
 
@@ -11,6 +16,135 @@ import cloudlanguagetools.languages
 import cloudlanguagetools.errors
 import cloudlanguagetools.dictionarylookup
 
+logger = logging.getLogger(__name__)
+
+# when set to yes, load_data() loads the whole dictionary in memory, lookups don't touch sqlite anymore
+WENLIN_IN_MEMORY = os.environ.get('CLOUDLANGUAGETOOLS_CORE_WENLIN_IN_MEMORY', 'no') == 'yes'
+
+# lookups read the senses table (database revB), one row per definition, no json parsing.
+# a sense row is (part_of_speech, definition, measure_word), definition is NULL for a part of speech without definitions
+SENSE_COLUMNS = 'part_of_speech, definition, measure_word'
+
+# the column can't be a query parameter, one statement per column.
+# sqlite3 keeps prepared statements per connection, so each is only compiled once per thread
+SENSES_QUERY_MAP = {
+    'simplified': f'SELECT {SENSE_COLUMNS} FROM senses WHERE simplified=? ORDER BY rowid',
+    'traditional': f'SELECT {SENSE_COLUMNS} FROM senses WHERE traditional=? ORDER BY rowid',
+}
+
+# batch lookups use IN (...) with this many parameters at most, to stay well under sqlite's parameter limit.
+# the parameter count is padded to a power of two with NULL (which never matches), so that only a few
+# statement shapes get prepared
+BATCH_QUERY_SIZE = 512
+
+# reverse lookup (english to chinese): the definitions matching the text in the FTS5 definitions table, best bm25 rank first
+# (bm25 is lower for better matches, the entry_id column gets no weight). the headwords are read from words,
+# through the unique index on entry_id. an entry can match with several definitions, and different entries (readings)
+# can have the same headword, so headwords are grouped, keeping their best rank, before the limit is applied.
+# the matches are MATERIALIZED, bm25 can't be evaluated once the FTS5 query is flattened into the GROUP BY
+REVERSE_QUERY_MAP = {column: f"""WITH matches AS MATERIALIZED
+    (SELECT entry_id, bm25(definitions, 1.0, 0.0) AS rank FROM definitions WHERE definitions MATCH ?)
+    SELECT words.{column} FROM matches JOIN words ON words.entry_id = matches.entry_id
+    GROUP BY words.{column} ORDER BY MIN(matches.rank) LIMIT ?""" for column in ['simplified', 'traditional']}
+
+def get_reverse_match_query(text):
+    """search the definition column for the text as a phrase, so that FTS5 query syntax in the text is not interpreted"""
+    phrase = text.replace('"', '""')
+    return f'definition : "{phrase}"'
+
+def get_batch_query_params(texts):
+    """the texts, padded with NULL to the next power of two"""
+    param_count = 1
+    while param_count < len(texts):
+        param_count *= 2
+    return texts + [None] * (param_count - len(texts))
+
+def get_batch_query(column, count):
+    placeholders = ','.join(['?'] * count)
+    return f'SELECT {column}, {SENSE_COLUMNS} FROM senses WHERE {column} IN ({placeholders}) ORDER BY rowid'
+
+class WenlinMemoryIndex():
+    """the senses table, loaded in memory. sense rows are stored in a single list (the arena) grouped by entry,
+    entry_offsets[i]:entry_offsets[i + 1] are the rows of entry i. simplified and traditional map a word
+    to the indices of its entries. strings repeated across rows (parts of speech, measure words) are interned"""
+    def __init__(self, connection):
+        starttime = timeit.default_timer()
+        self.arena = []
+        self.entry_offsets = array.array('I')
+        self.word_maps = {
+            'simplified': {},
+            'traditional': {},
+        }
+        current_entry_id = None
+        entry_index = -1
+        query = f'SELECT entry_id, simplified, traditional, {SENSE_COLUMNS} FROM senses ORDER BY rowid'
+        for entry_id, simplified, traditional, part_of_speech, definition, measure_word in connection.execute(query):
+            if entry_id != current_entry_id:
+                current_entry_id = entry_id
+                entry_index += 1
+                self.entry_offsets.append(len(self.arena))
+                self.add_word('simplified', simplified, entry_index)
+                self.add_word('traditional', traditional, entry_index)
+            if part_of_speech != None:
+                part_of_speech = sys.intern(part_of_speech)
+            if measure_word != None:
+                measure_word = sys.intern(measure_word)
+            self.arena.append((part_of_speech, definition, measure_word))
+        self.entry_offsets.append(len(self.arena))
+        # most words have a single entry, store those as an int rather than a tuple
+        for word_map in self.word_maps.values():
+            for word, entry_indices in word_map.items():
+                word_map[word] = entry_indices[0] if len(entry_indices) == 1 else tuple(entry_indices)
+        self.load_time = timeit.default_timer() - starttime
+        self.memory_bytes = self.get_memory_bytes()
+        logger.info(f'loaded wenlin dictionary in memory: {len(self.entry_offsets) - 1} entries, '
+            f'{self.memory_bytes / (1024 * 1024):.0f}MB, {self.load_time:.1f}s')
+
+    def add_word(self, column, word, entry_index):
+        if word == None:
+            return
+        self.word_maps[column].setdefault(word, []).append(entry_index)
+
+    def get_sense_rows(self, column, text):
+        entry_indices = self.word_maps[column].get(text, ())
+        if type(entry_indices) is int:
+            return self.arena[self.entry_offsets[entry_indices]:self.entry_offsets[entry_indices + 1]]
+        result = []
+        for entry_index in entry_indices:
+            result.extend(self.arena[self.entry_offsets[entry_index]:self.entry_offsets[entry_index + 1]])
+        return result
+
+    def get_memory_bytes(self):
+        """approximate size of the index: containers, row tuples, and each distinct string once"""
+        total = sys.getsizeof(self.arena) + sys.getsizeof(self.entry_offsets)
+        seen_ids = set()
+        def add_object(obj):
+            nonlocal total
+            if obj == None or id(obj) in seen_ids:
+                return
+            seen_ids.add(id(obj))
+            total += sys.getsizeof(obj)
+        for row in self.arena:
+            total += sys.getsizeof(row)
+            for value in row:
+                add_object(value)
+        for word_map in self.word_maps.values():
+            total += sys.getsizeof(word_map)
+            for word, entry_indices in word_map.items():
+                add_object(word)
+                add_object(entry_indices)
+        return total
+
+    def get_stats(self):
+        return {
+            'entry_count': len(self.entry_offsets) - 1,
+            'sense_count': len(self.arena),
+            'simplified_count': len(self.word_maps['simplified']),
+            'traditional_count': len(self.word_maps['traditional']),
+            'memory_bytes': self.memory_bytes,
+            'load_time': self.load_time
+        }
+
 class WenlinDictionaryLookup(cloudlanguagetools.dictionarylookup.DictionaryLookup):
     def __init__(self, source_language, lookup_type):
         self.service = cloudlanguagetools.constants.Service.Wenlin
@@ -31,13 +165,45 @@ class WenlinDictionaryLookup(cloudlanguagetools.dictionarylookup.DictionaryLooku
     def get_lookup_shortname(self):
         return f'Wenlin, {self.lookup_type.name}'
 
+class WenlinReverseDictionaryLookup(WenlinDictionaryLookup):
+    """english to chinese, returns the headwords whose definitions match"""
+    def __init__(self, target_language, lookup_type):
+        super().__init__(cloudlanguagetools.languages.Language.en, lookup_type)
+        self.target_language = target_language
+
+    def get_lookup_key(self):
+        return {
+            'language': self.language.name,
+            'target_language': self.target_language.name,
+            'lookup_type': self.lookup_type.name
+        }
+
 
 class WenlinService(cloudlanguagetools.service.Service):
+    CATALOG_TTL = cloudlanguagetools.constants.CatalogStaticTTL
+
     def __init__(self):
-        pass
+        # None: the path where clt_wenlin downloads the database
+        self.db_path = None
+        self.thread_local = threading.local()
+        # WenlinMemoryIndex, when the in-memory mode is enabled
+        self.memory_index = None
 
     def configure(self, config):
         pass
+
+    def load_data(self):
+        if WENLIN_IN_MEMORY:
+            self.load_memory_index()
+
+    def load_memory_index(self):
+        """serve lookups from memory, the sqlite database stays the fallback when this isn't called"""
+        self.memory_index = WenlinMemoryIndex(self.get_connection())
+
+    def get_memory_index_stats(self):
+        if self.memory_index == None:
+            return None
+        return self.memory_index.get_stats()
     
     def get_tts_voice_list(self):
         return []
@@ -71,75 +237,79 @@ class WenlinService(cloudlanguagetools.service.Service):
                 WenlinDictionaryLookup(language, cloudlanguagetools.constants.DictionaryLookupType.PartOfSpeechDefinitions),
             ])
 
+        for target_language in [
+            cloudlanguagetools.languages.Language.zh_cn,
+            cloudlanguagetools.languages.Language.zh_tw
+        ]:
+            result.append(WenlinReverseDictionaryLookup(target_language, cloudlanguagetools.constants.DictionaryLookupType.Definitions))
+
         return result
 
+    def get_db_path(self):
+        if self.db_path != None:
+            return self.db_path
+        return clt_wenlin.get_wenlin_db_path()
+
     def get_connection(self):
-        db_filepath = clt_wenlin.get_wenlin_db_path()
-        connection = sqlite3.connect(db_filepath)
+        """one connection per thread, kept open. the database file never changes while the process runs,
+        so it's opened read-only and immutable (no locking, no change detection) and memory-mapped"""
+        connection = getattr(self.thread_local, 'connection', None)
+        if connection == None:
+            db_path = self.get_db_path()
+            if not os.path.isfile(db_path):
+                # the database is downloaded (or migrated from the previous revision) when clt_wenlin is installed,
+                # never while serving requests
+                raise FileNotFoundError(f'Wenlin database {db_path} not found ({clt_wenlin.WENLIN_DB_REV}), '
+                    'run clt_wenlin.download_wenlin_db()')
+            db_uri = f'file:{urllib.parse.quote(db_path)}?mode=ro&immutable=1'
+            connection = sqlite3.connect(db_uri, uri=True)
+            connection.execute(f'PRAGMA mmap_size={cloudlanguagetools.constants.WenlinMmapSize}')
+            connection.execute(f'PRAGMA cache_size=-{cloudlanguagetools.constants.WenlinCacheSizeKb}')
+            self.thread_local.connection = connection
         return connection
 
-    def iterate_dictionary_results(self, text, lookup_key):
-        connection = self.get_connection()
+    def is_reverse_lookup(self, lookup_key):
+        return lookup_key['language'] == cloudlanguagetools.languages.Language.en.name
 
-        language = cloudlanguagetools.languages.Language[lookup_key['language']]
+    def get_column(self, lookup_key):
+        language = cloudlanguagetools.languages.Language[lookup_key.get('target_language', lookup_key['language'])]
         column_map = {
             cloudlanguagetools.languages.Language.zh_cn: 'simplified',
             cloudlanguagetools.languages.Language.zh_tw: 'traditional',
             cloudlanguagetools.languages.Language.yue: 'traditional',
         }
-        column = column_map[language]
+        return column_map[language]
 
-        query = f"""SELECT entry FROM words WHERE {column}='{text}'"""
-        cur = connection.cursor()
-        for row in cur.execute(query):
-            entry_json_str = row[0]
-            entry_json = json.loads(entry_json_str)
-            yield entry_json
+    def get_sense_rows(self, text, lookup_key):
+        column = self.get_column(lookup_key)
+        if self.memory_index != None:
+            return self.memory_index.get_sense_rows(column, text)
+        connection = self.get_connection()
+        return connection.execute(SENSES_QUERY_MAP[column], (text,)).fetchall()
 
-        connection.close()
+    def collect_definitions(self, sense_rows):
+        return [definition for part_of_speech, definition, measure_word in sense_rows if definition != None]
 
-    def collect_definitions(self, generator):
-        result = []
-        for entry in generator:
-            # definitions
-            for part_of_speech in entry['parts_of_speech']:
-                for definition in part_of_speech['definitions']:
-                    result.append(definition['definition'])        
+    def collect_partofspeech(self, sense_rows):
+        result = list(set([part_of_speech for part_of_speech, definition, measure_word in sense_rows]))
+        result.sort()
         return result
 
-    def collect_partofspeech(self, generator):
-        result = []
-        for entry in generator:
-            for part_of_speech in entry['parts_of_speech']:
-                result.append(part_of_speech['part_of_speech'])
-
-        result = list(set(result))
-        result.sort()                
+    def collect_measureword(self, sense_rows):
+        result = list(set([measure_word for part_of_speech, definition, measure_word in sense_rows if measure_word != None]))
+        result.sort()
         return result
 
-    def collect_measureword(self, generator):
-        result = []
-        for entry in generator:
-            for part_of_speech in entry['parts_of_speech']:
-                for definition in part_of_speech['definitions']:
-                    if 'measure_word' in definition:
-                        result.append(definition['measure_word'])
-        result = list(set(result))
-        result.sort()                
-        return result                      
-
-    def collect_partofspeech_definitions(self, generator):
+    def collect_partofspeech_definitions(self, sense_rows):
         result = {}
-        for entry in generator:
-            for part_of_speech in entry['parts_of_speech']:
-                if part_of_speech['part_of_speech'] not in result:
-                    result[part_of_speech['part_of_speech']] = []
-                for definition in part_of_speech['definitions']:
-                    result[part_of_speech['part_of_speech']].append(definition['definition'])
+        for part_of_speech, definition, measure_word in sense_rows:
+            definitions = result.setdefault(part_of_speech, [])
+            if definition != None:
+                definitions.append(definition)
         return result
 
-    def collect_result_check_empty(self, generator, collect_result_fn, text):
-        result = collect_result_fn(generator)
+    def collect_result_check_empty(self, sense_rows, collect_result_fn, text):
+        result = collect_result_fn(sense_rows)
 
         not_found_error_msg = f'Wenlin: no results found for {text}'
 
@@ -152,7 +322,7 @@ class WenlinService(cloudlanguagetools.service.Service):
 
         return result
 
-    def get_dictionary_lookup(self, text, lookup_key):
+    def get_collect_result_fn(self, lookup_key):
         lookup_type = cloudlanguagetools.constants.DictionaryLookupType[lookup_key['lookup_type']]
         lookup_type_fn_map = {
             cloudlanguagetools.constants.DictionaryLookupType.Definitions: self.collect_definitions,
@@ -161,7 +331,50 @@ class WenlinService(cloudlanguagetools.service.Service):
             cloudlanguagetools.constants.DictionaryLookupType.PartOfSpeechDefinitions: self.collect_partofspeech_definitions,
         }
 
-        collect_result_fn = lookup_type_fn_map[lookup_type]
-        generator = self.iterate_dictionary_results(text, lookup_key)
+        return lookup_type_fn_map[lookup_type]
 
-        return self.collect_result_check_empty(generator, collect_result_fn, text)
\ No newline at end of file
+    def get_reverse_lookup(self, text, lookup_key):
+        """always served from sqlite, the in-memory index doesn't have the full text index"""
+        column = self.get_column(lookup_key)
+        connection = self.get_connection()
+        rows = connection.execute(REVERSE_QUERY_MAP[column],
+            (get_reverse_match_query(text), cloudlanguagetools.constants.WenlinReverseLookupLimit)).fetchall()
+        result = [headword for headword, in rows]
+        if len(result) == 0:
+            raise cloudlanguagetools.errors.NotFoundError(f'Wenlin: no results found for {text}')
+        return result
+
+    def get_dictionary_lookup(self, text, lookup_key):
+        if self.is_reverse_lookup(lookup_key):
+            return self.get_reverse_lookup(text, lookup_key)
+        collect_result_fn = self.get_collect_result_fn(lookup_key)
+        sense_rows = self.get_sense_rows(text, lookup_key)
+
+        return self.collect_result_check_empty(sense_rows, collect_result_fn, text)
+
+    def get_sense_rows_batch(self, texts, lookup_key):
+        """text -> list of sense rows, for all the texts, in as few queries as possible"""
+        column = self.get_column(lookup_key)
+        distinct_texts = list(dict.fromkeys(texts))
+        if self.memory_index != None:
+            return {text: self.memory_index.get_sense_rows(column, text) for text in distinct_texts}
+        connection = self.get_connection()
+        sense_rows = {text: [] for text in distinct_texts}
+        for i in range(0, len(distinct_texts), BATCH_QUERY_SIZE):
+            query_params = get_batch_query_params(distinct_texts[i:i + BATCH_QUERY_SIZE])
+            for row in connection.execute(get_batch_query(column, len(query_params)), query_params).fetchall():
+                sense_rows[row[0]].append(row[1:])
+        return sense_rows
+
+    def get_dictionary_lookup_batch(self, texts, lookup_key):
+        if self.is_reverse_lookup(lookup_key):
+            return super().get_dictionary_lookup_batch(texts, lookup_key)
+        collect_result_fn = self.get_collect_result_fn(lookup_key)
+        sense_rows = self.get_sense_rows_batch(texts, lookup_key)
+        result = []
+        for text in texts:
+            try:
+                result.append({'result': self.collect_result_check_empty(sense_rows[text], collect_result_fn, text)})
+            except cloudlanguagetools.errors.NotFoundError as e:
+                result.append({'error': str(e)})
+        return result
\ No newline at end of file
@@ -6,7 +6,7 @@ from setuptools import setup
 
 
 setup(name='clt_requirements',
-      version='1.7',
+      version='1.9',
       description='Helper module for Cloud Language Tools, additional dependencies',
       url='https://github.com/Language-Tools/cloud-language-tools-core',
       author='Luc',
@@ -31,8 +31,9 @@ setup(name='clt_requirements',
         'openai>=1.7.2',
         'pydantic',
         'cachetools',
-        'clt_wenlin',
+        'clt_wenlin>=1.1',
         'pinyin_jyutping',
-        'StrEnum'
+        'StrEnum',
+        'aiohttp'
       ],
       )
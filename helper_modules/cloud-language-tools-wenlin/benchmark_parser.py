@@ -0,0 +1,193 @@
+"""compare the time and peak RSS of building the wenlin database with the streaming parser and the previous parser.
+usage: python benchmark_parser.py --dictionary /path/to/cidian.u8 | --synthetic 100000"""
+
+import os
+import re
+import sys
+import json
+import timeit
+import logging
+import argparse
+import resource
+import tempfile
+import subprocess
+
+import clt_wenlin
+
+logger = logging.getLogger('benchmark_parser')
+
+# a few entries in the source format, repeated with different serial numbers for --synthetic
+SYNTHETIC_ENTRIES = """.py   a*
+char   啊
+gr   A
+ser   {serial_1}
+ref   1
+ps   m.p.
+psx   [en] used as phrase suffix
+psx   [fr] utilisé comme suffixe de phrase
+1psx   [en] in enumeration
+1psx   [fr] dans les énumérations
+1ex   Qián ∼, shū ∼, biǎo ∼, wǒ dōu diū le.
+1hz   钱∼, 书∼, 表∼, 我都丢了。
+1tr   [en] Money, books, watch, I lost everything.
+1tr   [fr] J'ai tout perdu : de l'argent, des livres et ma montre.
+2psx   [en] in direct address and exclamation
+2psx   [fr] pour s'adresser directement à quelqu'un ou pour une exclamation
+rem@2004.05.24   ?missing: {{wang}} cw: Ignore. Proper N.
+hh   ¹ā [1000000160]
+freq   609.7 [XHPC:1102]
+--meta--
+timestamp 2015-12-18T09:57:26Z
+.py   āizhe
+char   挨着[-著]
+ser   {serial_2}
+gr   *
+ref   61
+1ps   v.
+1df   be next to; get close to
+2ps   adv.
+2df@   one by one
+2ex   yī gè ∼ yī gè guòqu
+2hz   一个∼一个过去
+2tr   pass one by one
+1mw   个
+--meta--
+timestamp 2015-06-25T14:46:25Z
+"""
+
+# the parser before the single-pass rewrite, for comparison
+def legacy_iterate_lines(lines):
+    current_entry = None
+    ignore_current_entry = False
+    lines_read = 0    
+    entries = []    
+    ignored_entries = []
+    for line in lines:
+        try:
+            m = re.match(r'\.py\s+([^\s]+)', line)
+            if m != None:
+                pinyin = m.groups()[0]
+                if current_entry != None and ignore_current_entry == False:
+                    entries.append(current_entry)
+                if ignore_current_entry == True:
+                    ignored_entries.append(current_entry)
+                ignore_current_entry = False
+                current_entry = clt_wenlin.DictionaryEntry()
+                current_entry.pinyin = pinyin
+            m = re.match(r'char\s+(.+)$', line)
+            if m != None:
+                simplified, traditional = clt_wenlin.process_characters(m.groups()[0])
+                current_entry.simplified = simplified
+                current_entry.traditional = traditional
+
+            m = re.match(r'ser\s+([0-9]+)$', line)
+            if m != None:
+                current_entry.entry_id = int(m.groups()[0])
+
+            m = re.match(r'[0-9]*(df[^\s]*|psx.{0,1})\s+(.+)$', line)
+            if m != None:
+                definition = clt_wenlin.process_definition(m.groups()[1])
+                if definition != None:
+                    current_entry.add_definition(definition)
+                continue
+
+            m = re.match(r'[0-9]*ps.{0,1}\s+(.+)$', line)
+            if m != None:
+                current_entry.add_part_of_speech(m.groups()[0])
+                continue
+
+            m = re.match(r'[0-9]*mw\s+(.+)$', line)
+            if m != None:
+                current_entry.add_measure_word(m.groups()[0])
+
+            m = re.match(r'[0-9]*ex\s+(.+)$', line)
+            if m != None:
+                current_entry.add_example_pinyin(m.groups()[0])                
+
+            m = re.match(r'[0-9]*hz\s+(.+)$', line)
+            if m != None:
+                current_entry.add_example_chinese(m.groups()[0])
+
+            m = re.match(r'[0-9]*tr\s+(.+)$', line)
+            if m != None:
+                translation = clt_wenlin.process_definition(m.groups()[0])
+                if translation != None:
+                    current_entry.add_example_translation(translation)
+
+            lines_read += 1
+            if lines_read % 10000 == 0:
+                logger.debug(f'read {lines_read} lines')
+        except Exception as e:
+            logger.exception(f'while processing {[line.strip()]}, {current_entry}')
+            ignore_current_entry = True
+            # raise e
+
+    if ignore_current_entry == False:
+        entries.append(current_entry)
+
+    logger.error(f'ignored entries: {len(ignored_entries)}')
+
+    return entries
+
+def legacy_read_dictionary_file(filepath):
+    f = open(filepath, 'r')
+    entries = legacy_iterate_lines(f)
+    f.close()
+
+    return entries
+
+def write_synthetic_dictionary(entry_count):
+    dictionary_file = tempfile.NamedTemporaryFile(mode='w', suffix='.u8', delete=False)
+    for i in range(0, entry_count, 2):
+        dictionary_file.write(SYNTHETIC_ENTRIES.format(serial_1=1000000000 + i, serial_2=1000000000 + i + 1))
+    dictionary_file.close()
+    return dictionary_file.name
+
+def build(parser, dictionary_filepath):
+    sqlite_file = tempfile.NamedTemporaryFile(suffix='.db')
+    os.remove(sqlite_file.name)
+    starttime = timeit.default_timer()
+    if parser == 'streaming':
+        clt_wenlin.create_sqlite_file(dictionary_filepath, sqlite_file.name)
+    else:
+        clt_wenlin.write_sqlite_file(legacy_read_dictionary_file(dictionary_filepath), sqlite_file.name)
+    time_diff = timeit.default_timer() - starttime
+    print(json.dumps({'time': time_diff, 'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}))
+
+def check(dictionary_filepath):
+    """both parsers must produce the same entries"""
+    with open(dictionary_filepath) as f:
+        legacy_entries = [(entry.entry_id, entry.to_dict()) for entry in legacy_iterate_lines(f)]
+    streaming_entries = [(entry.entry_id, entry.to_dict()) for entry in clt_wenlin.iterate_dictionary_file(dictionary_filepath)]
+    assert legacy_entries == streaming_entries, 'parsers returned different entries'
+    print(f'both parsers returned the same {len(streaming_entries)} entries')
+
+if __name__ == '__main__':
+    logging.disable(logging.ERROR)
+    parser = argparse.ArgumentParser(description='benchmark the wenlin dictionary parser')
+    parser.add_argument('--dictionary', help='wenlin source file')
+    parser.add_argument('--synthetic', type=int, help='generate a dictionary with that many entries')
+    parser.add_argument('--check', action='store_true', help='verify that both parsers return the same entries')
+    parser.add_argument('--build', choices=['legacy', 'streaming'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    dictionary_filepath = args.dictionary
+    if args.synthetic != None:
+        dictionary_filepath = write_synthetic_dictionary(args.synthetic)
+
+    if args.build != None:
+        build(args.build, dictionary_filepath)
+        sys.exit(0)
+
+    for parser_name in ['legacy', 'streaming']:
+        command = [sys.executable, __file__, '--build', parser_name, '--dictionary', dictionary_filepath]
+        output = subprocess.run(command, capture_output=True, text=True, check=True).stdout
+        result = json.loads(output.strip().split('\n')[-1])
+        print(f'{parser_name:<10} build time: {result["time"]:.2f}s peak rss: {result["max_rss_kb"] / 1024:.0f}MB')
+
+    # after the builds: on linux, the peak RSS of this process is inherited by the processes it starts
+    if args.check:
+        check(dictionary_filepath)
+
+    if args.synthetic != None:
+        os.remove(dictionary_filepath)
@@ -6,10 +6,18 @@ import sqlite3
 import json
 import tempfile
 import hashlib
+import functools
+import timeit
 
 logger = logging.getLogger(__name__)
 
-WENLIN_DB_REV = 'revA'
+# revA: words table with the full entry as json, definitions FTS table
+# revB: adds the senses table, one row per definition, so that lookups don't need to parse the json
+WENLIN_DB_REV = 'revB'
+WENLIN_DB_PREVIOUS_REV = 'revA'
+
+BULK_INSERT_BATCH_SIZE = 10000 # entries per executemany when building the database
+BUILD_CACHE_SIZE_KB = 64 * 1024 # sqlite page cache while building the database
 
 class Definition():
     def __init__(self, definition):
@@ -117,7 +125,7 @@ class DictionaryEntry():
         return f'simplified: {self.simplified}'
 
 def process_characters(chars):
-    m = re.match('([^\]]+)\[(.*)\]', chars)
+    m = re.match(r'([^\]]+)\[(.*)\]', chars)
     if m == None:
         return chars, chars
     simplified = m.groups()[0]
@@ -138,151 +146,237 @@ def process_definition(definition):
     definition = definition.replace('[en] ', '')
     return definition
 
-def iterate_lines(lines):
+# every line is "<tag> <value>". the tag is dispatched on, rather than trying each field's regex in turn
+LINE_RE = re.compile(r'([^\s]+)\s+(.+)$')
+
+@functools.lru_cache(maxsize=None)
+def get_field(tag):
+    """the field handled for a line tag, or None. definitions, parts of speech, measure words and examples
+    can be numbered (1df, 2ex), df and psx tags can have a suffix (df@fd7a5)"""
+    if tag in ['.py', 'char', 'ser']:
+        return tag
+    field = tag.lstrip('0123456789')
+    if field.startswith('df'):
+        return 'df'
+    if field.startswith('psx') and len(field) <= 4:
+        return 'psx'
+    if field.startswith('ps') and len(field) <= 3:
+        return 'ps'
+    if field in ['mw', 'ex', 'hz', 'tr']:
+        return field
+    return None
+
+def process_line(current_entry, field, value):
+    if field == 'char':
+        simplified, traditional = process_characters(value)
+        current_entry.simplified = simplified
+        current_entry.traditional = traditional
+    elif field == 'ser':
+        if value.isascii() and value.isdigit():
+            current_entry.entry_id = int(value)
+    elif field == 'df' or field == 'psx':
+        definition = process_definition(value)
+        if definition != None:
+            current_entry.add_definition(definition)
+    elif field == 'ps':
+        current_entry.add_part_of_speech(value)
+    elif field == 'mw':
+        current_entry.add_measure_word(value)
+    elif field == 'ex':
+        current_entry.add_example_pinyin(value)
+    elif field == 'hz':
+        current_entry.add_example_chinese(value)
+    elif field == 'tr':
+        translation = process_definition(value)
+        if translation != None:
+            current_entry.add_example_translation(translation)
+
+def iterate_entries(lines):
+    """yield DictionaryEntry objects as they are parsed, entries which couldn't be parsed are skipped"""
     current_entry = None
     ignore_current_entry = False
-    lines_read = 0    
-    entries = []    
-    ignored_entries = []
+    lines_read = 0
+    ignored_entries_count = 0
     for line in lines:
+        lines_read += 1
+        if lines_read % 100000 == 0:
+            logger.debug(f'read {lines_read} lines')
+        m = LINE_RE.match(line)
+        if m == None:
+            continue
+        tag, value = m.groups()
+        field = get_field(tag)
+        if field == None:
+            continue
+        if field == '.py':
+            if current_entry != None and ignore_current_entry == False:
+                yield current_entry
+            if ignore_current_entry == True:
+                ignored_entries_count += 1
+            ignore_current_entry = False
+            current_entry = DictionaryEntry()
+            current_entry.pinyin = value.split()[0]
+            continue
         try:
-            m = re.match('\.py\s+([^\s]+)', line)
-            if m != None:
-                pinyin = m.groups()[0]
-                if current_entry != None and ignore_current_entry == False:
-                    entries.append(current_entry)
-                if ignore_current_entry == True:
-                    ignored_entries.append(current_entry)
-                ignore_current_entry = False
-                current_entry = DictionaryEntry()
-                current_entry.pinyin = pinyin
-            m = re.match('char\s+(.+)$', line)
-            if m != None:
-                simplified, traditional = process_characters(m.groups()[0])
-                current_entry.simplified = simplified
-                current_entry.traditional = traditional
-
-            m = re.match('ser\s+([0-9]+)$', line)
-            if m != None:
-                current_entry.entry_id = int(m.groups()[0])
-
-            m = re.match('[0-9]*(df[^\s]*|psx.{0,1})\s+(.+)$', line)
-            if m != None:
-                definition = process_definition(m.groups()[1])
-                if definition != None:
-                    current_entry.add_definition(definition)
-                continue
-
-            m = re.match('[0-9]*ps.{0,1}\s+(.+)$', line)
-            if m != None:
-                current_entry.add_part_of_speech(m.groups()[0])
-                continue
-
-            m = re.match('[0-9]*mw\s+(.+)$', line)
-            if m != None:
-                current_entry.add_measure_word(m.groups()[0])
-
-            m = re.match('[0-9]*ex\s+(.+)$', line)
-            if m != None:
-                current_entry.add_example_pinyin(m.groups()[0])                
-
-            m = re.match('[0-9]*hz\s+(.+)$', line)
-            if m != None:
-                current_entry.add_example_chinese(m.groups()[0])
-
-            m = re.match('[0-9]*tr\s+(.+)$', line)
-            if m != None:
-                translation = process_definition(m.groups()[0])
-                if translation != None:
-                    current_entry.add_example_translation(translation)
-
-            lines_read += 1
-            if lines_read % 10000 == 0:
-                logger.debug(f'read {lines_read} lines')
+            process_line(current_entry, field, value)
         except Exception as e:
             logger.exception(f'while processing {[line.strip()]}, {current_entry}')
             ignore_current_entry = True
-            # raise e
 
-    if ignore_current_entry == False:
-        entries.append(current_entry)
+    if current_entry != None and ignore_current_entry == False:
+        yield current_entry
 
-    logger.error(f'ignored entries: {len(ignored_entries)}')
+    logger.error(f'ignored entries: {ignored_entries_count}')
 
-    return entries
+def iterate_lines(lines):
+    return list(iterate_entries(lines))
 
-def read_dictionary_file(filepath):
-    f = open(filepath, 'r')
-    entries = iterate_lines(f)
-    f.close()
+def iterate_dictionary_file(filepath):
+    with open(filepath, 'r') as f:
+        yield from iterate_entries(f)
 
-    return entries
+def read_dictionary_file(filepath):
+    return list(iterate_dictionary_file(filepath))
+
+def iterate_sense_rows(entry_id, simplified, traditional, entry_dict):
+    """rows of the senses table for one entry. a part of speech without definitions gets a row with a NULL definition,
+    so that it's still returned by part of speech lookups"""
+    for pos_index, part_of_speech in enumerate(entry_dict['parts_of_speech']):
+        definitions = part_of_speech['definitions']
+        if len(definitions) == 0:
+            yield (simplified, traditional, entry_id, pos_index, part_of_speech['part_of_speech'], None, None, None)
+        for sense_index, definition in enumerate(definitions):
+            yield (simplified, traditional, entry_id, pos_index, part_of_speech['part_of_speech'],
+                sense_index, definition['definition'], definition.get('measure_word', None))
+
+CREATE_SENSES_TABLE_QUERY = '''CREATE TABLE senses (simplified text, traditional text, entry_id integer,
+    pos_index integer, part_of_speech text, sense_index integer, definition text, measure_word text)'''
+
+def create_senses_indices(cur):
+    cur.execute('CREATE INDEX idx_senses_simplified ON senses (simplified)')
+    cur.execute('CREATE INDEX idx_senses_traditional ON senses (traditional)')
+
+def create_senses_table(connection):
+    """revB: denormalized senses, read directly by the dictionary lookups. built from the words table"""
+    cur = connection.cursor()
+    cur.execute(CREATE_SENSES_TABLE_QUERY)
+    words = cur.execute('SELECT simplified, traditional, entry, entry_id FROM words ORDER BY rowid').fetchall()
+    for simplified, traditional, entry_json_str, entry_id in words:
+        cur.executemany('INSERT INTO senses VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            iterate_sense_rows(entry_id, simplified, traditional, json.loads(entry_json_str)))
+    create_senses_indices(cur)
+    connection.commit()
 
 def create_sqlite_file(dict_filepath, sqlite_filepath):
-    entries = read_dictionary_file(dict_filepath)
+    """entries are written as they are parsed, the whole dictionary is never held in memory"""
+    write_sqlite_file(iterate_dictionary_file(dict_filepath), sqlite_filepath)
 
+def iterate_row_batches(entries, batch_size=BULK_INSERT_BATCH_SIZE):
+    """(words rows, senses rows) for batch_size entries at a time"""
+    word_rows = []
+    sense_rows = []
+    for entry in entries:
+        entry_dict = entry.to_dict()
+        word_rows.append((entry.simplified, entry.traditional, json.dumps(entry_dict), entry.entry_id))
+        sense_rows.extend(iterate_sense_rows(entry.entry_id, entry.simplified, entry.traditional, entry_dict))
+        if len(word_rows) >= batch_size:
+            yield word_rows, sense_rows
+            word_rows = []
+            sense_rows = []
+    if len(word_rows) > 0:
+        yield word_rows, sense_rows
+
+def write_sqlite_file(entries, sqlite_filepath):
+    """bulk build: no journal and no fsync (a failed build is simply started over), rows inserted in batches,
+    indices and the FTS table built once all the rows are in"""
+    starttime = timeit.default_timer()
     connection = sqlite3.connect(sqlite_filepath)
     cur = connection.cursor()
-
-    # add word entries (lookup from chinese characters)
-    # =================================================
+    cur.execute('PRAGMA journal_mode=OFF')
+    cur.execute('PRAGMA synchronous=OFF')
+    cur.execute(f'PRAGMA cache_size=-{BUILD_CACHE_SIZE_KB}')
 
     cur.execute('''CREATE TABLE words (simplified text, traditional text, entry text, entry_id integer)''')
+    cur.execute('''CREATE VIRTUAL TABLE definitions USING FTS5(definition, entry_id);''')
+    cur.execute(CREATE_SENSES_TABLE_QUERY)
 
-    for entry in entries:
-        json_string = json.dumps(entry.to_dict())
-        # query = f"""INSERT INTO words VALUES ('{entry.simplified}', '{entry.traditional}', '{json_string}')"""
-        cur.execute("INSERT INTO words VALUES (?, ?, ?, ?)", 
-                    (entry.simplified, entry.traditional, json_string, entry.entry_id))
-    connection.commit()
-        
-    # add indices
-    create_index_query = """CREATE INDEX idx_simplified ON words (simplified);"""
-    cur.execute(create_index_query)
-    create_index_query = """CREATE INDEX idx_traditional ON words (traditional);"""
-    cur.execute(create_index_query)
-    create_index_query = """CREATE UNIQUE INDEX idx_entry_id ON words (entry_id);"""
-    cur.execute(create_index_query)    
+    for word_rows, sense_rows in iterate_row_batches(entries):
+        # word entries (lookup from chinese characters)
+        cur.executemany('INSERT INTO words VALUES (?, ?, ?, ?)', word_rows)
+        # senses
+        cur.executemany('INSERT INTO senses VALUES (?, ?, ?, ?, ?, ?, ?, ?)', sense_rows)
 
-    connection.commit()
+    # definitions (lookup from english), the senses rows with a definition, in the same order as the entries
+    cur.execute('INSERT INTO definitions (definition, entry_id) SELECT definition, entry_id FROM senses WHERE definition IS NOT NULL ORDER BY rowid')
+    cur.execute("INSERT INTO definitions (definitions) VALUES ('optimize')")
 
-    # add definitions
-    # ===============
-    cur.execute('''CREATE VIRTUAL TABLE definitions USING FTS5(definition, entry_id);''')
-    connection.commit()
-
-    for entry in entries:
-        definitions = entry.get_all_definitions()
-        for definition in definitions:
-            cur.execute("INSERT INTO definitions VALUES (?, ?)", (definition, entry.entry_id))
+    # add indices
+    cur.execute("""CREATE INDEX idx_simplified ON words (simplified);""")
+    cur.execute("""CREATE INDEX idx_traditional ON words (traditional);""")
+    cur.execute("""CREATE UNIQUE INDEX idx_entry_id ON words (entry_id);""")
+    create_senses_indices(cur)
+    cur.execute('ANALYZE')
     connection.commit()
 
+    cur.execute('VACUUM')
     connection.close()
-
-def get_wenlin_db_path():
-    return os.path.join('/clt_data', f'wenlin_{WENLIN_DB_REV}.db')
-
-def get_wenlin_db_download_filename():
-    hash_str = hashlib.sha224(f'wenlin_db_{WENLIN_DB_REV}'.encode('utf-8')).hexdigest()
-    filename = f'wenlin_{hash_str}_{WENLIN_DB_REV}.db'
+    logger.info(f'created {sqlite_filepath} in {timeit.default_timer() - starttime:.1f}s')
+
+def migrate_sqlite_file(previous_sqlite_filepath, sqlite_filepath):
+    """create a revB database from a revA one, without the original dictionary file.
+    the new file is built next to the destination and renamed, so readers never see a partial database"""
+    dirname = os.path.dirname(os.path.abspath(sqlite_filepath))
+    fd, temp_filepath = tempfile.mkstemp(dir=dirname, suffix='.db.tmp')
+    os.close(fd)
+    try:
+        shutil.copy(previous_sqlite_filepath, temp_filepath)
+        connection = sqlite3.connect(temp_filepath)
+        create_senses_table(connection)
+        connection.close()
+        os.chmod(temp_filepath, 0o644)
+        os.replace(temp_filepath, sqlite_filepath)
+    except Exception:
+        os.remove(temp_filepath)
+        raise
+    logger.info(f'migrated {previous_sqlite_filepath} to {sqlite_filepath}')
+
+def get_wenlin_db_path(rev=WENLIN_DB_REV):
+    return os.path.join('/clt_data', f'wenlin_{rev}.db')
+
+def get_wenlin_db_download_filename(rev=WENLIN_DB_REV):
+    hash_str = hashlib.sha224(f'wenlin_db_{rev}'.encode('utf-8')).hexdigest()
+    filename = f'wenlin_{hash_str}_{rev}.db'
     return filename
 
-def download_wenlin_db():
-    url = f'https://cloud-language-tools-storage.nyc3.digitaloceanspaces.com/{get_wenlin_db_download_filename()}'
+def download_file(url, output_file):
     temp_file = tempfile.NamedTemporaryFile(prefix='wenlin', suffix='.db')
     print(f'downloading {url}')
     command_line = f'wget --output-document={temp_file.name} {url}'
     exit_status = os.system(command_line)
     if exit_status != 0:
         raise Exception(f'could not run {command_line}')
-    
-    # move into the right path
-    output_file = get_wenlin_db_path()
+
     # create directories
     dirname = os.path.dirname(output_file)
     if not os.path.isdir(dirname):
         os.mkdir(dirname)
-    
+
     shutil.copy(temp_file.name, output_file)
     os.chmod(output_file , 0o644)
     print(f'moved file to {output_file}')
+
+def download_wenlin_db():
+    url = f'https://cloud-language-tools-storage.nyc3.digitaloceanspaces.com/{get_wenlin_db_download_filename()}'
+    try:
+        download_file(url, get_wenlin_db_path())
+        return
+    except Exception as e:
+        print(f'could not download {WENLIN_DB_REV} database: {e}')
+
+    # the current revision isn't available, build it from the previous one
+    previous_db_path = get_wenlin_db_path(WENLIN_DB_PREVIOUS_REV)
+    if not os.path.isfile(previous_db_path):
+        url = f'https://cloud-language-tools-storage.nyc3.digitaloceanspaces.com/{get_wenlin_db_download_filename(WENLIN_DB_PREVIOUS_REV)}'
+        download_file(url, previous_db_path)
+    migrate_sqlite_file(previous_db_path, get_wenlin_db_path())
+    print(f'migrated {previous_db_path} to {get_wenlin_db_path()}')
@@ -3,6 +3,9 @@
 from genericpath import isfile
 import clt_wenlin
 import os
+import logging
+
+logging.basicConfig(format='%(asctime)s %(levelname)-8s [%(filename)s:%(lineno)d] %(message)s', level=logging.INFO)
 
 sqlite_filepath = 'wenlin.db'
 if os.path.isfile(sqlite_filepath):
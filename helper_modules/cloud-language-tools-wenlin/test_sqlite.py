@@ -68,6 +68,13 @@ class TestWenlinSqlite(unittest.TestCase):
         self.maxDiff = None
         self.assertEqual(entry_dict, expected_entry_dict)
 
+        # senses (revB)
+        # =============
+
+        query = """SELECT part_of_speech, definition FROM senses WHERE simplified='啊' ORDER BY rowid"""
+        results = cur.execute(query).fetchall()
+        self.assertEqual(results[0:2], [('m.p.', 'used as phrase suffix'), ('m.p.', 'in enumeration')])
+
         # lookup by definitions
         # =====================
 
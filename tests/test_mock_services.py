@@ -2,7 +2,17 @@ import os
 import sys
 import logging
 import unittest
+import unittest.mock
 import json
+import gzip
+import threading
+import time
+import concurrent.futures
+import asyncio
+import http.server
+import contextlib
+import tempfile
+import sqlite3
 import pytest
 import pprint
 
@@ -15,12 +25,96 @@ import cloudlanguagetools.servicemanager
 from cloudlanguagetools.languages import Language
 from cloudlanguagetools.constants import Service
 import cloudlanguagetools.errors
+import cloudlanguagetools.constants
+import cloudlanguagetools.translationbatch
+import cloudlanguagetools.resultcache
+import cloudlanguagetools.tokenmanager
+import cloudlanguagetools.asynchttp
+import cloudlanguagetools.test_services
 
 def get_manager():
     manager = cloudlanguagetools.servicemanager.ServiceManager()
     manager.configure_default()
     return manager
 
+def get_manager_unconfigured():
+    # the test services don't require any keys
+    return cloudlanguagetools.servicemanager.ServiceManager()
+
+WENLIN_SAMPLE_DICTIONARY = """.py   āizhe
+char   挨着[-著]
+ser   1000039833
+1ps   v.
+1df   be next to; get close to
+2ps   adv.
+2df@   one by one
+2ex   yī gè ∼ yī gè guòqu
+2hz   一个∼一个过去
+2tr   pass one by one
+.py   ¹ànlǐ*
+char   按理
+ser   1000069612
+ps   adv.
+1df@fd7a5   [en] according to reason; in ordinary course of events; normally
+1df@fd7a5   [fr] raisonnablement ; dans le cours normal des événements ; normalement
+2df@vj   [en] by rights
+2df@vj   [fr] par droit"""
+
+def create_wenlin_db():
+    """small wenlin database built from WENLIN_SAMPLE_DICTIONARY, the full one is only available on servers"""
+    import clt_wenlin
+    dictionary_file = tempfile.NamedTemporaryFile(mode='w', suffix='.u8')
+    dictionary_file.write(WENLIN_SAMPLE_DICTIONARY)
+    dictionary_file.flush()
+    db_file = tempfile.NamedTemporaryFile(suffix='.db')
+    os.remove(db_file.name)
+    clt_wenlin.create_sqlite_file(dictionary_file.name, db_file.name)
+    return db_file
+
+def get_wenlin_service(db_file):
+    import cloudlanguagetools.wenlin
+    service = cloudlanguagetools.wenlin.WenlinService()
+    service.db_path = db_file.name
+    return service
+
+def record_calls(service, method_name, fail_texts=[]):
+    """wrap a service method, returns the list of texts it gets called with. texts in fail_texts raise a RequestError"""
+    called_texts = []
+    original_method = getattr(service, method_name)
+    def method(text, *args):
+        called_texts.append(text)
+        if text in fail_texts:
+            raise cloudlanguagetools.errors.RequestError(f'could not process {text}')
+        return original_method(text, *args)
+    setattr(service, method_name, method)
+    return called_texts
+
+@contextlib.contextmanager
+def local_http_server(handle_request):
+    """http server on a free local port, yields its base url.
+    handle_request(method, path, headers, body) returns (status code, response headers, content)"""
+    class RequestHandler(http.server.BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        def handle_method(self):
+            body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            status_code, headers, content = handle_request(self.command, self.path, self.headers, body)
+            self.send_response(status_code)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header('Content-Length', str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+        do_GET = handle_method
+        do_POST = handle_method
+        def log_message(self, format, *args):
+            pass
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), RequestHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        yield f'http://127.0.0.1:{server.server_address[1]}'
+    finally:
+        server.shutdown()
+
 class TestMockServices(unittest.TestCase):
     
     def test_language_data(self):
@@ -57,6 +151,877 @@ class TestMockServices(unittest.TestCase):
         translated_text_obj = json.loads(translated_text_str)
         self.assertEqual(translated_text_obj, translated_text_expected)
 
+    def test_translation_batch(self):
+        if not LOAD_TEST_SERVICES_ONLY:
+            pytest.skip('you must set CLOUDLANGUAGETOOLS_CORE_TEST_SERVICES=yes')
+
+        manager = get_manager_unconfigured()
+        record_calls(manager.services[Service.TestServiceA], 'get_translation', fail_texts=['fail'])
+
+        result = manager.get_translation_batch(['text_1', 'fail', 'text_2'], 'TestServiceA', 'fr', 'en')
+        self.assertEqual(len(result), 3)
+        self.assertEqual(json.loads(result[0]['translation'])['text'], 'text_1')
+        self.assertEqual(result[1], {'error': 'could not process fail'})
+        self.assertEqual(json.loads(result[2]['translation'])['text'], 'text_2')
+
+    def test_translation_batch_chunks(self):
+        texts = ['a' * 10, 'b' * 10, 'c' * 25, 'd' * 5, 'e', 'f']
+        chunks = list(cloudlanguagetools.translationbatch.chunk_texts(texts, 3, 20))
+        self.assertEqual(chunks, [[0, 1], [2], [3, 4, 5]])
+
+        # a failed request reports the error on every item of that chunk only
+        def translate_chunk(chunk_texts):
+            if 'c' * 25 in chunk_texts:
+                raise cloudlanguagetools.errors.RequestError('text too long')
+            return [text.upper() for text in chunk_texts]
+        result = cloudlanguagetools.translationbatch.translate_chunked(texts, 3, 20, translate_chunk)
+        self.assertEqual(result, [
+            {'translation': 'A' * 10},
+            {'translation': 'B' * 10},
+            {'error': 'text too long'},
+            {'translation': 'D' * 5},
+            {'translation': 'E'},
+            {'translation': 'F'},
+        ])
+
+    def test_breakdown(self):
+        if not LOAD_TEST_SERVICES_ONLY:
+            pytest.skip('you must set CLOUDLANGUAGETOOLS_CORE_TEST_SERVICES=yes')
+
+        manager = get_manager_unconfigured()
+        service = manager.services[Service.TestServiceA]
+        def get_tokenization(text, tokenization_key):
+            return [{'token': token, 'lemma': token.lower(), 'can_translate': token != '.', 'can_transliterate': token != '.'}
+                for token in text.split(' ')]
+        service.get_tokenization = get_tokenization
+        translated_texts = record_calls(service, 'get_translation')
+
+        tokenization_option = {'service': 'TestServiceA', 'tokenization_key': {}}
+        translation_option = {'service': 'TestServiceA', 'source_language_id': 'fr', 'target_language_id': 'en'}
+        transliteration_option = {'service': 'TestServiceA', 'transliteration_key': {'name': 'pinyin'}}
+        result = manager.get_breakdown('Le chat le chat .', tokenization_option, translation_option, transliteration_option)
+
+        # each lemma is only translated once
+        self.assertEqual(translated_texts, ['le', 'chat'])
+        self.assertEqual([entry['token'] for entry in result], ['Le', 'chat', 'le', 'chat', '.'])
+        self.assertEqual(json.loads(result[0]['translation'])['text'], 'le')
+        self.assertEqual(json.loads(result[2]['translation'])['text'], 'le')
+        self.assertEqual(json.loads(result[0]['transliteration'])['text'], 'Le')
+        self.assertEqual(json.loads(result[2]['transliteration'])['text'], 'le')
+        self.assertNotIn('translation', result[4])
+        self.assertNotIn('transliteration', result[4])
+
+    def test_result_cache(self):
+        if not LOAD_TEST_SERVICES_ONLY:
+            pytest.skip('you must set CLOUDLANGUAGETOOLS_CORE_TEST_SERVICES=yes')
+
+        # off unless configured
+        self.assertEqual(get_manager_unconfigured().get_result_cache_metrics(), None)
+
+        with unittest.mock.patch.object(cloudlanguagetools.servicemanager, 'RESULT_CACHE', 'memory'):
+            manager = get_manager_unconfigured()
+        translated_texts = record_calls(manager.services[Service.TestServiceA], 'get_translation')
+
+        translation = manager.get_translation('text_input', 'TestServiceA', 'fr', 'en')
+        # NFC and NFD forms of the same text share the cache entry
+        self.assertEqual(manager.get_translation('text_input', 'TestServiceA', 'fr', 'en'), translation)
+        self.assertEqual(manager.get_translation('caf\u00e9', 'TestServiceA', 'fr', 'en'), manager.get_translation('cafe\u0301', 'TestServiceA', 'fr', 'en'))
+        self.assertEqual(translated_texts, ['text_input', 'caf\u00e9'])
+
+        # batches only send the texts which aren't cached
+        result = manager.get_translation_batch(['text_input', 'text_2'], 'TestServiceA', 'fr', 'en')
+        self.assertEqual(result[0], {'translation': translation})
+        self.assertEqual(translated_texts, ['text_input', 'caf\u00e9', 'text_2'])
+        self.assertEqual(manager.get_result_cache_metrics()['hits'], {'translation': 3})
+        self.assertEqual(manager.get_result_cache_metrics()['misses'], {'translation': 3})
+
+        # per-service opt-out
+        manager.result_cache.disable_service('TestServiceA')
+        manager.get_translation('text_input', 'TestServiceA', 'fr', 'en')
+        self.assertEqual(translated_texts, ['text_input', 'caf\u00e9', 'text_2', 'text_input'])
+
+    def test_result_cache_sqlite(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            backend = cloudlanguagetools.resultcache.create_backend(f'sqlite:{os.path.join(temp_dir, "results.db")}')
+            result_cache = cloudlanguagetools.resultcache.ResultCache(backend)
+            self.assertEqual(result_cache.get_or_compute('Azure', 'dictionary_lookup', 'chat', {'lang': 'fr'}, lambda: ['cat']), ['cat'])
+            self.assertEqual(result_cache.get_or_compute('Azure', 'dictionary_lookup', 'chat', {'lang': 'fr'}, lambda: ['dog']), ['cat'])
+            self.assertEqual(result_cache.get_or_compute('Azure', 'dictionary_lookup', 'chat', {'lang': 'de'}, lambda: ['dog']), ['dog'])
+            backend.ttl = -1
+            self.assertEqual(result_cache.get_or_compute('Azure', 'dictionary_lookup', 'chat', {'lang': 'fr'}, lambda: ['dog']), ['dog'])
+
+    def test_audio_cache(self):
+        if not LOAD_TEST_SERVICES_ONLY:
+            pytest.skip('you must set CLOUDLANGUAGETOOLS_CORE_TEST_SERVICES=yes')
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            manager = get_manager_unconfigured()
+            manager.enable_audio_cache(temp_dir)
+            generated_texts = record_calls(manager.services[Service.TestServiceA], 'get_tts_audio')
+
+            audio_file = manager.get_tts_audio('hello', 'TestServiceA', {'voice_id': 'paul'}, {'pitch': 0})
+            audio_data = open(audio_file.name).read()
+            cached_audio_file = manager.get_tts_audio('hello', 'TestServiceA', {'voice_id': 'paul'}, {'pitch': 0})
+            self.assertEqual(open(cached_audio_file.name).read(), audio_data)
+            self.assertTrue(cached_audio_file.name.endswith('.mp3'))
+            # a generation is a single miss
+            self.assertEqual(manager.get_audio_cache_metrics()['miss_count'], 1)
+            self.assertEqual(manager.get_audio_cache_metrics()['hit_count'], 1)
+            manager.get_tts_audio('hello', 'TestServiceA', {'voice_id': 'paul'}, {'pitch': 10})
+            self.assertEqual(generated_texts, ['hello', 'hello'])
+            manager.get_tts_audio('hello', 'TestServiceA', {'voice_id': 'paul'}, {'pitch': 10, 'format': 'ogg_opus'})
+            cached_audio_file = manager.get_tts_audio('hello', 'TestServiceA', {'voice_id': 'paul'}, {'pitch': 10, 'format': 'ogg_opus'})
+            self.assertTrue(cached_audio_file.name.endswith('.ogg_opus'))
+
+            # a new process reuses the files, evicting the least recently used past the byte budget
+            manager = get_manager_unconfigured()
+            manager.enable_audio_cache(temp_dir, max_bytes=len(audio_data) + 10)
+            self.assertEqual(manager.get_audio_cache_metrics()['file_count'], 3)
+            manager.get_tts_audio('world', 'TestServiceA', {'voice_id': 'paul'}, {'pitch': 0})
+            metrics = manager.get_audio_cache_metrics()
+            self.assertEqual(metrics['file_count'], 1)
+            self.assertEqual(metrics['eviction_count'], 3)
+
+    def test_async_api(self):
+        if not LOAD_TEST_SERVICES_ONLY:
+            pytest.skip('you must set CLOUDLANGUAGETOOLS_CORE_TEST_SERVICES=yes')
+
+        manager = get_manager_unconfigured()
+        async def run_requests():
+            return await asyncio.gather(
+                manager.aget_translation('text_input', 'TestServiceA', 'fr', 'en'),
+                manager.aget_transliteration('text_input', 'TestServiceA', {'name': 'pinyin'}),
+                manager.aget_dictionary_lookup('text_input', 'TestServiceA', {'name': 'french'}),
+                manager.aget_tts_audio('text_input', 'TestServiceA', {'voice_id': 'paul'}, {}))
+        translation, transliteration, dictionary_lookup, audio_file = asyncio.run(run_requests())
+
+        self.assertEqual(translation, manager.get_translation('text_input', 'TestServiceA', 'fr', 'en'))
+        self.assertEqual(transliteration, manager.get_transliteration('text_input', 'TestServiceA', {'name': 'pinyin'}))
+        self.assertEqual(dictionary_lookup, manager.get_dictionary_lookup('text_input', 'TestServiceA', {'name': 'french'}))
+        self.assertEqual(json.loads(open(audio_file.name).read())['text'], 'text_input')
+
+    def test_http_session(self):
+        request_count = {'count': 0}
+        def handle_request(method, path, headers, body):
+            request_count['count'] += 1
+            if path == '/busy':
+                return 429, {'Retry-After': '120'}, b''
+            # the first request fails with a retryable status
+            return 503 if request_count['count'] == 1 else 200, {}, b'ok'
+        with local_http_server(handle_request) as base_url:
+            url = base_url + '/'
+            service = cloudlanguagetools.test_services.TestServiceA()
+            response = service.get_session().get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(request_count['count'], 2)
+            for i in range(3):
+                service.get_session().get(url)
+            # the connection is kept alive and reused
+            stats = service.get_http_pool_stats()
+            self.assertEqual(stats[url[:-1]]['num_connections'], 1)
+            self.assertEqual(stats[url[:-1]]['num_requests'], 5)
+
+            # asked to retry much later, the 429 is returned right away
+            starttime = time.time()
+            response = service.get_session().get(url + 'busy')
+            self.assertEqual(response.status_code, 429)
+            self.assertLess(time.time() - starttime, cloudlanguagetools.constants.HttpRetryAfterMax)
+            self.assertEqual(request_count['count'], 6)
+
+    def test_azure_synthesizer_pool(self):
+        import cloudlanguagetools.azure
+        class FakeConnection():
+            def __init__(self):
+                self.open_count = 0
+                self.closed = False
+            def open(self, for_continuous_recognition):
+                self.open_count += 1
+            def close(self):
+                self.closed = True
+        class FakeSynthesizer(cloudlanguagetools.azure.PooledSynthesizer):
+            # no speech sdk objects, the health check / reconnection logic is the real one
+            def __init__(self):
+                self.connection = FakeConnection()
+                self.disconnected = False
+                self.connection.open(False)
+                self.last_used = time.time()
+        class FakePool(cloudlanguagetools.azure.SpeechSynthesizerPool):
+            def create(self, output_format):
+                with self.lock:
+                    self.created_count += 1
+                return FakeSynthesizer()
+
+        pool = FakePool('key', 'region', max_idle=2)
+        pool.warm_up('mp3', 2)
+        first = pool.checkout('mp3')
+        second = pool.checkout('mp3')
+        # pool is empty, a new synthesizer gets created
+        third = pool.checkout('mp3')
+        pool.checkin('mp3', first)
+        pool.checkin('mp3', second)
+        # over the size limit
+        pool.checkin('mp3', third)
+        self.assertTrue(third.connection.closed)
+        # failed request
+        reused = pool.checkout('mp3')
+        self.assertIn(reused, [first, second])
+        pool.checkin('mp3', reused, healthy=False)
+        self.assertTrue(reused.connection.closed)
+        self.assertEqual(pool.get_stats(), {
+            'idle': {'mp3': 1},
+            'created_count': 3,
+            'reused_count': 3,
+            'discarded_count': 2
+        })
+
+        # the service closed the connection, it gets reopened on checkout
+        idle = pool.checkout('mp3')
+        idle.on_disconnected(None)
+        pool.checkin('mp3', idle)
+        self.assertIs(pool.checkout('mp3'), idle)
+        self.assertEqual(idle.connection.open_count, 2)
+        pool.checkin('mp3', idle)
+
+        # idle for longer than AzureSynthesizerMaxIdle: discarded, a new one is created
+        later = time.time() + cloudlanguagetools.constants.AzureSynthesizerMaxIdle + 1
+        with unittest.mock.patch.object(cloudlanguagetools.azure.time, 'time', return_value=later):
+            self.assertFalse(idle.healthy())
+            new_synthesizer = pool.checkout('mp3')
+        self.assertIsNot(new_synthesizer, idle)
+        self.assertTrue(idle.connection.closed)
+        self.assertEqual(pool.get_stats()['created_count'], 4)
+
+        # unconfigured service: no pool to warm up
+        cloudlanguagetools.azure.AzureService().load_data()
+
+        # a closed pool closes its idle synthesizers, and the ones checked in afterwards
+        pool.checkin('mp3', new_synthesizer)
+        in_use = pool.checkout('mp3')
+        pool.warm_up('mp3', 1)
+        pool.close()
+        self.assertEqual(pool.get_stats()['idle'], {'mp3': 0})
+        pool.checkin('mp3', in_use)
+        self.assertTrue(in_use.connection.closed)
+
+    def test_token_manager(self):
+        fetch_count = {'count': 0}
+        fetch_started = threading.Event()
+        release_fetch = threading.Event()
+        def fetch_token():
+            fetch_count['count'] += 1
+            fetch_started.set()
+            release_fetch.wait(5)
+            return f'token_{fetch_count["count"]}', 100
+        token_manager = cloudlanguagetools.tokenmanager.TokenManager(fetch_token, refresh_margin=10, refresh_ahead=20)
+
+        # many threads need a token at once, it gets fetched once
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=8)
+        futures = [executor.submit(token_manager.get_token) for i in range(8)]
+        fetch_started.wait(5)
+        release_fetch.set()
+        self.assertEqual([future.result() for future in futures], ['token_1'] * 8)
+        self.assertEqual(fetch_count['count'], 1)
+
+        # close to expiry, the current token is returned while a new one is fetched in the background
+        token_manager.expires_at = time.time() + 5
+        self.assertEqual(token_manager.get_token(), 'token_1')
+        for i in range(500):
+            if token_manager.get_token() == 'token_2':
+                break
+            time.sleep(0.01)
+        self.assertEqual(token_manager.get_token(), 'token_2')
+
+        token_manager.invalidate()
+        self.assertEqual(token_manager.get_token(), 'token_3')
+
+    def test_cereproc_token_retry(self):
+        import cloudlanguagetools.cereproc
+        service = cloudlanguagetools.cereproc.CereProcService()
+        service.configure({'username': 'user', 'password': 'password'})
+        tokens = iter(['token_1', 'token_2', 'token_3'])
+        service.token_manager.fetch_token_fn = lambda: (next(tokens), 3600)
+
+        voice_data = {'name': 'Heather', 'language_iso': 'en', 'country_iso': 'GB', 'region': 'GB', 'accent': 'Scottish', 'gender': 'female'}
+        requested_tokens = []
+        def request(method, url, headers=None, **kwargs):
+            requested_tokens.append(headers['Authorization'])
+            response = unittest.mock.Mock()
+            # the first token expired
+            response.status_code = 401 if headers['Authorization'] == 'Bearer token_1' else 200
+            response.json.return_value = {'voices': [voice_data]}
+            response.content = b'audio'
+            return response
+        service.http_session = unittest.mock.Mock()
+        service.http_session.request = request
+
+        # voice list and speak both get a new token when theirs is rejected
+        voice_list = service.get_tts_voice_list()
+        self.assertEqual([voice.get_voice_key() for voice in voice_list], [{'name': 'Heather'}])
+        self.assertEqual(requested_tokens, ['Bearer token_1', 'Bearer token_2'])
+        audio_file = service.get_tts_audio('hello', {'name': 'Heather'}, {})
+        self.assertEqual(open(audio_file.name, 'rb').read(), b'audio')
+        self.assertEqual(requested_tokens, ['Bearer token_1', 'Bearer token_2', 'Bearer token_2'])
+
+    def test_azure_voice_list_token_retry(self):
+        import cloudlanguagetools.azure
+        service = cloudlanguagetools.azure.AzureService()
+        service.configure({'key': 'key', 'region': 'region'})
+        tokens = iter(['token_1', 'token_2'])
+        service.token_manager = cloudlanguagetools.tokenmanager.TokenManager(lambda: (next(tokens), 600))
+
+        voice_data = {'Locale': 'en-US', 'Name': 'en-US-AriaNeural', 'DisplayName': 'Aria', 'LocalName': 'Aria',
+            'ShortName': 'en-US-AriaNeural', 'Gender': 'Female', 'VoiceType': 'Neural'}
+        requested_tokens = []
+        def get(url, headers=None, **kwargs):
+            requested_tokens.append(headers['Authorization'])
+            response = unittest.mock.Mock()
+            # the first token expired
+            response.status_code = 401 if headers['Authorization'] == 'Bearer token_1' else 200
+            response.content = json.dumps([voice_data]).encode('utf-8')
+            return response
+        service.http_session = unittest.mock.Mock()
+        service.http_session.get = get
+
+        voice_list = service.get_tts_voice_list()
+        self.assertEqual([voice.get_voice_key() for voice in voice_list], [{'name': 'en-US-AriaNeural'}])
+        self.assertEqual(requested_tokens, ['Bearer token_1', 'Bearer token_2'])
+
+    def test_google_default_credentials(self):
+        import cloudlanguagetools.google
+        import google.auth.credentials
+        import google.auth.exceptions
+        # no key configured, no application default credentials either
+        service = cloudlanguagetools.google.GoogleService()
+        with unittest.mock.patch.object(cloudlanguagetools.google.google.auth, 'default', side_effect=google.auth.exceptions.DefaultCredentialsError('not found')):
+            self.assertRaises(cloudlanguagetools.errors.RequestError, service.get_client)
+            self.assertRaises(cloudlanguagetools.errors.RequestError, service.get_translation_client)
+
+        # no key configured, the clients are built from the application default credentials
+        credentials = google.auth.credentials.AnonymousCredentials()
+        with unittest.mock.patch.object(cloudlanguagetools.google.google.auth, 'default', return_value=(credentials, None)) as default:
+            client = service.get_client()
+            self.assertIsNotNone(client)
+            self.assertIs(service.get_client(), client)
+            self.assertIs(service.get_translation_client()._credentials, credentials)
+            self.assertEqual(default.call_count, 1)
+
+    def test_azure_supported_languages(self):
+        import cloudlanguagetools.azure
+        requests_received = []
+        def handle_request(method, path, headers, body):
+            requests_received.append(headers.get('If-None-Match', None))
+            if headers.get('If-None-Match', None) == '"v1"':
+                return 304, {}, b''
+            return 200, {'ETag': '"v1"'}, json.dumps({'translation': {'fr': {}}}).encode('utf-8')
+        with local_http_server(handle_request) as url:
+            service = cloudlanguagetools.azure.AzureService()
+            service.url_translator_base = url
+            data = service.get_supported_languages()
+            self.assertEqual(data, {'translation': {'fr': {}}})
+            # shared by all the catalogs
+            self.assertIs(service.get_supported_languages(), data)
+            self.assertEqual(requests_received, [None])
+            # once expired, revalidated
+            service.supported_languages_timestamp = 0
+            self.assertIs(service.get_supported_languages(), data)
+            self.assertEqual(requests_received, [None, '"v1"'])
+
+    def test_async_native_http(self):
+        import cloudlanguagetools.azure
+        import cloudlanguagetools.watson
+        authorization_headers = []
+        watson_authorization_headers = []
+        def handle_request(method, path, headers, body):
+            if path.startswith('/cognitiveservices/v1'):
+                authorization_headers.append(headers['Authorization'])
+                # the first token is rejected
+                return 401 if headers['Authorization'] == 'Bearer token_1' else 200, {}, body
+            if path.startswith('/dictionary/lookup'):
+                content = json.dumps([{'translations': [{'displayTarget': 'chat', 'posTag': 'NOUN'}]}]).encode('utf-8')
+                return 200, {'Content-Type': 'application/json'}, content
+            watson_authorization_headers.append(headers['Authorization'])
+            # watson error, not json
+            return 500, {}, b'internal error'
+        with local_http_server(handle_request) as url:
+            azure_service = cloudlanguagetools.azure.AzureService()
+            azure_service.configure({'key': 'key', 'region': 'region'})
+            azure_service.url_translator_base = url
+            azure_service.url_tts_base = url
+            tokens = iter(['token_1', 'token_2'])
+            azure_service.token_manager = cloudlanguagetools.tokenmanager.TokenManager(lambda: (next(tokens), 600))
+            watson_service = cloudlanguagetools.watson.WatsonService()
+            watson_service.configure({'translator_api_key': 'key', 'translator_url': url, 'speech_api_key': 'key', 'speech_url': url})
+
+            async def run_requests():
+                try:
+                    audio_file = await azure_service.aget_tts_audio('hello', {'name': 'en-US-AriaNeural'}, {'format': 'ogg_opus'})
+                    dictionary_lookup = await azure_service.aget_dictionary_lookup('cat',
+                        {'source_language_code': 'en', 'target_language_code': 'fr', 'language': 'en', 'lookup_type': 'Definitions'})
+                    with self.assertRaises(cloudlanguagetools.errors.RequestError):
+                        await watson_service.aget_translation('hello', 'en', 'fr')
+                    return audio_file, dictionary_lookup
+                finally:
+                    await cloudlanguagetools.asynchttp.close_session()
+            audio_file, dictionary_lookup = asyncio.run(run_requests())
+
+            # the rejected token is replaced, the request is retried
+            self.assertEqual(authorization_headers, ['Bearer token_1', 'Bearer token_2'])
+            self.assertTrue(audio_file.name.endswith('.ogg_opus'))
+            self.assertEqual(open(audio_file.name).read(), azure_service.get_ssml('hello', {'name': 'en-US-AriaNeural'}, {}))
+            self.assertEqual(dictionary_lookup, ['chat'])
+            self.assertEqual(watson_authorization_headers, ['Basic YXBpa2V5OmtleQ=='])
+
+    def test_async_native_http_services(self):
+        import cloudlanguagetools.forvo
+        import cloudlanguagetools.cereproc
+        import cloudlanguagetools.vocalware
+        import cloudlanguagetools.fptai
+        import cloudlanguagetools.voicen
+        import cloudlanguagetools.easypronunciation
+        import cloudlanguagetools.watson
+        import cloudlanguagetools.libretranslate
+        request_paths = []
+        def handle_request(method, path, headers, body):
+            request_paths.append(path.split('?')[0])
+            json_headers = {'Content-Type': 'application/json'}
+            if path.startswith('/key/'):
+                return 200, json_headers, json.dumps({'items': [{'pathmp3': base_url + '/forvo.mp3'}]}).encode('utf-8')
+            if path == '/v2/speak?voice=Heather&audio_format=mp3' and headers['Authorization'] == 'Bearer token_1':
+                return 401, {}, b''
+            if path == '/fptai':
+                return 200, json_headers, json.dumps({'async': base_url + '/fptai/audio'}).encode('utf-8')
+            if path == '/fptai/audio' and request_paths.count('/fptai/audio') == 1:
+                # not generated yet
+                return 404, {}, b''
+            if path == '/api/v1/jobs/text/':
+                return 200, json_headers, json.dumps({'data': {'id': 1}}).encode('utf-8')
+            if path == '/api/v1/jobs/1/':
+                status = 'pending' if request_paths.count('/api/v1/jobs/1/') == 1 else 'ready'
+                return 200, json_headers, json.dumps({'data': {'status': status}}).encode('utf-8')
+            if path.startswith('/french-api.php'):
+                return 200, json_headers, json.dumps({'phonetic_transcription': [{'transcriptions': ['bɔ̃ʒuʁ']}]}).encode('utf-8')
+            if path == '/translate':
+                return 200, json_headers, json.dumps({'translatedText': 'bonjour'}).encode('utf-8')
+            return 200, {}, f'audio {path}'.encode('utf-8')
+
+        with local_http_server(handle_request) as base_url:
+            forvo_service = cloudlanguagetools.forvo.ForvoService()
+            forvo_service.configure({'key': 'key'})
+            forvo_service.url_base = base_url
+            cereproc_service = cloudlanguagetools.cereproc.CereProcService()
+            cereproc_service.configure({'username': 'user', 'password': 'password'})
+            cereproc_service.url_base = base_url
+            tokens = iter(['token_1', 'token_2'])
+            cereproc_service.token_manager.fetch_token_fn = lambda: (next(tokens), 3600)
+            vocalware_service = cloudlanguagetools.vocalware.VocalWareService()
+            vocalware_service.configure({'secret_phrase': 'secret', 'account_id': 'account', 'api_id': 'api'})
+            vocalware_service.url_base = base_url
+            fptai_service = cloudlanguagetools.fptai.FptAiService()
+            fptai_service.configure({'key': 'key'})
+            fptai_service.api_url = base_url + '/fptai'
+            voicen_service = cloudlanguagetools.voicen.VoicenService()
+            voicen_service.configure({'key': 'key'})
+            voicen_service.url_base = base_url
+            easypronunciation_service = cloudlanguagetools.easypronunciation.EasyPronunciationService()
+            easypronunciation_service.configure({'api_key': 'key'})
+            easypronunciation_service.url_base = base_url
+            watson_service = cloudlanguagetools.watson.WatsonService()
+            watson_service.configure({'translator_api_key': 'key', 'translator_url': base_url, 'speech_api_key': 'key', 'speech_url': base_url})
+            libretranslate_service = cloudlanguagetools.libretranslate.LibreTranslateService()
+            libretranslate_service.BASE_URL = base_url
+
+            async def run_requests():
+                try:
+                    audio_files = [
+                        await forvo_service.aget_tts_audio('bonjour', {'language_code': 'fr', 'country_code': 'ANY'}, {}),
+                        await cereproc_service.aget_tts_audio('hello', {'name': 'Heather'}, {}),
+                        await vocalware_service.aget_tts_audio('hello', {'engine_id': 1, 'language_id': 1, 'voice_id': 1}, {}),
+                        await fptai_service.aget_tts_audio('xin chào', {'voice_id': 'banmai'}, {}),
+                        await voicen_service.aget_tts_audio('salam', {'lang': 'az', 'voice_id': '325640'}, {}),
+                        await watson_service.aget_tts_audio('hello', {'name': 'en-US_AllisonV3Voice'}, {}),
+                    ]
+                    transliteration = await easypronunciation_service.aget_transliteration('bonjour',
+                        {'url_path': '/french-api.php', 'api_params': {}})
+                    translation = await libretranslate_service.aget_translation('hello', 'en', 'fr')
+                    return audio_files, transliteration, translation
+                finally:
+                    await cloudlanguagetools.asynchttp.close_session()
+            audio_files, transliteration, translation = asyncio.run(run_requests())
+
+        self.assertEqual([open(audio_file.name).read() for audio_file in audio_files], [
+            'audio /forvo.mp3',
+            'audio /v2/speak?voice=Heather&audio_format=mp3',
+            'audio ' + vocalware_service.get_audio_url('hello', {'engine_id': 1, 'language_id': 1, 'voice_id': 1})[len(base_url):],
+            'audio /fptai/audio',
+            'audio /api/v1/jobs/1/synthesize/',
+            'audio /v1/synthesize?voice=en-US_AllisonV3Voice'])
+        self.assertEqual(transliteration, 'bɔ̃ʒuʁ')
+        self.assertEqual(translation, 'bonjour')
+        # the rejected cereproc token is replaced, the fptai / voicen jobs are polled until ready
+        self.assertEqual(request_paths.count('/v2/speak'), 2)
+        self.assertEqual(request_paths.count('/fptai/audio'), 2)
+        self.assertEqual(request_paths.count('/api/v1/jobs/1/'), 2)
+
+    def test_wenlin_connections(self):
+        db_file = create_wenlin_db()
+        service = get_wenlin_service(db_file)
+        lookup_key = {'language': 'zh_tw', 'lookup_type': 'Definitions'}
+        self.assertEqual(service.get_dictionary_lookup('挨著', lookup_key), ['be next to; get close to', 'one by one'])
+        # quotes are passed as a parameter, not part of the query
+        self.assertRaises(cloudlanguagetools.errors.NotFoundError, service.get_dictionary_lookup, "挨著' OR '1'='1", lookup_key)
+        # the connection is kept open, one per thread
+        self.assertIs(service.get_connection(), service.get_connection())
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=4)
+        lookup_key = {'language': 'zh_cn', 'lookup_type': 'PartOfSpeech'}
+        results = list(executor.map(lambda text: service.get_dictionary_lookup(text, lookup_key), ['挨着', '按理'] * 20))
+        self.assertEqual(results, [['adv.', 'v.'], ['adv.']] * 20)
+        # read-only
+        self.assertRaises(sqlite3.OperationalError, service.get_connection().execute, 'DELETE FROM words')
+
+    def test_wenlin_batch(self):
+        db_file = create_wenlin_db()
+        service = get_wenlin_service(db_file)
+        texts = ['挨着', 'not_found', '按理', '挨着']
+        for lookup_type in ['Definitions', 'PartOfSpeech', 'PartOfSpeechDefinitions']:
+            lookup_key = {'language': 'zh_cn', 'lookup_type': lookup_type}
+            expected_result = []
+            for text in texts:
+                try:
+                    expected_result.append({'result': service.get_dictionary_lookup(text, lookup_key)})
+                except cloudlanguagetools.errors.NotFoundError as e:
+                    expected_result.append({'error': str(e)})
+            self.assertEqual(service.get_dictionary_lookup_batch(texts, lookup_key), expected_result)
+        self.assertEqual(expected_result[1], {'error': 'Wenlin: no results found for not_found'})
+        # padded with NULL, so that only power of two parameter counts get prepared
+        self.assertEqual(cloudlanguagetools.wenlin.get_batch_query_params(['a', 'b', 'c']), ['a', 'b', 'c', None])
+        self.assertEqual(len(cloudlanguagetools.wenlin.get_batch_query_params(['a'] * 300)), 512)
+
+    def test_wenlin_migrate_previous_rev(self):
+        import clt_wenlin
+        db_file = create_wenlin_db()
+        # previous revision: no senses table
+        connection = sqlite3.connect(db_file.name)
+        connection.execute('DROP TABLE senses')
+        connection.close()
+        migrated_db_file = tempfile.NamedTemporaryFile(suffix='.db')
+        clt_wenlin.migrate_sqlite_file(db_file.name, migrated_db_file.name)
+        service = get_wenlin_service(migrated_db_file)
+        self.assertEqual(service.get_dictionary_lookup('挨着', {'language': 'zh_cn', 'lookup_type': 'PartOfSpeechDefinitions'}),
+            {'v.': ['be next to; get close to'], 'adv.': ['one by one']})
+        # the migration only runs when clt_wenlin is installed, a missing database is an error at lookup time
+        service = cloudlanguagetools.wenlin.WenlinService()
+        service.db_path = migrated_db_file.name + '.missing'
+        self.assertRaises(FileNotFoundError, service.get_dictionary_lookup, '挨着', {'language': 'zh_cn', 'lookup_type': 'Definitions'})
+        self.assertFalse(os.path.exists(service.db_path))
+
+    def test_wenlin_in_memory(self):
+        db_file = create_wenlin_db()
+        service = get_wenlin_service(db_file)
+        texts = ['挨着', '挨著', '按理', 'not_found']
+        lookup_keys = [{'language': language, 'lookup_type': lookup_type} for language in ['zh_cn', 'zh_tw']
+            for lookup_type in ['Definitions', 'PartOfSpeech', 'MeasureWord', 'PartOfSpeechDefinitions']]
+        sqlite_results = [service.get_dictionary_lookup_batch(texts, lookup_key) for lookup_key in lookup_keys]
+        service.load_memory_index()
+        memory_results = [service.get_dictionary_lookup_batch(texts, lookup_key) for lookup_key in lookup_keys]
+        self.assertEqual(memory_results, sqlite_results)
+        self.assertEqual(service.get_dictionary_lookup('按理', {'language': 'zh_cn', 'lookup_type': 'Definitions'}),
+            ['according to reason; in ordinary course of events; normally', 'by rights'])
+        stats = service.get_memory_index_stats()
+        self.assertEqual(stats['entry_count'], 2)
+        self.assertEqual(stats['sense_count'], 4)
+        self.assertGreater(stats['memory_bytes'], 0)
+
+    def test_wenlin_reverse_lookup(self):
+        db_file = create_wenlin_db()
+        service = get_wenlin_service(db_file)
+        lookup_key = {'language': 'en', 'target_language': 'zh_cn', 'lookup_type': 'Definitions'}
+        self.assertEqual(service.get_dictionary_lookup('close', lookup_key), ['挨着'])
+        self.assertEqual(service.get_dictionary_lookup('one by one', {**lookup_key, 'target_language': 'zh_tw'}), ['挨著'])
+        # the shorter definition ranks first, each headword once
+        self.assertEqual(service.get_dictionary_lookup('by', lookup_key), ['按理', '挨着'])
+        # FTS5 query syntax is searched for as a phrase, not interpreted
+        self.assertRaises(cloudlanguagetools.errors.NotFoundError, service.get_dictionary_lookup, 'close OR rights', lookup_key)
+        self.assertRaises(cloudlanguagetools.errors.NotFoundError, service.get_dictionary_lookup, '"', lookup_key)
+        self.assertEqual(service.get_dictionary_lookup_batch(['rights', 'not_found'], lookup_key),
+            [{'result': ['按理']}, {'error': 'Wenlin: no results found for not_found'}])
+        lookup_ids = [json.loads(lookup.get_lookup_id())['key'] for lookup in service.get_dictionary_lookup_list()]
+        self.assertIn(lookup_key, lookup_ids)
+        # the limit applies to headwords, not to matching definitions
+        connection = sqlite3.connect(db_file.name)
+        connection.executemany('INSERT INTO definitions (definition, entry_id) SELECT ?, entry_id FROM words WHERE simplified=?',
+            [('by', '挨着'), ('by', '挨着')])
+        connection.commit()
+        connection.close()
+        with unittest.mock.patch.object(cloudlanguagetools.constants, 'WenlinReverseLookupLimit', 2):
+            self.assertEqual(get_wenlin_service(db_file).get_dictionary_lookup('by', lookup_key), ['挨着', '按理'])
+
+    def test_chatapi_dictionary_lookup_preference(self):
+        import cloudlanguagetools.chatapi
+        manager = unittest.mock.MagicMock()
+        manager.get_catalog_index().get_dictionary_lookup_options.return_value = [
+            unittest.mock.MagicMock(service=Service.Wenlin), unittest.mock.MagicMock(service=Service.Azure)]
+        manager.get_dictionary_lookup.return_value = ['result']
+        chat_api = cloudlanguagetools.chatapi.ChatAPI(manager)
+        def get_lookup_service(source_language, target_language, service=None):
+            chat_api.dictionary_lookup(cloudlanguagetools.chatapi.TranslateLookupQuery(input_text='text',
+                source_language=source_language, target_language=target_language, service=service))
+            return manager.get_dictionary_lookup.call_args.args[1]
+        CommonLanguage = cloudlanguagetools.languages.CommonLanguage
+        self.assertEqual(get_lookup_service(CommonLanguage.zh_cn, CommonLanguage.en), Service.Wenlin)
+        # english to chinese stays on azure unless wenlin is requested
+        self.assertEqual(get_lookup_service(CommonLanguage.en, CommonLanguage.zh_cn), Service.Azure)
+        self.assertEqual(get_lookup_service(CommonLanguage.en, CommonLanguage.zh_cn, Service.Wenlin), Service.Wenlin)
+
+    def test_chatapi_breakdown_tokenization_service(self):
+        import cloudlanguagetools.chatapi
+        manager = unittest.mock.MagicMock()
+        def get_tokenization_options(language, service=None):
+            return [unittest.mock.MagicMock(**{'json_obj.return_value': {'service': option_service.name}})
+                for option_service in [Service.Spacy, Service.ChineseSegmentation] if service in [None, option_service]]
+        manager.get_catalog_index().get_tokenization_options.side_effect = get_tokenization_options
+        manager.get_breakdown.return_value = []
+        chat_api = cloudlanguagetools.chatapi.ChatAPI(manager)
+        chat_api.select_translation_option = unittest.mock.MagicMock()
+        chat_api.select_transliteration_option = unittest.mock.MagicMock()
+        def get_tokenization_service(tokenization_service=None):
+            chat_api.breakdown(cloudlanguagetools.chatapi.BreakdownQuery(input_text='外卖',
+                language=cloudlanguagetools.languages.CommonLanguage.zh_cn, tokenization_service=tokenization_service))
+            return manager.get_breakdown.call_args.args[1]['service']
+        # ChineseSegmentation is opt-in, the default tokenization option is unchanged
+        self.assertEqual(get_tokenization_service(), 'Spacy')
+        self.assertEqual(get_tokenization_service(Service.ChineseSegmentation), 'ChineseSegmentation')
+
+    def test_chinese_segmentation(self):
+        import cloudlanguagetools.chinesesegmentation
+        db_file = create_wenlin_db()
+        service = cloudlanguagetools.chinesesegmentation.ChineseSegmentationService()
+        service.wenlin_db_path = db_file.name
+        words_key = {'mode': 'Words'}
+
+        result = service.get_tokenization('送外卖的人。', words_key)
+        self.assertEqual(result[1], {'token': '外卖', 'lemma': '外卖', 'can_translate': True, 'can_transliterate': True})
+        self.assertEqual([token['token'] for token in result], ['送', '外卖', '的', '人', '。'])
+        self.assertEqual(result[4], {'token': '。', 'lemma': '。', 'can_translate': False, 'can_transliterate': False})
+        # traditional headword from wenlin
+        self.assertEqual([token['token'] for token in service.get_tokenization('他挨著我 ok', words_key)], ['他', '挨著', '我', 'ok'])
+        self.assertEqual([token['token'] for token in service.get_tokenization('外卖', {'mode': 'Characters'})], ['外', '卖'])
+
+        batch_result = service.get_tokenization_batch(['送外卖的人。', '外卖'], words_key)
+        self.assertEqual(batch_result, [{'result': result}, {'result': service.get_tokenization('外卖', words_key)}])
+
+    def test_all_translations(self):
+        if not LOAD_TEST_SERVICES_ONLY:
+            pytest.skip('you must set CLOUDLANGUAGETOOLS_CORE_TEST_SERVICES=yes')
+
+        manager = get_manager_unconfigured()
+        result = manager.get_all_translations_timed('text_input', 'fr', 'en')
+        self.assertEqual(sorted(result['translations'].keys()), ['TestServiceA', 'TestServiceB'])
+        self.assertEqual(sorted(result['processing_time'].keys()), ['TestServiceA', 'TestServiceB'])
+        self.assertEqual(result['timed_out'], [])
+
+        translated_text_obj = json.loads(result['translations']['TestServiceA'])
+        self.assertEqual(translated_text_obj, {
+            'text': 'text_input',
+            'from_language_key': 'fr',
+            'to_language_key': 'en'
+        })
+
+        # plain version only returns the translations
+        result = manager.get_all_translations('text_input', 'fr', 'en')
+        self.assertEqual(sorted(result.keys()), ['TestServiceA', 'TestServiceB'])
+
+        # only the services offering the language pair get constructed
+        with tempfile.TemporaryDirectory() as temp_dir:
+            catalog_path = os.path.join(temp_dir, 'catalog.db')
+            manager = get_manager_unconfigured()
+            manager.load_catalog(catalog_path)
+            manager.refresh_catalog()
+            manager = get_manager_unconfigured()
+            manager.load_catalog(catalog_path)
+            self.assertEqual(manager.get_all_translations('text_input', 'fr', 'ja'), {})
+            self.assertEqual(manager.services.get_loaded_services(), [])
+            manager.get_all_translations('text_input', 'fr', 'en')
+            self.assertEqual(sorted([x.name for x in manager.services.get_loaded_services()]), ['TestServiceA', 'TestServiceB'])
+
+    def test_catalog_service_failure(self):
+        if not LOAD_TEST_SERVICES_ONLY:
+            pytest.skip('you must set CLOUDLANGUAGETOOLS_CORE_TEST_SERVICES=yes')
+
+        manager = get_manager_unconfigured()
+        voice_list = manager.get_tts_voice_list()
+        self.assertEqual(sorted([voice.service.name for voice in voice_list]), ['TestServiceA', 'TestServiceB'])
+
+        def failing_voice_list():
+            raise cloudlanguagetools.errors.RequestError('service unavailable')
+        manager.services[Service.TestServiceB].get_tts_voice_list = failing_voice_list
+
+        # the last good voice list for TestServiceB is kept
+        manager.refresh_catalog(force=True)
+        voice_list = manager.get_tts_voice_list()
+        self.assertEqual(sorted([voice.service.name for voice in voice_list]), ['TestServiceA', 'TestServiceB'])
+
+        # a service failing on the first attempt doesn't prevent other services from being listed
+        manager = get_manager_unconfigured()
+        manager.services[Service.TestServiceB].get_tts_voice_list = failing_voice_list
+        voice_list = manager.get_tts_voice_list()
+        self.assertEqual([voice.service.name for voice in voice_list], ['TestServiceA'])
+
+    def test_catalog_stale_while_revalidate(self):
+        if not LOAD_TEST_SERVICES_ONLY:
+            pytest.skip('you must set CLOUDLANGUAGETOOLS_CORE_TEST_SERVICES=yes')
+
+        manager = get_manager_unconfigured()
+        self.assertEqual(len(manager.get_tts_voice_list()), 2)
+        version = manager.catalog.version
+
+        # make TestServiceB slow to return its voice list, and expire its slice
+        refresh_started = threading.Event()
+        release_refresh = threading.Event()
+        original_voice_list = manager.services[Service.TestServiceB].get_tts_voice_list
+        def slow_voice_list():
+            refresh_started.set()
+            release_refresh.wait(10)
+            return original_voice_list()
+        manager.services[Service.TestServiceB].get_tts_voice_list = slow_voice_list
+        manager.catalog.slices[(Service.TestServiceB, cloudlanguagetools.catalog.CatalogType.tts_voice_list)].ttl = -1
+
+        # the stale voice list is served while a single background refresh runs
+        for i in range(5):
+            self.assertEqual(len(manager.get_tts_voice_list()), 2)
+        self.assertTrue(refresh_started.wait(10))
+        self.assertEqual(manager.catalog.version, version)
+        metrics = manager.get_catalog_metrics()
+        self.assertEqual(metrics['refresh_in_progress'], 1)
+        self.assertEqual(metrics['stale_served_count'], 5)
+
+        release_refresh.set()
+        manager.catalog.executor.shutdown(wait=True)
+        metrics = manager.get_catalog_metrics()
+        self.assertEqual(manager.catalog.version, version + 1)
+        self.assertEqual(metrics['refresh_in_progress'], 0)
+        self.assertEqual(metrics['failure_count'], 0)
+        self.assertEqual(metrics['slices']['TestServiceB.tts_voice_list']['refresh_count'], 2)
+
+    def test_catalog_ttl(self):
+        if not LOAD_TEST_SERVICES_ONLY:
+            pytest.skip('you must set CLOUDLANGUAGETOOLS_CORE_TEST_SERVICES=yes')
+        import cloudlanguagetools.deepl
+        import cloudlanguagetools.elevenlabs
+
+        # each slice expires after the TTL of its service
+        with unittest.mock.patch.object(cloudlanguagetools.test_services.TestServiceB, 'CATALOG_TTL', cloudlanguagetools.constants.CatalogVolatileTTL):
+            manager = get_manager_unconfigured()
+            manager.get_tts_voice_list()
+        tts_voice_list = cloudlanguagetools.catalog.CatalogType.tts_voice_list
+        self.assertEqual(manager.catalog.slices[(Service.TestServiceA, tts_voice_list)].ttl, cloudlanguagetools.constants.TTLCacheTimeout)
+        self.assertEqual(manager.catalog.slices[(Service.TestServiceB, tts_voice_list)].ttl, cloudlanguagetools.constants.CatalogVolatileTTL)
+
+        self.assertEqual(cloudlanguagetools.deepl.DeepLService.CATALOG_TTL, cloudlanguagetools.constants.CatalogStaticTTL)
+        self.assertEqual(cloudlanguagetools.elevenlabs.ElevenLabsService.CATALOG_TTL, cloudlanguagetools.constants.CatalogVolatileTTL)
+
+    def test_catalog_store(self):
+        if not LOAD_TEST_SERVICES_ONLY:
+            pytest.skip('you must set CLOUDLANGUAGETOOLS_CORE_TEST_SERVICES=yes')
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            catalog_path = os.path.join(temp_dir, 'catalog.db')
+            manager = get_manager_unconfigured()
+            manager.load_catalog(catalog_path)
+            language_data = manager.get_language_data_json_v2()
+
+            # a new process serves the saved catalog without querying services
+            manager = get_manager_unconfigured()
+            def failing_voice_list():
+                raise cloudlanguagetools.errors.RequestError('service unavailable')
+            for service in manager.services.values():
+                service.get_tts_voice_list = failing_voice_list
+            manager.load_catalog(catalog_path)
+            self.assertEqual(manager.get_language_data_json_v2(), language_data)
+            self.assertEqual(manager.get_catalog_metrics()['refresh_count'], 0)
+            # entries are rebuilt from their json, routing works on them
+            catalog_index = manager.get_catalog_index()
+            self.assertEqual(catalog_index.get_translation_services(Language.fr), set([Service.TestServiceA, Service.TestServiceB]))
+            self.assertEqual(catalog_index.get_translation_options(Language.fr, Service.TestServiceA)[0].get_language_id(), 'fr')
+
+            # the file holds json, not pickled objects
+            connection = sqlite3.connect(catalog_path)
+            for entries_json, in connection.execute('SELECT entries FROM slices'):
+                self.assertIsInstance(json.loads(entries_json), list)
+            connection.close()
+
+    def test_lazy_services(self):
+        if not LOAD_TEST_SERVICES_ONLY:
+            pytest.skip('you must set CLOUDLANGUAGETOOLS_CORE_TEST_SERVICES=yes')
+
+        manager = get_manager_unconfigured()
+        manager.configure_services({'TestServiceA': {'key': 'abc'}})
+        self.assertIn(Service.TestServiceA, manager.services)
+        self.assertIn('TestServiceB', manager.services)
+        self.assertNotIn(Service.Azure, manager.services)
+        self.assertEqual(manager.services.get_loaded_services(), [])
+
+        # constructed on first access
+        service = manager.services[Service.TestServiceA]
+        self.assertIs(manager.services['TestServiceA'], service)
+        self.assertEqual(manager.services.get_loaded_services(), [Service.TestServiceA])
+        self.assertEqual(manager.services.pending_config, {})
+
+    def test_catalog_index(self):
+        if not LOAD_TEST_SERVICES_ONLY:
+            pytest.skip('you must set CLOUDLANGUAGETOOLS_CORE_TEST_SERVICES=yes')
+
+        manager = get_manager_unconfigured()
+        catalog_index = manager.get_catalog_index()
+        # index is only rebuilt when the catalog changes
+        self.assertIs(manager.get_catalog_index(), catalog_index)
+
+        self.assertEqual(catalog_index.get_translation_services(Language.fr), set([Service.TestServiceA, Service.TestServiceB]))
+        translation_options = catalog_index.get_translation_options(Language.fr, Service.TestServiceA)
+        self.assertEqual(len(translation_options), 1)
+        self.assertEqual(translation_options[0].get_language_id(), 'fr')
+        self.assertEqual(catalog_index.get_translation_options(Language.ja), ())
+
+        voices = catalog_index.get_voices(cloudlanguagetools.languages.AudioLanguage.fr_FR, Service.TestServiceB, cloudlanguagetools.constants.Gender.Female)
+        self.assertEqual(len(voices), 1)
+        self.assertEqual(voices[0].get_voice_key(), {'voice_id': 'paul'})
+
+        dictionary_lookup_options = catalog_index.get_dictionary_lookup_options(Language.zh_cn, Language.en, Service.TestServiceA)
+        self.assertEqual(len(dictionary_lookup_options), 1)
+
+        manager.refresh_catalog(force=True)
+        self.assertIsNot(manager.get_catalog_index(), catalog_index)
+
+    def test_language_data_snapshot(self):
+        if not LOAD_TEST_SERVICES_ONLY:
+            pytest.skip('you must set CLOUDLANGUAGETOOLS_CORE_TEST_SERVICES=yes')
+
+        manager = get_manager_unconfigured()
+        snapshot = manager.get_language_data_snapshot()
+        # snapshot is reused until the catalog changes
+        self.assertIs(manager.get_language_data_snapshot(), snapshot)
+
+        self.assertEqual(json.loads(snapshot.json_bytes), snapshot.data)
+        self.assertEqual(gzip.decompress(snapshot.gzip_bytes), snapshot.json_bytes)
+        free_voice_services = [x['service'] for x in snapshot.data['free']['voice_list']]
+        self.assertEqual(free_voice_services, ['TestServiceA'])
+        premium_voice_services = [x['service'] for x in snapshot.data['premium']['voice_list']]
+        self.assertEqual(premium_voice_services, ['TestServiceA', 'TestServiceB'])
+
+        self.assertTrue(snapshot.etag_matches(snapshot.etag))
+        self.assertTrue(snapshot.etag_matches(f'"abcd", W/{snapshot.etag}'))
+        self.assertFalse(snapshot.etag_matches('"abcd"'))
+        self.assertFalse(snapshot.etag_matches(None))
+
+        self.assertEqual(snapshot.get_body(None), (snapshot.json_bytes, None))
+        self.assertEqual(snapshot.get_body('gzip, deflate'), (snapshot.gzip_bytes, 'gzip'))
+        self.assertEqual(snapshot.get_body('gzip;q=0'), (snapshot.json_bytes, None))
+
+        # the content, hence the etag, doesn't change when the catalog gets refreshed with the same data
+        manager.refresh_catalog(force=True)
+        new_snapshot = manager.get_language_data_snapshot()
+        self.assertIsNot(new_snapshot, snapshot)
+        self.assertEqual(new_snapshot.etag, snapshot.etag)
+
     def test_transliteration(self):
         if not LOAD_TEST_SERVICES_ONLY:
             pytest.skip('you must set CLOUDLANGUAGETOOLS_CORE_TEST_SERVICES=yes')
@@ -0,0 +1,89 @@
+"""compare per-request routing overhead: linear scans over the catalog lists versus CatalogIndex lookups.
+usage: python utils/benchmark_catalog_index.py --voices-per-language 20"""
+
+import os
+import sys
+import timeit
+import argparse
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import cloudlanguagetools.constants
+import cloudlanguagetools.languages
+import cloudlanguagetools.catalogindex
+import cloudlanguagetools.test_services
+
+Service = cloudlanguagetools.constants.Service
+Language = cloudlanguagetools.languages.Language
+AudioLanguage = cloudlanguagetools.languages.AudioLanguage
+Gender = cloudlanguagetools.constants.Gender
+
+SERVICES = [Service.Azure, Service.Google, Service.Amazon, Service.Watson, Service.Naver, Service.CereProc, Service.DeepL]
+
+def build_catalog(voices_per_language):
+    voice_list = []
+    for service in SERVICES:
+        for audio_language in AudioLanguage:
+            for i in range(voices_per_language):
+                voice = cloudlanguagetools.test_services.TestServiceVoice(audio_language, f'voice_{i}', f'voice_{i}',
+                    service, cloudlanguagetools.constants.ServiceFee.paid)
+                voice.gender = [Gender.Female, Gender.Male][i % 2]
+                voice_list.append(voice)
+    translation_language_list = []
+    for service in SERVICES:
+        for language in Language:
+            translation_language_list.append(cloudlanguagetools.test_services.TestServiceTranslationLanguage(language, language.name,
+                service, cloudlanguagetools.constants.ServiceFee.paid))
+    return voice_list, translation_language_list
+
+def route_linear(voice_list, translation_language_list, audio_language, source_language, target_language):
+    # select a voice
+    candidates = [x for x in voice_list if x.audio_language == audio_language]
+    service_list = set([x.service for x in candidates])
+    service = Service.Google if Service.Google in service_list else list(service_list)[0]
+    candidates = [x for x in candidates if x.service == service]
+    candidates = [x for x in candidates if x.gender == Gender.Female]
+    voice = candidates[0]
+
+    # select translation option
+    source_list = [x for x in translation_language_list if x.language == source_language]
+    target_list = [x for x in translation_language_list if x.language == target_language]
+    common_service_list = set([x.service for x in source_list]).intersection(set([x.service for x in target_list]))
+    service = Service.DeepL if Service.DeepL in common_service_list else list(common_service_list)[0]
+    source_language_id = [x for x in source_list if x.service == service][0].get_language_id()
+    target_language_id = [x for x in target_list if x.service == service][0].get_language_id()
+    return voice, source_language_id, target_language_id
+
+def route_index(catalog_index, audio_language, source_language, target_language):
+    # select a voice
+    service_list = catalog_index.get_voice_services(audio_language)
+    service = Service.Google if Service.Google in service_list else list(service_list)[0]
+    voice = catalog_index.get_voices(audio_language, service, Gender.Female)[0]
+
+    # select translation option
+    common_service_list = catalog_index.get_translation_services(source_language).intersection(catalog_index.get_translation_services(target_language))
+    service = Service.DeepL if Service.DeepL in common_service_list else list(common_service_list)[0]
+    source_language_id = catalog_index.get_translation_options(source_language, service)[0].get_language_id()
+    target_language_id = catalog_index.get_translation_options(target_language, service)[0].get_language_id()
+    return voice, source_language_id, target_language_id
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='benchmark catalog routing, linear scan vs index')
+    parser.add_argument('--voices-per-language', type=int, default=10)
+    parser.add_argument('--iterations', type=int, default=200)
+    args = parser.parse_args()
+
+    voice_list, translation_language_list = build_catalog(args.voices_per_language)
+    print(f'catalog: {len(voice_list)} voices, {len(translation_language_list)} translation options')
+
+    build_time = timeit.timeit(lambda: cloudlanguagetools.catalogindex.CatalogIndex(0, voice_list, translation_language_list, [], [], []), number=1)
+    print(f'index build time (once per catalog refresh): {build_time * 1000:.1f}ms')
+    catalog_index = cloudlanguagetools.catalogindex.CatalogIndex(0, voice_list, translation_language_list, [], [], [])
+
+    request_args = (AudioLanguage.fr_FR, Language.zh_cn, Language.fr)
+    assert route_linear(voice_list, translation_language_list, *request_args) == route_index(catalog_index, *request_args)
+
+    linear_time = timeit.timeit(lambda: route_linear(voice_list, translation_language_list, *request_args), number=args.iterations) / args.iterations
+    index_time = timeit.timeit(lambda: route_index(catalog_index, *request_args), number=args.iterations) / args.iterations
+    print(f'linear scan: {linear_time * 1000000:.1f}us per request')
+    print(f'index:       {index_time * 1000000:.1f}us per request')
+    print(f'speedup:     {linear_time / index_time:.0f}x')
@@ -0,0 +1,61 @@
+"""per-call cost of building the google tts / translate clients versus GoogleService.get_client(), no requests are sent.
+usage: python utils/benchmark_google_clients.py --iterations 50"""
+
+import os
+import sys
+import json
+import base64
+import timeit
+import argparse
+import tempfile
+import warnings
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+warnings.simplefilter('ignore')
+
+import google.cloud.texttospeech
+import google.cloud.translate_v2
+import cloudlanguagetools.google
+
+def generate_service_account_key():
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_key_pem = private_key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption())
+    key_data = {
+        'type': 'service_account',
+        'project_id': 'benchmark',
+        'private_key_id': 'benchmark',
+        'private_key': private_key_pem.decode('utf-8'),
+        'client_email': 'benchmark@benchmark.iam.gserviceaccount.com',
+        'client_id': '1',
+        'token_uri': 'https://oauth2.googleapis.com/token'
+    }
+    return json.dumps(key_data)
+
+def get_clients_per_call():
+    tts_client = google.cloud.texttospeech.TextToSpeechClient()
+    translation_client = google.cloud.translate_v2.Client()
+    return tts_client, translation_client
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='benchmark google client construction')
+    parser.add_argument('--iterations', type=int, default=50)
+    args = parser.parse_args()
+
+    key_str = generate_service_account_key()
+    key_file = tempfile.NamedTemporaryFile(mode='w', suffix='.json')
+    key_file.write(key_str)
+    key_file.flush()
+    os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = key_file.name
+
+    service = cloudlanguagetools.google.GoogleService()
+    service.configure({'key': base64.b64encode(key_str.encode('utf-8')).decode('utf-8')})
+
+    def get_clients_cached():
+        return service.get_client(), service.get_translation_client()
+
+    for name, fn in [('per call', get_clients_per_call), ('cached', get_clients_cached)]:
+        time_diff = timeit.timeit(fn, number=args.iterations)
+        print(f'{name:<10} {time_diff / args.iterations * 1000:.3f}ms per call')
@@ -0,0 +1,55 @@
+"""startup time and peak memory of a process using the ServiceManager, each scenario in a fresh interpreter.
+usage: python utils/benchmark_import_time.py --runs 3"""
+
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+SCENARIO_CODE = """
+import sys
+import json
+import timeit
+import resource
+import warnings
+warnings.simplefilter('ignore')
+sys.path.insert(0, {root_dir!r})
+starttime = timeit.default_timer()
+import cloudlanguagetools.servicemanager
+manager = cloudlanguagetools.servicemanager.ServiceManager()
+for service_name in {service_names!r}:
+    manager.services[service_name]
+time_diff = timeit.default_timer() - starttime
+print(json.dumps({{'time': time_diff, 'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}}))
+"""
+
+ALL_SERVICES = [
+    'Azure', 'Google', 'Watson', 'Naver', 'Amazon', 'Forvo', 'CereProc', 'VocalWare', 'FptAi', 'ElevenLabs',
+    'EasyPronunciation', 'Epitran', 'DeepL', 'PyThaiNLP', 'Spacy', 'MandarinCantonese', 'Wenlin', 'OpenAI',
+    'ChineseSegmentation'
+]
+
+SCENARIOS = {
+    'manager only': [],
+    'azure only': ['Azure'],
+    'all services': ALL_SERVICES,
+}
+
+def run_scenario(service_names):
+    code = SCENARIO_CODE.format(root_dir=ROOT_DIR, service_names=service_names)
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().split('\n')[-1])
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='benchmark ServiceManager import / construction time')
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+
+    for scenario, service_names in SCENARIOS.items():
+        results = [run_scenario(service_names) for i in range(args.runs)]
+        best_time = min([x['time'] for x in results])
+        max_rss_mb = max([x['max_rss_kb'] for x in results]) / 1024
+        print(f'{scenario:<15} time: {best_time:.2f}s peak rss: {max_rss_mb:.0f}MB')
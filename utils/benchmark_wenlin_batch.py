@@ -0,0 +1,62 @@
+"""compare wenlin dictionary lookups one word at a time with a single batch, from sqlite and from the in-memory index.
+usage: python utils/benchmark_wenlin_batch.py --words 1000 [--db /clt_data/wenlin_revA.db]"""
+
+import os
+import sys
+import timeit
+import sqlite3
+import argparse
+import warnings
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+warnings.simplefilter('ignore')
+
+import clt_wenlin
+import cloudlanguagetools.wenlin
+
+def get_words(db_path, count):
+    connection = sqlite3.connect(db_path)
+    # a few words which are not in the dictionary, those are common in real vocabulary lists
+    words = [row[0] for row in connection.execute('SELECT simplified FROM words ORDER BY RANDOM() LIMIT ?', (count - count // 10,))]
+    connection.close()
+    words.extend([f'not_found_{i}' for i in range(count - len(words))])
+    return words
+
+def lookup_one_by_one(service, words, lookup_key):
+    result = []
+    for word in words:
+        try:
+            result.append({'result': service.get_dictionary_lookup(word, lookup_key)})
+        except Exception as e:
+            result.append({'error': str(e)})
+    return result
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='benchmark wenlin batch dictionary lookups')
+    parser.add_argument('--words', type=int, default=1000)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--db', default=clt_wenlin.get_wenlin_db_path())
+    args = parser.parse_args()
+
+    service = cloudlanguagetools.wenlin.WenlinService()
+    service.db_path = args.db
+    words = get_words(args.db, args.words)
+    lookup_key = {'language': 'zh_cn', 'lookup_type': 'Definitions'}
+
+    one_by_one_result = lookup_one_by_one(service, words, lookup_key)
+    batch_result = service.get_dictionary_lookup_batch(words, lookup_key)
+    assert one_by_one_result == batch_result
+
+    memory_service = cloudlanguagetools.wenlin.WenlinService()
+    memory_service.db_path = args.db
+    memory_service.load_memory_index()
+    stats = memory_service.get_memory_index_stats()
+    print(f'in-memory index: {stats["memory_bytes"] / (1024 * 1024):.0f}MB, loaded in {stats["load_time"]:.2f}s')
+    assert memory_service.get_dictionary_lookup_batch(words, lookup_key) == batch_result
+
+    for name, fn in [('one by one', lambda: lookup_one_by_one(service, words, lookup_key)),
+                     ('batch', lambda: service.get_dictionary_lookup_batch(words, lookup_key)),
+                     ('in memory, one by one', lambda: lookup_one_by_one(memory_service, words, lookup_key)),
+                     ('in memory, batch', lambda: memory_service.get_dictionary_lookup_batch(words, lookup_key))]:
+        time_diff = min(timeit.repeat(fn, number=1, repeat=args.runs))
+        print(f'{name:<22} {len(words)} words: {time_diff * 1000:.1f}ms')